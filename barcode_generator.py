@@ -0,0 +1,175 @@
+"""
+Barcode Generator for POS System
+Allocates unique in-store EAN/UPC codes with valid check digits
+"""
+
+import re
+from bisect import bisect_left
+from PyQt5.QtCore import *
+from barcode_index import get_barcode_index
+
+
+# Restricted circulation numbers GS1 leaves to the store
+DEFAULT_GENERATOR_SETTINGS = {
+    'barcode_prefix_range': '200-299',
+}
+
+BARCODE_LENGTHS = {
+    'EAN-13': 13,
+    'EAN-8': 8,
+    'UPC-A': 12,
+}
+
+CUSTOM_PREFIX = "PRD"
+CUSTOM_DIGITS = 6
+
+
+def check_digit(body):
+    """GS1 check digit for the digits of an EAN-8, UPC-A or EAN-13 code
+
+    Weights alternate 3, 1, ... starting from the rightmost digit, which
+    covers every GTIN length with one rule.
+    """
+    total = sum(int(digit) * (3 if position % 2 == 0 else 1)
+                for position, digit in enumerate(reversed(body)))
+    return str((10 - total % 10) % 10)
+
+
+def parse_prefix_range(text):
+    """'200-299' or '200, 210-215' -> list of prefixes in order"""
+    prefixes = []
+    for part in str(text or '').split(','):
+        match = re.fullmatch(r"\s*(\d+)\s*(?:-\s*(\d+)\s*)?", part)
+        if not match:
+            continue
+        start, end = match.group(1), match.group(2) or match.group(1)
+        if len(start) != len(end) or int(end) < int(start):
+            continue
+        for value in range(int(start), int(end) + 1):
+            prefix = str(value).zfill(len(start))
+            if prefix not in prefixes:
+                prefixes.append(prefix)
+    return prefixes
+
+
+class BarcodeGenerator(QObject):
+    """Hands out codes that are not used by any product
+
+    Codes are allocated in sequence inside each in-store prefix, starting
+    after the highest code already in the catalog, so codes of deleted
+    products are not handed out again. The barcode index answers whether a
+    code exists; codes handed out this session are kept in a set until the
+    product that carries them is saved.
+    """
+
+    def __init__(self, conn, parent=None):
+        super().__init__(parent)
+        self.index = get_barcode_index(conn)
+        self.prefixes = parse_prefix_range(DEFAULT_GENERATOR_SETTINGS['barcode_prefix_range'])
+        self.allocated = set()  # Handed out, maybe not saved yet
+        self.cursors = {}       # (length, prefix) -> next item number to try
+
+    def apply_settings(self, settings):
+        """Read the in-store prefix range from app settings"""
+        settings = settings or {}
+        prefixes = parse_prefix_range(settings.get('barcode_prefix_range',
+                                                   DEFAULT_GENERATOR_SETTINGS['barcode_prefix_range']))
+        if prefixes:
+            self.prefixes = prefixes
+
+    def is_free(self, code):
+        return code not in self.index and code not in self.allocated
+
+    def first_item_number(self, prefix, length):
+        """Item number after the highest code of this length under prefix"""
+        codes = self.index.codes
+        start = bisect_left(codes, prefix)
+        position = bisect_left(codes, prefix + '\uffff', start)
+        while position > start:
+            position -= 1
+            code = codes[position]
+            if len(code) == length and code.isdigit():
+                return int(code[len(prefix):-1]) + 1
+        return 0
+
+    def allocate(self, barcode_type="EAN-13", count=1, prefix=None):
+        """Allocate count new codes of a type
+
+        prefix overrides the configured range. Raises ValueError when the
+        type or prefix is unusable or the range has run out of codes.
+        """
+        if barcode_type not in BARCODE_LENGTHS:
+            return self.allocate_custom(count, prefix)
+
+        length = BARCODE_LENGTHS[barcode_type]
+        if prefix:
+            if not prefix.isdigit() or len(prefix) > length - 2:
+                raise ValueError(f"A {barcode_type} prefix must be 1 to {length - 2} digits")
+            prefixes = [prefix]
+        elif barcode_type == "UPC-A":
+            prefixes = ["2"]  # Number system 2 is the in-store range of UPC-A
+        else:
+            prefixes = self.prefixes
+
+        codes = []
+        for prefix in prefixes:
+            item_digits = length - 1 - len(prefix)
+            if item_digits < 1:
+                continue
+            key = (length, prefix)
+            if key not in self.cursors:
+                self.cursors[key] = self.first_item_number(prefix, length)
+
+            number = self.cursors[key]
+            while len(codes) < count and number < 10 ** item_digits:
+                body = prefix + str(number).zfill(item_digits)
+                code = body + check_digit(body)
+                if self.is_free(code):
+                    codes.append(code)
+                number += 1
+            self.cursors[key] = number
+
+            if len(codes) == count:
+                break
+
+        if len(codes) < count:
+            raise ValueError(f"The {barcode_type} in-store range has no free codes left")
+
+        self.allocated.update(codes)
+        return codes
+
+    def allocate_custom(self, count=1, prefix=None):
+        """Store-internal codes such as PRD000123"""
+        prefix = prefix or CUSTOM_PREFIX
+        key = (None, prefix)
+        if key not in self.cursors:
+            self.cursors[key] = 0
+            for code in self.index.prefix(prefix, len(self.index)):
+                suffix = code[len(prefix):]
+                if suffix.isdigit():
+                    self.cursors[key] = max(self.cursors[key], int(suffix) + 1)
+
+        codes = []
+        number = self.cursors[key]
+        while len(codes) < count:
+            code = f"{prefix}{str(number).zfill(CUSTOM_DIGITS)}"
+            if self.is_free(code):
+                codes.append(code)
+            number += 1
+        self.cursors[key] = number
+
+        self.allocated.update(codes)
+        return codes
+
+
+_barcode_generator = None
+
+
+def get_barcode_generator(conn):
+    """Get the application-wide barcode generator"""
+    global _barcode_generator
+    if _barcode_generator is None:
+        if conn is None:
+            raise ValueError("The barcode generator needs a database connection")
+        _barcode_generator = BarcodeGenerator(conn, QCoreApplication.instance())
+    return _barcode_generator
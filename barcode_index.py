@@ -0,0 +1,153 @@
+"""
+Barcode Prefix Index for POS System
+Sorted in-memory list of product barcodes and PLU codes for instant autocomplete
+"""
+
+from bisect import bisect_left, insort
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+from catalog_events import get_catalog_events
+
+
+class BarcodePrefixIndex(QObject):
+    """Every product code in one sorted list
+
+    A prefix query is two bisections and a slice, so it stays in the
+    microseconds with 100k codes. Short PLU codes for produce sort in the
+    same list ('4011' comes before '40112345...'), so an exact PLU is
+    always the first suggestion. Product edits from the catalog feed are
+    applied one code at a time instead of reloading.
+    """
+
+    def __init__(self, conn, parent=None):
+        super().__init__(parent)
+        self.conn = conn
+        self.codes = []          # sorted, unique
+        self.ids_by_code = {}    # code -> set of product ids
+        self.entries = {}        # product id -> (code, name)
+        self.load()
+
+        get_catalog_events().catalog_changed.connect(self.apply_catalog_change)
+
+    def load(self):
+        """Build the index from the products table"""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute('''
+                SELECT id, code_bar, name FROM products
+                WHERE code_bar IS NOT NULL AND code_bar != ''
+            ''')
+            rows = cursor.fetchall()
+        except Exception as e:
+            print(f"Error loading barcode index: {e}")
+            rows = []
+
+        self.entries = {}
+        self.ids_by_code = {}
+        for product_id, code, name in rows:
+            code = str(code).strip()
+            if code:
+                self.entries[product_id] = (code, name)
+                self.ids_by_code.setdefault(code, set()).add(product_id)
+        self.codes = sorted(self.ids_by_code)
+
+    def add_product(self, product_id, code, name):
+        """Index one product's code"""
+        code = str(code or '').strip()
+        if not code:
+            return
+        self.entries[product_id] = (code, name)
+        ids = self.ids_by_code.setdefault(code, set())
+        if not ids:
+            insort(self.codes, code)
+        ids.add(product_id)
+
+    def remove_product(self, product_id):
+        """Drop one product's code"""
+        entry = self.entries.pop(product_id, None)
+        if entry is None:
+            return
+        code = entry[0]
+        ids = self.ids_by_code.get(code, set())
+        ids.discard(product_id)
+        if not ids:
+            del self.ids_by_code[code]
+            position = bisect_left(self.codes, code)
+            if position < len(self.codes) and self.codes[position] == code:
+                del self.codes[position]
+
+    def apply_catalog_change(self, change):
+        """Follow inserted, recoded, renamed and deleted products"""
+        for product_id in change.deleted:
+            self.remove_product(product_id)
+
+        for product_id, row in change.rows.items():
+            if product_id in change.inserted or change.changed_fields(product_id) & {'code_bar', 'name'}:
+                self.remove_product(product_id)
+                self.add_product(product_id, row.get('code_bar'), row.get('name'))
+
+    def prefix(self, prefix, limit=10):
+        """Codes starting with prefix, in order"""
+        prefix = str(prefix).strip()
+        if not prefix:
+            return []
+        start = bisect_left(self.codes, prefix)
+        end = bisect_left(self.codes, prefix + '\uffff', start)
+        return self.codes[start:min(end, start + limit)]
+
+    def name(self, code):
+        """Name of a product with this code, for display"""
+        for product_id in self.ids_by_code.get(code, ()):
+            return self.entries[product_id][1]
+        return ""
+
+    def __contains__(self, code):
+        return code in self.ids_by_code
+
+    def __len__(self):
+        return len(self.codes)
+
+
+def install_barcode_completer(line_edit, index, limit=10):
+    """Autocomplete a line edit from the prefix index as the user types
+
+    The popup only ever holds the few matching codes, so QCompleter never
+    has to filter the whole catalog.
+    """
+    model = QStandardItemModel(line_edit)
+    completer = QCompleter(model, line_edit)
+    completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+    completer.setCompletionRole(Qt.UserRole)  # Insert the code, show code and name
+    line_edit.setCompleter(completer)
+
+    def update_suggestions(text):
+        model.clear()
+        for code in index.prefix(text, limit):
+            item = QStandardItem(f"{code}   {index.name(code)}")
+            item.setData(code, Qt.UserRole)
+            model.appendRow(item)
+        if model.rowCount() and not (model.rowCount() == 1 and model.item(0).data(Qt.UserRole) == text):
+            completer.complete()
+        else:
+            completer.popup().hide()
+
+    line_edit.textEdited.connect(update_suggestions)
+    return completer
+
+
+_barcode_index = None
+
+
+def get_barcode_index(conn):
+    """Get the application-wide barcode prefix index
+
+    The index keeps the connection of its first call, so that call must
+    pass a real one.
+    """
+    global _barcode_index
+    if _barcode_index is None:
+        if conn is None:
+            raise ValueError("The barcode index needs a database connection")
+        _barcode_index = BarcodePrefixIndex(conn, QCoreApplication.instance())
+    return _barcode_index
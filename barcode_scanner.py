@@ -13,6 +13,10 @@ from PyQt5.QtGui import *
 import re
 import os
 from PyQt5.QtMultimedia import QSound
+from product_thumbnails import get_product_thumbnails, ProductImageIndex
+from barcode_index import get_barcode_index, install_barcode_completer
+from barcode_generator import get_barcode_generator
+from product_record import product_cursor
 
 # Try to import camera scanning libraries
 try:
@@ -40,7 +44,7 @@ class BarcodeHandler(QObject):
     def search_product_by_barcode(self, barcode):
         """Search for product by exact barcode match"""
         try:
-            cursor = self.conn.cursor()
+            cursor = product_cursor(self.conn)
             cursor.execute('SELECT * FROM products WHERE code_bar = ?', (barcode,))
             result = cursor.fetchone()
             
@@ -56,7 +60,7 @@ class BarcodeHandler(QObject):
     def search_product_by_name_or_code(self, search_term):
         """Search for products by name or partial barcode"""
         try:
-            cursor = self.conn.cursor()
+            cursor = product_cursor(self.conn)
             cursor.execute('''
                 SELECT * FROM products 
                 WHERE LOWER(name) LIKE LOWER(?) 
@@ -182,22 +186,39 @@ class BarcodeScanner(QThread):
     barcode_detected = pyqtSignal(str)
     error_occurred = pyqtSignal(str)
     
-    def __init__(self):
+    def __init__(self, source=None):
         super().__init__()
         self.running = False
         self.camera_available = False
+        self.source = source  # Any FrameSource; camera 0 when not given
         
         # Try to import camera libraries
         try:
             import cv2
             from pyzbar import pyzbar
+            from decode_scheduler import DecodeScheduler
+            from decoder_backends import create_backend, selected_backend
+            from frame_sources import CameraSource
+            self.CameraSource = CameraSource
             self.cv2 = cv2
             self.pyzbar = pyzbar
+            backend, _ = selected_backend(self.load_decoder_settings())
+            self.decode_scheduler = DecodeScheduler(create_backend(backend))
             self.camera_available = True
         except ImportError as e:
             self.camera_available = False
             print(f"Camera libraries not available: {e}")
     
+    def load_decoder_settings(self):
+        """Load the decoder backend choice"""
+        try:
+            if os.path.exists("app_settings.json"):
+                with open("app_settings.json", 'r') as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f"Error loading decoder settings: {e}")
+        return {}
+    
     def run(self):
         """Main scanning loop"""
         if not self.camera_available:
@@ -205,28 +226,28 @@ class BarcodeScanner(QThread):
             return
         
         try:
-            # Initialize camera
-            cap = self.cv2.VideoCapture(0)
+            # Initialize camera or recording
+            cap = self.source or self.CameraSource(0)
             
-            if not cap.isOpened():
-                self.error_occurred.emit("Could not open camera")
+            if not cap.open():
+                self.error_occurred.emit(f"Could not open {cap.name}")
                 return
             
             self.running = True
+            self.decode_scheduler.reset()
             
             while self.running:
                 ret, frame = cap.read()
                 
                 if not ret:
+                    if cap.finished:
+                        break  # End of a recording
+                    self.msleep(50)
                     continue
                 
-                # Decode barcodes in the frame
-                barcodes = self.pyzbar.decode(frame)
-                
-                for barcode in barcodes:
-                    # Extract barcode data
-                    barcode_data = barcode.data.decode('utf-8')
-                    barcode_type = barcode.type
+                # Decode only when the scene changed; cap.read() paces the loop
+                for detection in self.decode_scheduler.process(frame):
+                    barcode_data = detection.data
                     
                     # Emit signal with detected barcode
                     self.barcode_detected.emit(barcode_data)
@@ -234,9 +255,6 @@ class BarcodeScanner(QThread):
                     # Stop after first successful detection
                     self.running = False
                     break
-                
-                # Small delay to prevent excessive CPU usage
-                self.msleep(100)
             
             cap.release()
             
@@ -264,32 +282,24 @@ class ProductImageHandler:
                 os.makedirs(self.images_dir)
             except Exception as e:
                 print(f"Could not create images directory: {e}")
+        
+        # Lookups go through the watched directory index, not the disk
+        thumbnails = get_product_thumbnails()
+        if os.path.normpath(thumbnails.index.images_dir) == os.path.normpath(self.images_dir):
+            self.index = thumbnails.index
+            self.index.refresh()
+        else:
+            self.index = ProductImageIndex(self.images_dir)
     
     def has_product_image(self, product_id, barcode=None):
         """Check if product has an associated image"""
-        image_path = self.get_product_image_path(product_id, barcode)
-        return os.path.exists(image_path)
+        return self.index.lookup(product_id, barcode) is not None
     
     def get_product_image_path(self, product_id, barcode=None):
         """Get the file path for a product image"""
-        # Try different naming conventions
-        possible_names = [
-            f"product_{product_id}.jpg",
-            f"product_{product_id}.png",
-            f"product_{product_id}.jpeg"
-        ]
-        
-        if barcode:
-            possible_names.extend([
-                f"barcode_{barcode}.jpg",
-                f"barcode_{barcode}.png",
-                f"barcode_{barcode}.jpeg"
-            ])
-        
-        for name in possible_names:
-            path = os.path.join(self.images_dir, name)
-            if os.path.exists(path):
-                return path
+        entry = self.index.lookup(product_id, barcode)
+        if entry is not None:
+            return entry[0]
         
         # Return default path (may not exist)
         return os.path.join(self.images_dir, f"product_{product_id}.jpg")
@@ -302,6 +312,8 @@ class ProductImageHandler:
             with open(image_path, 'wb') as f:
                 f.write(image_data)
             
+            # Replacing a file does not change the directory listing
+            self.index.refresh()
             return image_path
         except Exception as e:
             print(f"Error saving product image: {e}")
@@ -310,9 +322,10 @@ class ProductImageHandler:
     def delete_product_image(self, product_id, barcode=None):
         """Delete product image"""
         try:
-            image_path = self.get_product_image_path(product_id, barcode)
-            if os.path.exists(image_path):
-                os.remove(image_path)
+            entry = self.index.lookup(product_id, barcode)
+            if entry is not None and os.path.exists(entry[0]):
+                os.remove(entry[0])
+                self.index.refresh()
                 return True
             return False
         except Exception as e:
@@ -378,10 +391,11 @@ class BarcodeInputValidator:
 class BarcodeDialog(QDialog):
     """Dialog for barcode scanning and input"""
     
-    def __init__(self, parent=None, title="Scan Barcode"):
+    def __init__(self, parent=None, title="Scan Barcode", database_connection=None):
         super().__init__(parent)
         self.barcode = ""
         self.scanner = None
+        self.conn = database_connection or getattr(parent, 'conn', None)
         self.setWindowTitle(title)
         self.setModal(True)
         self.setFixedSize(400, 300)
@@ -422,6 +436,10 @@ class BarcodeDialog(QDialog):
         """)
         self.barcode_input.returnPressed.connect(self.accept_barcode)
         
+        # Suggest known codes and PLUs from the in-memory index
+        if self.conn is not None:
+            install_barcode_completer(self.barcode_input, get_barcode_index(self.conn))
+        
         input_layout.addWidget(self.barcode_input)
         input_group.setLayout(input_layout)
         layout.addWidget(input_group)
@@ -578,15 +596,28 @@ class BarcodeDialog(QDialog):
 class BarcodeGeneratorDialog(QDialog):
     """Dialog for generating barcodes for products"""
     
-    def __init__(self, parent=None, product_name=""):
+    def __init__(self, parent=None, product_name="", database_connection=None):
         super().__init__(parent)
         self.product_name = product_name
         self.generated_barcode = ""
+        self.generated_barcodes = []
+        self.generator = get_barcode_generator(database_connection or getattr(parent, 'conn', None))
+        self.generator.apply_settings(self.load_generator_settings())
         self.setWindowTitle("Generate Barcode")
         self.setModal(True)
-        self.setFixedSize(400, 350)
+        self.setFixedSize(400, 450)
         self.init_ui()
     
+    def load_generator_settings(self):
+        """Load the in-store prefix range"""
+        try:
+            if os.path.exists("app_settings.json"):
+                with open("app_settings.json", 'r') as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f"Error loading generator settings: {e}")
+        return {}
+    
     def init_ui(self):
         """Initialize the dialog UI"""
         layout = QVBoxLayout()
@@ -620,11 +651,18 @@ class BarcodeGeneratorDialog(QDialog):
         
         # Prefix
         self.prefix_input = QLineEdit()
-        self.prefix_input.setPlaceholderText("Optional prefix")
+        self.prefix_input.setPlaceholderText(
+            f"Default: in-store range {self.generator.prefixes[0]}-{self.generator.prefixes[-1]}")
         self.prefix_input.setMaxLength(6)
         
+        # Bulk labelling of new stock
+        self.count_spinbox = QSpinBox()
+        self.count_spinbox.setRange(1, 10000)
+        self.count_spinbox.setValue(1)
+        
         options_layout.addRow("Type:", self.type_combo)
         options_layout.addRow("Prefix:", self.prefix_input)
+        options_layout.addRow("Quantity:", self.count_spinbox)
         options_group.setLayout(options_layout)
         layout.addWidget(options_group)
         
@@ -661,7 +699,13 @@ class BarcodeGeneratorDialog(QDialog):
             }
         """)
         
+        self.barcode_list = QPlainTextEdit()
+        self.barcode_list.setReadOnly(True)
+        self.barcode_list.setStyleSheet("font-family: 'Courier New', monospace;")
+        self.barcode_list.hide()
+        
         display_layout.addWidget(self.barcode_display)
+        display_layout.addWidget(self.barcode_list)
         display_layout.addWidget(generate_btn)
         display_group.setLayout(display_layout)
         layout.addWidget(display_group)
@@ -702,60 +746,20 @@ class BarcodeGeneratorDialog(QDialog):
         self.generate_barcode()
     
     def generate_barcode(self):
-        """Generate a new barcode"""
-        import random
-        import time
-        
-        barcode_type = self.type_combo.currentText()
-        prefix = self.prefix_input.text().strip()
-        
-        # Generate based on type
-        if barcode_type == "EAN-13":
-            # Generate 13-digit EAN
-            if prefix:
-                remaining_digits = 13 - len(prefix)
-                if remaining_digits > 0:
-                    random_part = ''.join([str(random.randint(0, 9)) for _ in range(remaining_digits)])
-                    barcode = prefix + random_part
-                else:
-                    barcode = prefix[:13]
-            else:
-                barcode = ''.join([str(random.randint(0, 9)) for _ in range(13)])
-        
-        elif barcode_type == "EAN-8":
-            # Generate 8-digit EAN
-            if prefix:
-                remaining_digits = 8 - len(prefix)
-                if remaining_digits > 0:
-                    random_part = ''.join([str(random.randint(0, 9)) for _ in range(remaining_digits)])
-                    barcode = prefix + random_part
-                else:
-                    barcode = prefix[:8]
-            else:
-                barcode = ''.join([str(random.randint(0, 9)) for _ in range(8)])
-        
-        elif barcode_type == "UPC-A":
-            # Generate 12-digit UPC
-            if prefix:
-                remaining_digits = 12 - len(prefix)
-                if remaining_digits > 0:
-                    random_part = ''.join([str(random.randint(0, 9)) for _ in range(remaining_digits)])
-                    barcode = prefix + random_part
-                else:
-                    barcode = prefix[:12]
-            else:
-                barcode = ''.join([str(random.randint(0, 9)) for _ in range(12)])
-        
-        else:  # Custom
-            # Generate custom barcode with timestamp
-            timestamp = str(int(time.time()))[-6:]  # Last 6 digits of timestamp
-            if prefix:
-                barcode = f"{prefix}{timestamp}"
-            else:
-                barcode = f"PRD{timestamp}"
+        """Allocate new barcodes that no product uses yet"""
+        try:
+            codes = self.generator.allocate(self.type_combo.currentText(),
+                                            self.count_spinbox.value(),
+                                            self.prefix_input.text().strip() or None)
+        except ValueError as e:
+            QMessageBox.warning(self, "Barcode Generator", str(e))
+            return
         
-        self.barcode_display.setText(barcode)
-        self.generated_barcode = barcode
+        self.generated_barcodes = codes
+        self.generated_barcode = codes[0]
+        self.barcode_display.setText(codes[0])
+        self.barcode_list.setPlainText("\n".join(codes))
+        self.barcode_list.setVisible(len(codes) > 1)
     
     def accept_barcode(self):
         """Accept the generated barcode"""
@@ -768,6 +772,10 @@ class BarcodeGeneratorDialog(QDialog):
     def get_barcode(self):
         """Get the generated barcode"""
         return self.generated_barcode
+    
+    def get_barcodes(self):
+        """Get every barcode generated for bulk labelling"""
+        return list(self.generated_barcodes)
 
 
 # Utility functions
@@ -796,15 +804,7 @@ def validate_barcode_checksum(barcode):
 def generate_barcode_suggestions(partial_barcode, database_connection):
     """Generate barcode suggestions based on partial input"""
     try:
-        cursor = database_connection.cursor()
-        cursor.execute('''
-            SELECT DISTINCT code_bar FROM products 
-            WHERE code_bar LIKE ? AND code_bar IS NOT NULL
-            ORDER BY code_bar
-            LIMIT 10
-        ''', (f'{partial_barcode}%',))
-        
-        return [row[0] for row in cursor.fetchall()]
+        return get_barcode_index(database_connection).prefix(partial_barcode, 10)
     except Exception as e:
         print(f"Error generating barcode suggestions: {e}")
         return []
@@ -841,8 +841,8 @@ def test_barcode_generator():
     """Test the barcode generator"""
     app = QApplication(sys.argv)
     
-    # Test generator dialog
-    dialog = BarcodeGeneratorDialog(None, "Test Product")
+    # Test generator dialog on the application database
+    dialog = BarcodeGeneratorDialog(None, "Test Product", sqlite3.connect('pos_database.db'))
     if dialog.exec_() == QDialog.Accepted:
         print(f"Generated barcode: {dialog.get_barcode()}")
     
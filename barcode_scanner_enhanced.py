@@ -4,36 +4,76 @@ Supports continuous scanning and automatic product detection
 """
 
 import sys
+import time
 import cv2
 import numpy as np
-from pyzbar import pyzbar
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 import json
 import os
-from datetime import datetime
+import multiprocessing
+from collections import Counter
+from frame_buffer import FrameRingBuffer
+from decode_scheduler import DecodeScheduler, PoolDecoder
+from decoder_backends import BackendCalibration, create_backend, selected_backend
+from camera_settings import configured_cameras
+from frame_sources import CameraSource
+from scan_latency import get_scan_latency
+from camera_manager import get_camera_manager
+from scan_queue import ScanQueue
+from product_record import product_cursor
 
 class AutoBarcodeScanner(QThread):
     """Automatic barcode scanner that continuously scans for barcodes"""
     
-    barcode_detected = pyqtSignal(str, str)  # barcode, barcode_type
-    frame_ready = pyqtSignal(np.ndarray)
+    barcodes_detected = pyqtSignal(list)  # [(barcode, barcode_type), ...] new in one frame
+    barcode_detected = pyqtSignal(str, str)  # Each code of such a batch, for single-code consumers
+    preview_ready = pyqtSignal(QImage)  # Scaled frame ready to paint
     error_occurred = pyqtSignal(str)
     scanner_status = pyqtSignal(str)
+    decoder_selected = pyqtSignal(str)  # Backend chosen by calibration
     
-    def __init__(self, camera_index=0, scan_timeout=30):
+    def __init__(self, camera_index=0, scan_timeout=30, decode=None, source=None):
         super().__init__()
         self.camera_index = camera_index
+        self.source = source  # Any FrameSource; the camera when not given
         self.scan_timeout = scan_timeout
         self.running = False
+        self.stop_requested = False  # Set by stop_scanning, also while the camera is still opening
         self.paused = False
-        self.last_barcode = ""
-        self.last_scan_time = 0
+        self.recent_codes = {}  # barcode -> time it was last in view
         self.duplicate_prevention_time = 2  # seconds
         
+        # Tray mode: a basket laid out under a fixed camera is read as a whole
+        self.tray_mode = False
+        self.tray_mode_requested = False  # Set from the GUI thread, applied by the scan loop
+        self.tray_seen = Counter()    # Most copies of each code in one frame since the scene moved
+        self.tray_types = {}
+        self.tray_decoded = False     # Some frame was decoded since the scene moved
+        self.tray_billed = Counter()  # Copies already emitted for the tray in view
+        
+        # Frames are shared through the ring buffer, never copied per frame
+        self.frame_buffer = FrameRingBuffer()
+        
         # Scanner settings
         self.settings = self.load_scanner_settings()
+        
+        # Decoder backend from settings, calibrated on first start on this machine
+        self.pool = None  # Decode pool shared with other cameras of the lane
+        self.decoder_backend, calibrate = selected_backend(self.settings)
+        self.calibration = BackendCalibration() if calibrate and decode is None else None
+        
+        # Motion-gated decoding instead of a fixed every-nth-frame cadence
+        self.decode_scheduler = DecodeScheduler(decode or create_backend(self.decoder_backend))
+        self.latency = get_scan_latency()
+        
+        # Preview is scaled here, off the GUI thread, at a capped rate
+        self.preview_enabled = True
+        self.preview_pending = False  # Only one preview image in flight at a time
+        self.preview_size = (0, 0)
+        self.preview_interval = 1.0 / 15
+        self.next_preview_time = 0.0
     
     def load_scanner_settings(self):
         """Load scanner settings"""
@@ -54,69 +94,96 @@ class AutoBarcodeScanner(QThread):
     def run(self):
         """Main scanning loop"""
         try:
-            # Initialize camera
-            cap = cv2.VideoCapture(self.camera_index)
+            # Initialize camera or recording
+            cap = self.source or CameraSource(self.camera_index)
             
-            if not cap.isOpened():
-                self.error_occurred.emit(f"Could not open camera {self.camera_index}")
+            if not cap.open():
+                self.error_occurred.emit(f"Could not open {cap.name}")
+                return
+            if self.stop_requested:
+                # Stopped while the camera was opening, which can take seconds
+                cap.release()
                 return
-            
-            # Set camera properties for better scanning
-            cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-            cap.set(cv2.CAP_PROP_FPS, 30)
             
             self.running = True
             self.scanner_status.emit("Scanner started - Point camera at barcode")
             
-            frame_count = 0
+            self.decode_scheduler.reset()
             
-            while self.running:
+            while self.running and not self.stop_requested:
                 if self.paused:
-                    self.msleep(100)
+                    # Cameras stay open and drained, so resuming is instant
+                    if not cap.grab():
+                        self.msleep(100)
                     continue
                 
-                ret, frame = cap.read()
+                index, slot = self.frame_buffer.acquire_write()
+                if slot is None:
+                    # First frame tells us the size to allocate
+                    ret, frame = cap.read()
+                    if ret:
+                        self.frame_buffer.allocate(frame.shape, frame.dtype)
+                    elif cap.finished:
+                        break
+                    else:
+                        self.msleep(50)
+                    continue
+                
+                # Capture straight into the preallocated slot
+                ret, frame = cap.read(slot)
                 
                 if not ret:
+                    if cap.finished:
+                        break  # End of a recording
                     self.msleep(50)
                     continue
                 
-                # Emit frame for display
-                self.frame_ready.emit(frame.copy())
-                
-                # Process every 3rd frame for performance
-                frame_count += 1
-                if frame_count % 3 != 0:
-                    self.msleep(33)  # ~30 FPS
+                if frame.shape != slot.shape:
+                    # Camera changed resolution - reallocate on next pass
+                    self.frame_buffer.allocate(frame.shape, frame.dtype)
                     continue
+                if frame is not slot:
+                    np.copyto(slot, frame)
                 
-                # Decode barcodes
-                barcodes = pyzbar.decode(frame)
+                frame_time = time.monotonic()
+                self.frame_buffer.publish(index)
                 
-                for barcode in barcodes:
-                    barcode_data = barcode.data.decode('utf-8')
-                    barcode_type = barcode.type
-                    
-                    # Check for duplicate prevention
-                    current_time = datetime.now().timestamp()
-                    if (self.settings.get('duplicate_prevention', True) and 
-                        barcode_data == self.last_barcode and 
-                        current_time - self.last_scan_time < self.duplicate_prevention_time):
-                        continue
-                    
-                    # Valid new barcode detected
-                    self.last_barcode = barcode_data
-                    self.last_scan_time = current_time
-                    
-                    self.barcode_detected.emit(barcode_data, barcode_type)
-                    self.scanner_status.emit(f"Barcode detected: {barcode_data}")
-                    
-                    # Brief pause after detection
-                    self.msleep(500)
-                    break
+                # Hand the GUI a ready-to-paint image when the preview is due
+                now = time.monotonic()
+                if self.preview_enabled and not self.preview_pending and now >= self.next_preview_time:
+                    image = self.render_preview(slot)
+                    if image is not None:
+                        self.next_preview_time = now + self.preview_interval
+                        self.preview_pending = True
+                        self.preview_ready.emit(image)
                 
-                self.msleep(33)  # ~30 FPS
+                # Only decode when the scene changed, cheapest attempt first;
+                # cap.read() already paces the loop at the source frame rate
+                skipped = self.decode_scheduler.stats['skipped']
+                detections = self.decode_scheduler.process(slot)
+                decoded_time = time.monotonic()
+                
+                if (self.calibration is not None and self.decode_scheduler.stats['skipped'] == skipped
+                        and self.calibration.add_frame(slot)):
+                    self.finish_calibration()
+                
+                if self.tray_mode != self.tray_mode_requested:
+                    self.apply_tray_mode(self.tray_mode_requested)
+                
+                if self.tray_mode:
+                    batch = self.collect_tray(detections, self.decode_scheduler.stats['skipped'] != skipped)
+                else:
+                    batch = self.new_codes(detections, decoded_time)
+                
+                if batch:
+                    for barcode_data, barcode_type in batch:
+                        self.latency.begin(barcode_data, frame_time, decoded_time)
+                    self.barcodes_detected.emit(batch)
+                    for barcode_data, barcode_type in batch:
+                        self.barcode_detected.emit(barcode_data, barcode_type)
+                    
+                    codes = ", ".join(sorted({barcode_data for barcode_data, barcode_type in batch}))
+                    self.scanner_status.emit(f"Barcode detected: {codes}")
             
             cap.release()
             self.scanner_status.emit("Scanner stopped")
@@ -124,8 +191,133 @@ class AutoBarcodeScanner(QThread):
         except Exception as e:
             self.error_occurred.emit(f"Scanner error: {str(e)}")
     
+    def new_codes(self, detections, now):
+        """Codes of a frame not seen within the duplicate prevention time
+        
+        Every code has its own entry, so alternating two products or
+        holding several up at once cannot defeat the dedupe. A code held
+        in view keeps refreshing its entry and is only added once.
+        """
+        batch = []
+        dedupe = self.settings.get('duplicate_prevention', True)
+        for detection in detections:
+            last_seen = self.recent_codes.get(detection.data)
+            self.recent_codes[detection.data] = now
+            if dedupe and last_seen is not None and now - last_seen < self.duplicate_prevention_time:
+                continue
+            if (detection.data, detection.type) not in batch:
+                batch.append((detection.data, detection.type))
+        
+        if len(self.recent_codes) > 256:
+            self.recent_codes = {code: seen for code, seen in self.recent_codes.items()
+                                 if now - seen < self.duplicate_prevention_time}
+        return batch
+    
+    def collect_tray(self, detections, idle):
+        """Accumulate a basket while the scene settles, emit it once it is still
+        
+        Each code counts as many times as it appears in the best frame, so
+        two identical cans are two items. Only items beyond those already
+        emitted for the tray in view are emitted, so adding an item to the
+        tray adds just that item; a settled, empty tray starts a new basket.
+        """
+        if not idle:
+            self.tray_decoded = True
+            counts = Counter(detection.data for detection in detections)
+            for code, count in counts.items():
+                self.tray_seen[code] = max(self.tray_seen[code], count)
+            for detection in detections:
+                self.tray_types[detection.data] = detection.type
+            return []
+        
+        if not self.tray_decoded:
+            return []
+        
+        batch = []
+        if self.tray_seen:
+            added = self.tray_seen - self.tray_billed
+            batch = [(code, self.tray_types[code]) for code in added.elements()]
+            self.tray_billed |= self.tray_seen
+        else:
+            self.tray_billed.clear()
+        
+        self.tray_seen.clear()
+        self.tray_types.clear()
+        self.tray_decoded = False
+        return batch
+    
+    def set_tray_mode(self, enabled):
+        """Read whole baskets instead of one item at a time"""
+        self.tray_mode_requested = enabled
+    
+    def apply_tray_mode(self, enabled):
+        """Switch modes between two frames of the scan loop"""
+        self.tray_mode = enabled
+        self.decode_scheduler.full_scene = enabled
+        self.tray_seen.clear()
+        self.tray_types.clear()
+        self.tray_billed.clear()
+        self.tray_decoded = False
+    
+    def finish_calibration(self):
+        """Time every decoder backend on the collected frames and switch to the best"""
+        self.scanner_status.emit("Calibrating barcode decoders...")
+        backend = self.calibration.run()
+        if backend is not None:
+            self.set_decoder_backend(backend)
+            self.decoder_selected.emit(backend)
+            self.scanner_status.emit(f"Using {backend} decoder")
+        if self.calibration.done:
+            self.calibration = None
+    
+    def set_decoder_backend(self, backend):
+        """Decode with another backend from the next frame on"""
+        self.decoder_backend = backend
+        if self.pool is not None:
+            self.decode_scheduler.decode = PoolDecoder(self.pool, backend)
+        else:
+            self.decode_scheduler.decode = create_backend(backend)
+    
+    def render_preview(self, frame):
+        """Resize a frame to the preview size directly into a new QImage"""
+        width, height = self.preview_size
+        if width < 16 or height < 16:
+            return None
+        
+        frame_height, frame_width = frame.shape[:2]
+        scale = min(width / frame_width, height / frame_height)
+        # A width that is a multiple of 4 keeps QImage rows unpadded
+        target_width = max(4, int(frame_width * scale) // 4 * 4)
+        target_height = max(1, int(frame_height * scale))
+        
+        image = QImage(target_width, target_height, QImage.Format_BGR888)
+        bits = image.bits()
+        bits.setsize(image.byteCount())
+        view = np.ndarray((target_height, target_width, 3), np.uint8, buffer=bits)
+        
+        # OpenCV writes the BGR pixels straight into the image memory
+        cv2.resize(frame, (target_width, target_height), dst=view, interpolation=cv2.INTER_AREA)
+        return image
+    
+    def set_preview_rate(self, fps):
+        """Cap preview images per second; 0 turns the preview off"""
+        if fps <= 0:
+            self.preview_enabled = False
+        else:
+            self.preview_interval = 1.0 / fps
+            self.preview_enabled = True
+    
+    def set_preview_size(self, width, height):
+        """Size the preview images are scaled to"""
+        self.preview_size = (width, height)
+    
+    def start(self, *args):
+        self.stop_requested = False
+        super().start(*args)
+    
     def stop_scanning(self):
         """Stop the scanning process"""
+        self.stop_requested = True
         self.running = False
         self.wait()
     
@@ -140,21 +332,164 @@ class AutoBarcodeScanner(QThread):
         self.scanner_status.emit("Scanner resumed")
     
     def is_running(self):
-        """Check if scanner is running"""
-        return self.running and self.isRunning()
+        """Check if scanner is running or still opening its camera"""
+        return self.isRunning() and not self.stop_requested
+
+
+class MultiCameraScanner(QObject):
+    """Several cameras of one lane acting as a single scanner
+    
+    Every camera captures on its own AutoBarcodeScanner thread. With more
+    than one camera, decoding runs in a process pool so decoder work from
+    different cameras is not serialized by the GIL. A barcode seen by one
+    camera is ignored from the others for the duplicate prevention time,
+    so an item in view of both cameras reaches the cart once.
+    """
+    
+    barcodes_detected = pyqtSignal(list)  # [(barcode, barcode_type), ...] from one frame
+    barcode_detected = pyqtSignal(str, str)  # Each code of such a batch
+    preview_ready = pyqtSignal(QImage)  # Preview of the primary camera
+    error_occurred = pyqtSignal(str)
+    scanner_status = pyqtSignal(str)
+    
+    def __init__(self, camera_indexes, scan_timeout=30, parent=None):
+        super().__init__(parent)
+        self.pool = None
+        self.recent = {}  # barcode -> (time, camera_index) of the last emission
+        self.scanners = [AutoBarcodeScanner(camera_index=index, scan_timeout=scan_timeout)
+                         for index in (list(camera_indexes) or [0])]
+        self.primary = self.scanners[0]
+        self.duplicate_prevention_time = self.primary.duplicate_prevention_time
+        
+        for scanner in self.scanners:
+            scanner.barcodes_detected.connect(self.on_barcodes_detected)
+            scanner.error_occurred.connect(self.on_camera_error)
+        self.primary.preview_ready.connect(self.preview_ready)
+        self.primary.scanner_status.connect(self.scanner_status)
+        
+        # The primary camera calibrates the decoder for the whole lane
+        for scanner in self.scanners[1:]:
+            scanner.calibration = None
+        self.primary.decoder_selected.connect(self.on_decoder_selected)
+    
+    @property
+    def preview_pending(self):
+        return self.primary.preview_pending
+    
+    @preview_pending.setter
+    def preview_pending(self, pending):
+        self.primary.preview_pending = pending
+    
+    def start(self):
+        """Start the decode pool and every capture thread"""
+        if len(self.scanners) > 1 and self.pool is None:
+            try:
+                self.pool = multiprocessing.Pool(min(len(self.scanners), os.cpu_count() or 1))
+                for scanner in self.scanners:
+                    scanner.pool = self.pool
+                    scanner.set_decoder_backend(scanner.decoder_backend)
+            except Exception as e:
+                # Decoding falls back to each capture thread
+                print(f"Error starting decode pool: {e}")
+                self.pool = None
+        
+        for scanner in self.scanners:
+            scanner.start()
+    
+    def on_decoder_selected(self, backend):
+        """Switch the other cameras to the backend the primary calibrated"""
+        for scanner in self.scanners[1:]:
+            scanner.set_decoder_backend(backend)
+    
+    def stop_scanning(self):
+        """Stop every camera, then the decode pool"""
+        for scanner in self.scanners:
+            scanner.stop_requested = True
+            scanner.running = False
+        for scanner in self.scanners:
+            scanner.wait()
+        for scanner in self.scanners:
+            scanner.pool = None
+        
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+    
+    def pause_scanning(self):
+        """Pause every camera"""
+        for scanner in self.scanners:
+            scanner.pause_scanning()
+    
+    def resume_scanning(self):
+        """Resume every camera"""
+        for scanner in self.scanners:
+            scanner.resume_scanning()
+    
+    def is_running(self):
+        """Check if any camera is still scanning"""
+        return any(scanner.is_running() for scanner in self.scanners)
+    
+    def set_preview_rate(self, fps):
+        self.primary.set_preview_rate(fps)
+    
+    def set_tray_mode(self, enabled):
+        """Read whole baskets on every camera"""
+        for scanner in self.scanners:
+            scanner.set_tray_mode(enabled)
+    
+    def set_preview_size(self, width, height):
+        self.primary.set_preview_size(width, height)
+    
+    def on_barcodes_detected(self, batch):
+        """Pass a batch on without the codes another camera just reported"""
+        camera_index = self.sender().camera_index
+        now = time.monotonic()
+        
+        passed = []
+        for barcode, barcode_type in batch:
+            last = self.recent.get(barcode)
+            if last and last[1] != camera_index and now - last[0] < self.duplicate_prevention_time:
+                continue
+            self.recent[barcode] = (now, camera_index)
+            passed.append((barcode, barcode_type))
+        
+        if len(self.recent) > 64:
+            self.recent = {code: seen for code, seen in self.recent.items()
+                           if now - seen[0] < self.duplicate_prevention_time}
+        
+        if passed:
+            self.barcodes_detected.emit(passed)
+            for barcode, barcode_type in passed:
+                self.barcode_detected.emit(barcode, barcode_type)
+    
+    def on_camera_error(self, error):
+        """Only a failing primary camera stops the scanner"""
+        if self.sender() is self.primary:
+            self.error_occurred.emit(error)
+        else:
+            self.scanner_status.emit(error)
 
 
 class BarcodeScannerWidget(QWidget):
     """Widget for displaying camera feed and scanner controls"""
     
-    product_scanned = pyqtSignal(dict)  # Emit product data when found
+    products_scanned = pyqtSignal(list)  # [(Product, times scanned, scan times), ...] of one batch
+    product_scanned = pyqtSignal(object)  # Each Product of such a batch; connect one of the two
+    barcode_not_found = pyqtSignal(str)  # Emit barcodes that match no product
     
     def __init__(self, parent, database_connection):
         super().__init__(parent)
         self.parent = parent
         self.conn = database_connection
         self.scanner = None
+        self.resume_on_show = False  # Scanning was running when the widget was hidden
         self.settings = self.load_settings()
+        self.show_not_found_dialog = True  # Hosts in express mode handle it themselves
+        self.latency = get_scan_latency()
+        
+        # Scans arriving in a burst are looked up and emitted together
+        self.scan_queue = ScanQueue(self.search_products, parent=self)
         self.init_ui()
         
         # Auto-start scanner if enabled
@@ -174,7 +509,9 @@ class BarcodeScannerWidget(QWidget):
             'auto_scan_enabled': True,
             'camera_device': 'Default Camera (0)',
             'scan_timeout': 30,
-            'sound_enabled': True
+            'sound_enabled': True,
+            'preview_fps': 15,
+            'preview_idle_fps': 2
         }
     
     def init_ui(self):
@@ -253,6 +590,22 @@ class BarcodeScannerWidget(QWidget):
         controls_layout.addWidget(self.stop_btn)
         controls_layout.addStretch()
         
+        self.preview_btn = QPushButton("👁 Preview")
+        self.preview_btn.setCheckable(True)
+        self.preview_btn.setChecked(True)
+        self.preview_btn.setStyleSheet(button_style.replace("#4285f4", "#6c757d").replace("#3367d6", "#5a6268"))
+        self.preview_btn.toggled.connect(self.toggle_preview)
+        controls_layout.addWidget(self.preview_btn)
+        
+        # Tray mode reads a whole basket laid out under a fixed camera
+        self.tray_btn = QPushButton("🧺 Tray")
+        self.tray_btn.setCheckable(True)
+        self.tray_btn.setChecked(self.settings.get('tray_mode', False))
+        self.tray_btn.setToolTip("Add every item of a basket under the camera in one go")
+        self.tray_btn.setStyleSheet(button_style.replace("#4285f4", "#6c757d").replace("#3367d6", "#5a6268"))
+        self.tray_btn.toggled.connect(self.toggle_tray_mode)
+        controls_layout.addWidget(self.tray_btn)
+        
         # Last scanned info
         self.last_scan_label = QLabel("Last Scanned: None")
         self.last_scan_label.setStyleSheet("""
@@ -271,6 +624,47 @@ class BarcodeScannerWidget(QWidget):
         layout.addWidget(self.last_scan_label)
         
         self.setLayout(layout)
+        
+        # Preview rate follows visibility, size and window focus
+        self.camera_label.installEventFilter(self)
+        app = QApplication.instance()
+        app.applicationStateChanged.connect(self.update_preview_rate)
+        app.focusWindowChanged.connect(self.update_preview_rate)
+    
+    def toggle_preview(self, visible):
+        """Collapse or expand the camera preview"""
+        self.camera_label.setVisible(visible)
+        if not visible:
+            self.camera_label.clear()
+        self.update_preview_rate()
+    
+    def toggle_tray_mode(self, enabled):
+        """Switch between single items and whole baskets"""
+        if self.scanner:
+            self.scanner.set_tray_mode(enabled)
+        self.update_status("Tray mode - lay the basket out under the camera" if enabled
+                           else "Scanning single items")
+    
+    def update_preview_rate(self, *args):
+        """Pick the preview rate: full when focused, low when not, off when hidden"""
+        if not self.scanner:
+            return
+        
+        if not self.isVisible() or not self.camera_label.isVisible():
+            fps = 0
+        elif not self.window().isActiveWindow():
+            fps = self.settings.get('preview_idle_fps', 2)
+        else:
+            fps = self.settings.get('preview_fps', 15)
+        
+        self.scanner.set_preview_size(self.camera_label.width(), self.camera_label.height())
+        self.scanner.set_preview_rate(fps)
+    
+    def eventFilter(self, obj, event):
+        """Rescale the preview when the camera label is resized"""
+        if obj is self.camera_label and event.type() == QEvent.Resize:
+            self.update_preview_rate()
+        return super().eventFilter(obj, event)
     
     def start_scanner(self):
         """Start the barcode scanner"""
@@ -278,39 +672,33 @@ class BarcodeScannerWidget(QWidget):
             if self.scanner and self.scanner.is_running():
                 return
             
-            # Get camera index from settings
-            camera_text = self.settings.get('camera_device', 'Default Camera (0)')
-            if "0" in camera_text:
-                camera_index = 0
-            elif "1" in camera_text:
-                camera_index = 1
-            elif "2" in camera_text:
-                camera_index = 2
-            else:
-                camera_index = 0
-            
-            # Create and start scanner
-            self.scanner = AutoBarcodeScanner(
-                camera_index=camera_index,
+            # The shared session opens one capture thread per configured camera,
+            # or simply resumes when the cameras are still open
+            self.resume_on_show = False
+            self.scanner = get_camera_manager().acquire(
+                self,
+                configured_cameras(self.settings),
                 scan_timeout=self.settings.get('scan_timeout', 30)
             )
             
-            # Connect signals
-            self.scanner.barcode_detected.connect(self.on_barcode_detected)
-            self.scanner.frame_ready.connect(self.update_camera_display)
-            self.scanner.error_occurred.connect(self.on_scanner_error)
-            self.scanner.scanner_status.connect(self.update_status)
-            
-            self.scanner.start()
+            self.update_preview_rate()
+            self.scanner.set_tray_mode(self.tray_btn.isChecked())
             
             # Update UI
             self.start_btn.setEnabled(False)
             self.pause_btn.setEnabled(True)
             self.stop_btn.setEnabled(True)
+            self.reset_pause_button()
             
         except Exception as e:
             QMessageBox.critical(self, "Scanner Error", f"Failed to start scanner: {str(e)}")
     
+    def reset_pause_button(self):
+        """Show the pause action again"""
+        self.pause_btn.setText("⏸️ Pause")
+        self.pause_btn.clicked.disconnect()
+        self.pause_btn.clicked.connect(self.pause_scanner)
+    
     def pause_scanner(self):
         """Pause the scanner"""
         if self.scanner:
@@ -328,44 +716,48 @@ class BarcodeScannerWidget(QWidget):
             self.pause_btn.clicked.connect(self.pause_scanner)
     
     def stop_scanner(self):
-        """Stop the scanner"""
+        """Stop the scanner; the cameras stay open for a quick restart"""
+        self.resume_on_show = False
         if self.scanner:
-            self.scanner.stop_scanning()
+            get_camera_manager().release(self)
             self.scanner = None
         
         # Update UI
         self.start_btn.setEnabled(True)
         self.pause_btn.setEnabled(False)
         self.stop_btn.setEnabled(False)
-        self.pause_btn.setText("⏸️ Pause")
+        self.reset_pause_button()
         
         # Clear camera display
         self.camera_label.clear()
         self.camera_label.setText("Camera Feed\nScanner stopped")
     
-    def update_camera_display(self, frame):
-        """Update camera display with current frame"""
+    def update_camera_display(self, image):
+        """Paint a preview image already scaled by the scanner thread"""
+        if self.scanner:
+            self.scanner.preview_pending = False
+        
         try:
-            # Convert frame to Qt format
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            h, w, ch = rgb_frame.shape
-            bytes_per_line = ch * w
-            
-            qt_image = QImage(rgb_frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-            
-            # Scale to fit label
-            pixmap = QPixmap.fromImage(qt_image)
-            scaled_pixmap = pixmap.scaled(
-                self.camera_label.size(), 
-                Qt.KeepAspectRatio, 
-                Qt.SmoothTransformation
-            )
-            
-            self.camera_label.setPixmap(scaled_pixmap)
-            
+            if self.camera_label.isVisible():
+                self.camera_label.setPixmap(QPixmap.fromImage(image))
         except Exception as e:
             print(f"Error updating camera display: {e}")
     
+    def showEvent(self, event):
+        """Resume the preview when the widget becomes visible"""
+        super().showEvent(event)
+        if self.resume_on_show:
+            self.start_scanner()
+        self.update_preview_rate()
+    
+    def hideEvent(self, event):
+        """Hand the cameras back while another screen is shown"""
+        super().hideEvent(event)
+        if self.scanner:
+            get_camera_manager().release(self)
+            self.scanner = None
+            self.resume_on_show = True
+    
     def update_status(self, status):
         """Update status label"""
         self.status_label.setText(f"Scanner Status: {status}")
@@ -378,45 +770,77 @@ class BarcodeScannerWidget(QWidget):
     
     def on_barcode_detected(self, barcode, barcode_type):
         """Handle barcode detection"""
-        self.last_scan_label.setText(f"Last Scanned: {barcode} ({barcode_type})")
+        self.on_barcodes_detected([(barcode, barcode_type)])
+    
+    def on_barcodes_detected(self, batch):
+        """Handle every code found in one frame or tray"""
+        for barcode, barcode_type in batch:
+            self.latency.mark(barcode, 'received')
+        
+        barcode, barcode_type = batch[-1]
+        if len(batch) == 1:
+            self.last_scan_label.setText(f"Last Scanned: {barcode} ({barcode_type})")
+        else:
+            self.last_scan_label.setText(f"Last Scanned: {len(batch)} items, last {barcode} ({barcode_type})")
         
         # Play sound if enabled
         if self.settings.get('sound_enabled', True):
             self.play_scan_sound()
         
-        # Search for product in database
-        self.search_product(barcode)
+        # Search for the products in database
+        self.scan_queue.push_many(barcode for barcode, barcode_type in batch)
     
     def search_product(self, barcode):
         """Search for product by barcode"""
+        self.scan_queue.push(barcode)
+    
+    def search_products(self, scans):
+        """Look up queued (barcode, count, scan_times) scans in one query"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute('SELECT * FROM products WHERE code_bar = ?', (barcode,))
-            product = cursor.fetchone()
+            counts = {barcode: count for barcode, count, scan_times in scans}
+            times = {barcode: scan_times for barcode, count, scan_times in scans}
+            codes = list(counts)
+            placeholders = ", ".join("?" for _ in codes)
+            cursor = product_cursor(self.conn)
+            cursor.execute(f'SELECT * FROM products WHERE code_bar IN ({placeholders})', codes)
+            found = {}
+            for product in cursor.fetchall():
+                found.setdefault(product.code_bar, product)
             
-            if product:
-                # Convert to dict for easier handling
-                product_dict = {
-                    'id': product[0],
-                    'name': product[1],
-                    'code_bar': product[2],
-                    'price_buy': product[3],
-                    'price_sell': product[4],
-                    'quantity': product[5],
-                    'category': product[6] if len(product) > 6 else 'General'
-                }
-                
-                # Emit product found signal
-                self.product_scanned.emit(product_dict)
+            products = []
+            missing = []
+            for barcode in codes:
+                self.latency.mark(barcode, 'looked_up')
+                if barcode not in found:
+                    # Product not found
+                    self.latency.discard(barcode)
+                    missing.append(barcode)
+            
+            for barcode in codes:
+                product = found.get(barcode)
+                if product:
+                    products.append((product, counts[barcode], times[barcode]))
+            
+            if products:
+                # Emit product found signals
+                self.products_scanned.emit(products)
+                for product, count, scan_times in products:
+                    self.product_scanned.emit(product)
                 
                 # Update status
-                self.status_label.setText(f"Product Found: {product[1]}")
-                
-            else:
-                # Product not found
-                self.status_label.setText(f"Product not found: {barcode}")
-                QMessageBox.information(self, "Product Not Found", 
-                                      f"No product found with barcode: {barcode}")
+                items = sum(count for product, count, scan_times in products)
+                if items == 1:
+                    self.status_label.setText(f"Product Found: {products[0][0].name}")
+                else:
+                    self.status_label.setText(f"Products Found: {items} items")
+            
+            if missing:
+                self.status_label.setText(f"Product not found: {', '.join(missing)}")
+                for barcode in missing:
+                    self.barcode_not_found.emit(barcode)
+                if self.show_not_found_dialog:
+                    QMessageBox.information(self, "Product Not Found", 
+                                          f"No product found with barcode: {', '.join(missing)}")
                 
         except Exception as e:
             print(f"Error searching product: {e}")
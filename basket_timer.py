@@ -0,0 +1,53 @@
+"""
+Basket Timer for POS System
+Scan and item times of the basket being rung up
+"""
+
+import time
+
+
+class BasketTimer:
+    """Wall-clock times of the scans and items that went into the current cart
+
+    The POS screens call item_added() for every item put in the cart by
+    any means, scan() when a scanned code reaches the cart, and reset()
+    when the cart is paid or cleared.
+    """
+
+    def __init__(self):
+        self.scan_times = []
+        self.started = None    # First item of the basket
+        self.last_item = None  # Latest item of the basket
+
+    def item_added(self, when=None):
+        when = time.time() if when is None else when
+        # Queued scans are recorded after the items they added, so keep the extremes
+        if self.started is None or when < self.started:
+            self.started = when
+        if self.last_item is None or when > self.last_item:
+            self.last_item = when
+
+    def scan(self, when=None):
+        when = time.time() if when is None else when
+        self.scan_times.append(when)
+        self.item_added(when)
+
+    def reset(self):
+        self.scan_times = []
+        self.started = None
+        self.last_item = None
+
+    def intervals(self):
+        """Seconds between consecutive scans"""
+        return [later - earlier for earlier, later in zip(self.scan_times, self.scan_times[1:])]
+
+    @property
+    def first_scan(self):
+        return self.scan_times[0] if self.scan_times else None
+
+    @property
+    def last_scan(self):
+        return self.scan_times[-1] if self.scan_times else None
+
+    def __len__(self):
+        return len(self.scan_times)
@@ -0,0 +1,200 @@
+"""
+Camera Manager for POS System
+Keeps the camera session open across screens and finds camera devices in the background
+"""
+
+from collections import namedtuple
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+
+
+MAX_CAMERAS = 5  # Device indexes probed by discovery
+IDLE_RELEASE_MS = 5 * 60 * 1000  # Close the cameras after this long without a consumer
+
+CameraDevice = namedtuple('CameraDevice', ['index', 'name', 'working'])
+
+
+class CameraDiscovery(QThread):
+    """Probe camera indexes once, off the GUI thread
+
+    Opening a USB camera can take a second each, so the settings screen
+    and the scanner never do it on the GUI thread. Cameras held by the
+    scanner session are reported as working without being reopened.
+    """
+
+    devices_found = pyqtSignal(list)  # CameraDevice for every index that opened
+
+    def __init__(self, indexes, in_use=(), parent=None):
+        super().__init__(parent)
+        self.indexes = list(indexes)
+        self.in_use = set(in_use)
+
+    def run(self):
+        try:
+            import cv2
+        except ImportError:
+            self.devices_found.emit([])
+            return
+
+        devices = []
+        for index in self.indexes:
+            if index in self.in_use:
+                devices.append(CameraDevice(index, f"Camera {index}", True))
+                continue
+            cap = cv2.VideoCapture(index)
+            try:
+                if cap.isOpened():
+                    ret, _ = cap.read()
+                    devices.append(CameraDevice(index, f"Camera {index}", bool(ret)))
+            except Exception as e:
+                print(f"Error probing camera {index}: {e}")
+            finally:
+                cap.release()
+        self.devices_found.emit(devices)
+
+
+class CameraManager(QObject):
+    """One scanner session for the whole application
+
+    The first BarcodeScannerWidget to start scanning opens the cameras;
+    stopping, pausing or leaving the screen only pauses the capture
+    threads, which keep draining the cameras so that resuming shows a
+    current frame at once. Detections, previews and status messages go to
+    whichever widget acquired the session last. The cameras are closed
+    after IDLE_RELEASE_MS without a consumer, or when the lane's camera
+    set changes.
+    """
+
+    devices_changed = pyqtSignal(list)  # CameraDevice list after a discovery
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.scanner = None
+        self.session_cameras = ()
+        self.consumer = None
+        self.devices = None  # None until the first discovery finished
+        self.discovery = None
+
+        self.idle_timer = QTimer(self)
+        self.idle_timer.setSingleShot(True)
+        self.idle_timer.setInterval(IDLE_RELEASE_MS)
+        self.idle_timer.timeout.connect(self.close_session)
+
+    # Device discovery
+    def discover(self, force=False):
+        """Enumerate cameras in the background; devices_changed follows"""
+        if self.discovery is not None and self.discovery.isRunning():
+            return
+        if self.devices is not None and not force:
+            self.devices_changed.emit(list(self.devices))
+            return
+
+        in_use = self.session_cameras if self.scanner is not None else ()
+        self.discovery = CameraDiscovery(range(MAX_CAMERAS), in_use, self)
+        self.discovery.devices_found.connect(self.on_devices_found)
+        self.discovery.start()
+
+    def on_devices_found(self, devices):
+        self.devices = devices
+        self.devices_changed.emit(list(devices))
+
+    # Scanner session
+    def acquire(self, consumer, camera_indexes, scan_timeout=30):
+        """Hand the scanner session to a widget, opening the cameras if needed
+
+        The consumer receives on_barcodes_detected, update_camera_display,
+        update_status and on_scanner_error calls.
+        """
+        camera_indexes = tuple(camera_indexes) or (0,)
+        if self.scanner is not None and (camera_indexes != self.session_cameras
+                                         or not self.scanner.is_running()):
+            self.close_session()
+
+        self.set_consumer(consumer)
+        self.idle_timer.stop()
+
+        if self.scanner is None:
+            from barcode_scanner_enhanced import MultiCameraScanner
+            self.scanner = MultiCameraScanner(camera_indexes, scan_timeout=scan_timeout, parent=self)
+            self.scanner.barcodes_detected.connect(self.on_barcodes_detected)
+            self.scanner.preview_ready.connect(self.on_preview_ready)
+            self.scanner.error_occurred.connect(self.on_scanner_error)
+            self.scanner.scanner_status.connect(self.on_scanner_status)
+            self.session_cameras = camera_indexes
+            self.scanner.start()
+        else:
+            self.scanner.preview_pending = False  # The last preview may have gone to a deleted widget
+            self.scanner.resume_scanning()
+        return self.scanner
+
+    def release(self, consumer):
+        """Pause the session when its consumer stops or leaves the screen"""
+        if consumer is not self.consumer:
+            return
+        self.set_consumer(None)
+        if self.scanner is not None:
+            self.scanner.pause_scanning()
+            self.scanner.set_preview_rate(0)
+            self.idle_timer.start()
+
+    def set_consumer(self, consumer):
+        if self.consumer is not None:
+            try:
+                self.consumer.destroyed.disconnect(self.on_consumer_destroyed)
+            except (TypeError, RuntimeError):
+                pass
+        self.consumer = consumer
+        if consumer is not None:
+            consumer.destroyed.connect(self.on_consumer_destroyed)
+
+    def on_consumer_destroyed(self, *args):
+        """The screen holding the session was deleted without stopping it"""
+        self.consumer = None
+        if self.scanner is not None:
+            self.scanner.pause_scanning()
+            self.scanner.set_preview_rate(0)
+            self.idle_timer.start()
+
+    def close_session(self):
+        """Stop the capture threads and close the cameras"""
+        self.idle_timer.stop()
+        if self.scanner is not None:
+            scanner, self.scanner = self.scanner, None
+            scanner.stop_scanning()
+            scanner.deleteLater()
+        self.session_cameras = ()
+
+    # Routing to the active consumer
+    def on_barcodes_detected(self, batch):
+        if self.consumer is not None:
+            self.consumer.on_barcodes_detected(batch)
+
+    def on_preview_ready(self, image):
+        if self.consumer is not None:
+            self.consumer.update_camera_display(image)
+        elif self.scanner is not None:
+            self.scanner.preview_pending = False
+
+    def on_scanner_status(self, status):
+        if self.consumer is not None:
+            self.consumer.update_status(status)
+
+    def on_scanner_error(self, error):
+        """A failed session is closed; the consumer decides what to tell the user"""
+        consumer = self.consumer
+        self.set_consumer(None)
+        self.close_session()
+        if consumer is not None:
+            consumer.on_scanner_error(error)
+
+
+_camera_manager = None
+
+
+def get_camera_manager():
+    """Get the application-wide camera manager"""
+    global _camera_manager
+    if _camera_manager is None:
+        _camera_manager = CameraManager(QCoreApplication.instance())
+    return _camera_manager
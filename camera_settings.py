@@ -0,0 +1,38 @@
+"""
+Camera Settings for POS System
+Reads the camera devices configured for a lane from app_settings.json values
+"""
+
+import re
+
+
+DEFAULT_CAMERA_DEVICE = 'Default Camera (0)'
+
+
+def camera_index_from_setting(value, default=0):
+    """Camera index from a setting such as 'USB Camera (1)', '1' or 1"""
+    if isinstance(value, int):
+        return value
+    match = re.search(r'\((\d+)\)\s*$', str(value)) or re.search(r'(\d+)', str(value))
+    return int(match.group(1)) if match else default
+
+
+def parse_camera_list(text):
+    """Camera indexes from comma separated text, ignoring anything else"""
+    indexes = []
+    for part in str(text).split(','):
+        part = part.strip()
+        if part.isdigit() and int(part) not in indexes:
+            indexes.append(int(part))
+    return indexes
+
+
+def configured_cameras(settings):
+    """Every camera of the lane, primary first; the primary shows the preview"""
+    primary = camera_index_from_setting((settings or {}).get('camera_device', DEFAULT_CAMERA_DEVICE))
+    cameras = [primary]
+    for index in (settings or {}).get('extra_cameras', []):
+        index = camera_index_from_setting(index, -1)
+        if index >= 0 and index not in cameras:
+            cameras.append(index)
+    return cameras
@@ -0,0 +1,108 @@
+"""
+Catalog Events for POS System
+Broadcasts product changes so open screens can update in place
+"""
+
+from PyQt5.QtCore import *
+from product_record import product_cursor
+
+
+class CatalogChange:
+    """Fine-grained diff of the products table
+
+    rows holds the current row of every inserted or updated product as a
+    Product record, readable by column or by position. updated maps each
+    edited product id to the set of columns that actually changed.
+    """
+
+    def __init__(self, rows=None, inserted=None, updated=None, deleted=None):
+        self.rows = dict(rows or {})
+        self.inserted = set(inserted or ())
+        self.updated = dict(updated or {})
+        self.deleted = set(deleted or ())
+
+    def __bool__(self):
+        return bool(self.inserted or self.updated or self.deleted)
+
+    def __repr__(self):
+        return (f"CatalogChange(inserted={sorted(self.inserted)}, "
+                f"updated={self.updated}, deleted={sorted(self.deleted)})")
+
+    def changed_fields(self, product_id):
+        """Columns changed for a product (all columns if it was inserted)"""
+        if product_id in self.inserted:
+            row = self.rows.get(product_id)
+            return set(row.keys()) if row is not None else set()
+        return self.updated.get(product_id, set())
+
+    def row_tuple(self, product_id):
+        """Current row, indexable like a SELECT * FROM products tuple"""
+        return self.rows.get(product_id)
+
+
+class CatalogEvents(QObject):
+    """Application-wide hub for product change notifications"""
+
+    catalog_changed = pyqtSignal(object)  # CatalogChange
+
+    def publish(self, change):
+        """Announce a catalog change to every open screen"""
+        if change:
+            self.catalog_changed.emit(change)
+
+    def publish_inserted(self, conn, product_ids):
+        """Announce newly inserted products"""
+        rows = fetch_product_rows(conn, product_ids)
+        self.publish(CatalogChange(rows=rows, inserted=rows.keys()))
+
+    def publish_updated(self, conn, before_rows, fields=None):
+        """Announce edited products, diffing against rows read before the edit
+
+        When fields is given only those columns are compared.
+        """
+        rows = fetch_product_rows(conn, before_rows.keys())
+        updated = {}
+
+        for product_id, row in rows.items():
+            before = before_rows.get(product_id) or {}
+            columns = fields if fields is not None else row.keys()
+            changed = {column for column in columns if before.get(column) != row.get(column)}
+            if changed:
+                updated[product_id] = changed
+
+        self.publish(CatalogChange(rows={pid: rows[pid] for pid in updated}, updated=updated))
+
+    def publish_deleted(self, product_ids):
+        """Announce removed products"""
+        self.publish(CatalogChange(deleted=product_ids))
+
+    def publish_stock_changes(self, conn, before_rows):
+        """Announce new stock levels after a sale"""
+        self.publish_updated(conn, before_rows, fields=('quantity',))
+
+
+def fetch_product_rows(conn, product_ids):
+    """Read full product rows as {id: Product}"""
+    product_ids = list(set(product_ids))
+    if not product_ids:
+        return {}
+
+    try:
+        cursor = product_cursor(conn)
+        placeholders = ','.join('?' * len(product_ids))
+        cursor.execute(f'SELECT * FROM products WHERE id IN ({placeholders})', product_ids)
+        return {product.id: product for product in cursor.fetchall()}
+    except Exception as e:
+        print(f"Error reading product rows: {e}")
+        return {}
+
+
+_catalog_events = None
+
+
+def get_catalog_events():
+    """Get the application-wide catalog event hub"""
+    global _catalog_events
+    if _catalog_events is None:
+        _catalog_events = CatalogEvents(QCoreApplication.instance())
+    return _catalog_events
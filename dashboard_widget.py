@@ -4,19 +4,31 @@ from PyQt5.QtGui import *
 from datetime import datetime, timedelta
 import json
 import sqlite3
+from scheduler import get_scheduler
+from sales_chart import SalesChartWidget
+from catalog_events import get_catalog_events
+from top_sellers import get_top_sellers
+from sales_sketches import get_sales_sketches, METRICS, QUANTILES
+from lane_throughput import get_lane_throughput
 
 
 class DashboardWidget(QWidget):
     def __init__(self, parent):
         super().__init__()
         self.parent = parent
+        self.low_stock_rows = {}  # {product_id: (name, quantity, price)}
         self.init_ui()
         self.load_data()
         
-        # Auto-refresh timer
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.load_data)
-        self.timer.start(30000)  # Refresh every 30 seconds
+        # Keep the low stock list current between refreshes
+        get_catalog_events().catalog_changed.connect(self.apply_catalog_change)
+        
+        # Today's top products follow each sale without a query
+        get_top_sellers(self.parent.conn).updated.connect(self.refresh_top_sellers)
+        
+        # Auto-refresh every 30 seconds; paused while hidden, dropped when destroyed
+        get_scheduler().register_job(self, 30000, self.load_data,
+                                     name="dashboard_refresh", deferrable=True)
     
     def init_ui(self):
         main_layout = QVBoxLayout()
@@ -173,6 +185,39 @@ class DashboardWidget(QWidget):
         stock_group.setLayout(stock_layout)
         right_layout.addWidget(stock_group)
 
+        # Percentiles merged from the daily sales sketches
+        distribution_group = QGroupBox("BASKET DISTRIBUTION")
+        distribution_group.setStyleSheet(products_group.styleSheet())
+        distribution_layout = QVBoxLayout()
+
+        self.distribution_table = QTableWidget(len(METRICS), len(QUANTILES))
+        self.distribution_table.setHorizontalHeaderLabels([f"P{int(fraction * 100)}" for fraction in QUANTILES])
+        self.distribution_table.setVerticalHeaderLabels(list(METRICS.values()))
+        self.distribution_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.distribution_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.distribution_table.setStyleSheet(self.top_products_table.styleSheet())
+        distribution_layout.addWidget(self.distribution_table)
+        distribution_group.setLayout(distribution_layout)
+        right_layout.addWidget(distribution_group)
+
+        # Lane throughput from the running counters
+        throughput_group = QGroupBox("LANE THROUGHPUT")
+        throughput_group.setStyleSheet(products_group.styleSheet())
+        throughput_layout = QVBoxLayout()
+
+        self.throughput_table = QTableWidget()
+        self.throughput_table.setColumnCount(6)
+        self.throughput_table.setHorizontalHeaderLabels(["LANE", "BASKETS", "ITEMS/MIN", "SEC/BASKET",
+                                                         "SCAN→PAY (S)", "IDLE (MIN)"])
+        self.throughput_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.throughput_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.throughput_table.verticalHeader().setVisible(False)
+        self.throughput_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.throughput_table.setStyleSheet(self.top_products_table.styleSheet())
+        throughput_layout.addWidget(self.throughput_table)
+        throughput_group.setLayout(throughput_layout)
+        right_layout.addWidget(throughput_group)
+
         right_panel.setLayout(right_layout)
 
         # Add panels to splitter
@@ -290,13 +335,39 @@ class DashboardWidget(QWidget):
     def create_sales_chart(self):
         """Create responsive sales chart"""
         chart_widget = QWidget()
-        chart_widget.setMinimumHeight(80)   #--------------------------------------------------------------------------------------------------------------#
+        chart_widget.setMinimumHeight(80)
         chart_widget.setStyleSheet("background: #f8f9fa; border-radius: 6px;")
-        #--------------------------------------------------------------------------------------------------------------#
+
         self.chart_container = QVBoxLayout()
         self.chart_container.setContentsMargins(10, 10, 10, 10)
         self.chart_container.setSpacing(5)
-        
+
+        # Labels and chart are created once; refreshes only update their data
+        self.chart_info_label = QLabel("Sales Trend")
+        self.chart_info_label.setStyleSheet("""
+            font-size: 14px;
+            font-weight: 600;
+            color: #495057;
+            margin-bottom: 10px;
+        """)
+        self.chart_info_label.setAlignment(Qt.AlignCenter)
+
+        self.chart_stats_label = QLabel("")
+        self.chart_stats_label.setStyleSheet("""
+            font-size: 12px;
+            color: #6c757d;
+            margin-bottom: 15px;
+        """)
+        self.chart_stats_label.setAlignment(Qt.AlignCenter)
+
+        self.sales_chart_view = SalesChartWidget()
+        self.sales_chart_view.setMinimumHeight(180)
+        self.sales_chart_view.setStyleSheet("background: white; border: 1px solid #e9ecef;")
+
+        self.chart_container.addWidget(self.chart_info_label)
+        self.chart_container.addWidget(self.chart_stats_label)
+        self.chart_container.addWidget(self.sales_chart_view)
+
         chart_widget.setLayout(self.chart_container)
         return chart_widget
     
@@ -368,7 +439,9 @@ class DashboardWidget(QWidget):
             """)
         
         # Load detailed data
-        self.load_top_products(date_filter)
+        self.load_top_products(date_filter, period)
+        self.load_distributions(date_filter)
+        self.load_throughput(date_filter)
         self.load_low_stock_alerts()
         self.load_chart_data(period)
     
@@ -386,8 +459,14 @@ class DashboardWidget(QWidget):
         else:  # All Time
             return None
     
-    def load_top_products(self, date_filter):
+    def load_top_products(self, date_filter, period=None):
         """Load top selling products with full names"""
+        if period == "Today":
+            # Kept current by the streaming counters, no scan of the tickets
+            sellers = get_top_sellers(self.parent.conn).top('today', 10)
+            self.show_top_products([(seller.name, seller.quantity, seller.revenue) for seller in sellers])
+            return
+        
         cursor = self.parent.conn.cursor()
         
         if date_filter:
@@ -414,7 +493,10 @@ class DashboardWidget(QWidget):
                 LIMIT 10
             """)
         
-        products = cursor.fetchall()
+        self.show_top_products(cursor.fetchall())
+    
+    def show_top_products(self, products):
+        """Fill the top products table from (name, quantity, revenue) rows"""
         self.top_products_table.setRowCount(len(products))
         
         for row, (name, quantity, revenue) in enumerate(products):
@@ -433,17 +515,64 @@ class DashboardWidget(QWidget):
             revenue_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
             self.top_products_table.setItem(row, 2, revenue_item)
     
+    def refresh_top_sellers(self):
+        """Redraw today's top products after a sale"""
+        try:
+            if self.date_range_combo.currentText() == "Today":
+                self.load_top_products(None, "Today")
+        except RuntimeError:
+            pass  # Widget already deleted
+        except Exception as e:
+            print(f"Error refreshing top products: {e}")
+    
+    def load_distributions(self, date_filter):
+        """Show p50/p90/p99 of the basket metrics for the period"""
+        sketches = get_sales_sketches(self.parent.conn)
+        for row, metric in enumerate(METRICS):
+            count, values = sketches.quantiles(metric, since=date_filter)
+            for col, value in enumerate(values):
+                if value is None:
+                    text = "-"
+                elif metric == 'basket_items':
+                    text = f"{value:g}"
+                else:
+                    text = f"{value:.2f}"
+                item = QTableWidgetItem(text)
+                item.setTextAlignment(Qt.AlignCenter)
+                item.setToolTip(f"{count:,} values")
+                self.distribution_table.setItem(row, col, item)
+    
+    def load_throughput(self, date_filter):
+        """Show items per minute, basket time, payment time and idle time per lane"""
+        lanes = get_lane_throughput(self.parent.conn).summary('lane', since=date_filter)
+        self.throughput_table.setRowCount(len(lanes))
+        
+        for row, lane in enumerate(lanes):
+            values = [lane.key, f"{lane.baskets:,}", f"{lane.items_per_minute:.1f}",
+                      f"{lane.seconds_per_basket:.0f}", f"{lane.pay_seconds:.0f}", f"{lane.idle_minutes:.0f}"]
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if col:
+                    item.setTextAlignment(Qt.AlignCenter)
+                self.throughput_table.setItem(row, col, item)
+            self.throughput_table.item(row, 5).setToolTip(
+                f"{lane.idle_gaps:,} gaps, longest {lane.longest_idle / 60:.1f} min")
+    
     def load_low_stock_alerts(self):
         """Load specific low stock items with details"""
         cursor = self.parent.conn.cursor()
         cursor.execute("""
-            SELECT name, quantity, price_sell 
+            SELECT id, name, quantity, price_sell 
             FROM products 
             WHERE quantity < 10
-            ORDER BY quantity ASC, name ASC
         """)
         
-        items = cursor.fetchall()
+        self.low_stock_rows = {row[0]: row[1:] for row in cursor.fetchall()}
+        self.show_low_stock_alerts()
+    
+    def show_low_stock_alerts(self):
+        """Fill the low stock list from the cached rows"""
+        items = sorted(self.low_stock_rows.values(), key=lambda row: (row[1], row[0]))
         self.low_stock_list.clear()
         
         if not items:
@@ -464,103 +593,92 @@ class DashboardWidget(QWidget):
                 item_text = f"{icon} {name} - {quantity} units left ({status}) - {price:.2f} DA"
                 self.low_stock_list.addItem(item_text)
     
+    def apply_catalog_change(self, change):
+        """Update the low stock list from a catalog diff without querying"""
+        try:
+            changed = False
+            
+            for product_id in change.deleted:
+                changed |= self.low_stock_rows.pop(product_id, None) is not None
+            
+            for product_id, row in change.rows.items():
+                if row['quantity'] < 10:
+                    self.low_stock_rows[product_id] = (row['name'], row['quantity'], row['price_sell'])
+                    changed = True
+                else:
+                    changed |= self.low_stock_rows.pop(product_id, None) is not None
+            
+            if changed:
+                self.show_low_stock_alerts()
+                self.low_stock_card.value_label.setText(str(len(self.low_stock_rows)))
+                
+        except RuntimeError:
+            pass  # Widget already deleted
+        except Exception as e:
+            print(f"Error applying catalog change: {e}")
+    
     def load_chart_data(self, period):
-        """Load chart data with improved visualization"""
+        """Load chart data with one grouped query per refresh"""
         cursor = self.parent.conn.cursor()
+        now = datetime.now()
         
         # Get sales data based on period
         if period == "Today":
             # Hourly data for today
-            chart_data = []
-            today = datetime.now().strftime("%Y-%m-%d")
-            for hour in range(24):
-                hour_start = f"{today} {hour:02d}:00:00"
-                hour_end = f"{today} {hour:02d}:59:59"
-                cursor.execute("""
-                    SELECT COALESCE(SUM(total_price), 0)
-                    FROM tickets 
-                    WHERE date >= ? AND date <= ?
-                """, (hour_start, hour_end))
-                amount = cursor.fetchone()[0]
-                chart_data.append((f"{hour:02d}:00", amount))
+            today = now.strftime("%Y-%m-%d")
+            cursor.execute("""
+                SELECT CAST(substr(date, 12, 2) AS INTEGER), COALESCE(SUM(total_price), 0)
+                FROM tickets 
+                WHERE date >= ? AND date < ?
+                GROUP BY 1
+            """, (today, (now + timedelta(days=1)).strftime("%Y-%m-%d")))
+            totals = dict(cursor.fetchall())
+            chart_data = [(f"{hour:02d}:00", totals.get(hour, 0)) for hour in range(24)]
         else:
-            # Daily data for last 7 days
+            # Daily data - last 7 days for the week, the whole range otherwise
+            if period == "This Month":
+                start = now.replace(day=1)
+            elif period == "All Time":
+                cursor.execute("SELECT MIN(date) FROM tickets")
+                first_date = cursor.fetchone()[0]
+                try:
+                    start = datetime.strptime(first_date[:10], "%Y-%m-%d")
+                except (TypeError, ValueError):
+                    start = now
+            else:
+                start = now - timedelta(days=6)
+            start = min(start, now - timedelta(days=6))
+            
+            cursor.execute("""
+                SELECT substr(date, 1, 10), COALESCE(SUM(total_price), 0)
+                FROM tickets 
+                WHERE date >= ?
+                GROUP BY 1
+            """, (start.strftime("%Y-%m-%d"),))
+            totals = dict(cursor.fetchall())
+            
+            day_count = (now.date() - start.date()).days + 1
+            label_format = "%a" if day_count <= 7 else "%Y-%m-%d"
             chart_data = []
-            for i in range(7):
-                date = (datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d")
-                cursor.execute("""
-                    SELECT COALESCE(SUM(total_price), 0)
-                    FROM tickets 
-                    WHERE date LIKE ?
-                """, (f"{date}%",))
-                amount = cursor.fetchone()[0]
-                day_name = (datetime.now() - timedelta(days=i)).strftime("%a")
-                chart_data.append((day_name, amount))
-        
-        self.chart_data = list(reversed(chart_data))
+            for i in range(day_count):
+                day = start + timedelta(days=i)
+                chart_data.append((day.strftime(label_format),
+                                   totals.get(day.strftime("%Y-%m-%d"), 0)))
+        
+        self.chart_data = chart_data
         self.update_chart(period)
     
     def update_chart(self, period):
-        """Update the chart with improved visualization"""
-        if not self.chart_data:
-            return
-        
-        # Clear existing layout
-        if self.sales_chart.layout():
-            QWidget().setLayout(self.sales_chart.layout())
-        
-        layout = QVBoxLayout()
-        
-        # Chart title
-        chart_info = QLabel(f"Sales Trend - {period}")
-        chart_info.setStyleSheet("""
-            font-size: 14px;
-            font-weight: 600;
-            color: #495057;
-            margin-bottom: 10px;
-        """)
-        chart_info.setAlignment(Qt.AlignCenter)
-        
-        # Improved visual chart
-        max_amount = max(amount for _, amount in self.chart_data) if self.chart_data else 1
+        """Push the latest series into the chart without rebuilding widgets"""
+        max_amount = max((amount for _, amount in self.chart_data), default=0)
         total_sales = sum(amount for _, amount in self.chart_data)
         
-        # Summary stats
-        stats_label = QLabel(f"Total: {total_sales:.2f} DA | Peak: {max_amount:.2f} DA")
-        stats_label.setStyleSheet("""
-            font-size: 12px;
-            color: #6c757d;
-            margin-bottom: 15px;
-        """)
-        stats_label.setAlignment(Qt.AlignCenter)
-        
-        # Visual bar chart
-        chart_text = ""
-        for label, amount in self.chart_data:
-            bar_length = int((amount / max_amount) * 40) if max_amount > 0 else 0
-            bar = "█" * bar_length + "░" * (40 - bar_length)
-            chart_text += f"{label:>6}: {bar} {amount:>7.0f} DA\n"
-        
-        chart_display = QLabel(chart_text)
-        chart_display.setStyleSheet("""
-            font-family: 'Courier New', monospace;
-            font-size: 11px;
-            color: #495057;
-            background: white;
-            padding: 15px;
-            border-radius: 6px;
-            border: 1px solid #e9ecef;
-        """)
-        
-        layout.addWidget(chart_info)
-        layout.addWidget(stats_label)
-        layout.addWidget(chart_display)
-        layout.addStretch()
-        
-        self.sales_chart.setLayout(layout)
+        self.chart_info_label.setText(f"Sales Trend - {period}")
+        self.chart_stats_label.setText(f"Total: {total_sales:.2f} DA | Peak: {max_amount:.2f} DA")
+        self.sales_chart_view.set_data([label for label, _ in self.chart_data],
+                                       [amount for _, amount in self.chart_data])
     
     def closeEvent(self, event):
-        """Clean up timer when widget is closed"""
-        if hasattr(self, 'timer'):
-            self.timer.stop()
+        """Stop scheduled refreshes when widget is closed"""
+        get_scheduler().cancel_jobs(self)
         event.accept()
\ No newline at end of file
@@ -112,6 +112,16 @@ def create_database():
         )
     ''')
     
+    # Unknown barcodes waiting for triage
+    cursor.execute('''
+        CREATE TABLE unknown_barcodes (
+            barcode TEXT PRIMARY KEY,
+            scan_count INTEGER DEFAULT 1,
+            first_seen TEXT,
+            last_seen TEXT
+        )
+    ''')
+    
     print("Inserting sample data...")
     
     # Insert default admin user
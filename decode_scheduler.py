@@ -0,0 +1,210 @@
+"""
+Decode Scheduler for POS System
+Decides when and where to run the barcode decoder on camera frames
+"""
+
+import time
+from collections import namedtuple
+import cv2
+import numpy as np
+from decoder_backends import RawBarcode, DEFAULT_BACKEND, create_backend
+
+
+Detection = namedtuple('Detection', ['data', 'type', 'rect'])  # rect = (x, y, w, h) in frame pixels
+
+# pool_decode runs in worker processes: keep this module free of Qt imports
+_worker_backends = {}  # Backend instances of a pool worker process, by name
+
+
+def pool_decode(image, backend=DEFAULT_BACKEND):
+    """Decode an image inside a worker process"""
+    if backend not in _worker_backends:
+        _worker_backends[backend] = create_backend(backend)
+    return [RawBarcode(barcode.data, barcode.type, tuple(barcode.rect))
+            for barcode in _worker_backends[backend](image)]
+
+
+class PoolDecoder:
+    """Decoder that hands images to a multiprocessing pool
+
+    The calling capture thread waits for the result without holding the
+    GIL, so captures from several cameras decode truly in parallel.
+    """
+
+    def __init__(self, pool, backend=DEFAULT_BACKEND):
+        self.pool = pool
+        self.backend = backend
+
+    def __call__(self, image):
+        return self.pool.apply(pool_decode, (np.ascontiguousarray(image), self.backend))
+
+
+class DecodeScheduler:
+    """Adaptive decoding for a camera stream
+
+    A tiny grayscale thumbnail of every frame is compared with the previous
+    one; the decoder only runs when the scene changed, and for a few frames
+    after it settles (that is when a held barcode is sharpest). A static
+    scene costs one thumbnail per frame and nothing else.
+
+    Each attempt starts cheap: first the region around the last detection,
+    then a reduced-resolution frame. Only when those keep missing does the
+    scheduler escalate to full-resolution frames until the scene goes idle.
+
+    With full_scene set (a basket laid out under a fixed camera) every
+    settle frame is decoded whole, since a hit on one item says nothing
+    about the others.
+    """
+
+    THUMB_SIZE = (80, 60)
+
+    def __init__(self, decode=None, motion_threshold=3.0, settle_frames=8,
+                 reduced_width=320, roi_margin=0.5, roi_lifetime=2.0, escalate_after=2,
+                 full_scene=False):
+        self.decode = decode or create_backend(DEFAULT_BACKEND)
+        self.full_scene = full_scene
+        self.motion_threshold = motion_threshold  # mean absolute difference, 0-255
+        self.settle_frames = settle_frames
+        self.reduced_width = reduced_width
+        self.roi_margin = roi_margin
+        self.roi_lifetime = roi_lifetime
+        self.escalate_after = escalate_after
+
+        self.previous_thumb = None
+        self.gray = None
+        self.reduced = None
+        self.active_frames = 0
+        self.misses = 0
+        self.escalated = False
+        self.roi = None  # (x0, y0, x1, y1) around the last detection
+        self.roi_time = 0
+        self.stats = {'frames': 0, 'skipped': 0, 'roi': 0, 'reduced': 0, 'full': 0, 'found': 0}
+
+    def reset(self):
+        """Forget the previous scene, e.g. after the camera was paused"""
+        self.previous_thumb = None
+        self.active_frames = 0
+        self.misses = 0
+        self.escalated = False
+        self.roi = None
+
+    def process(self, frame):
+        """Decode a BGR or grayscale frame if it is worth it
+
+        Returns a list of Detection, empty when nothing was found or the
+        frame was skipped.
+        """
+        self.stats['frames'] += 1
+
+        if self.scene_changed(frame):
+            self.active_frames = self.settle_frames
+        elif self.active_frames > 0:
+            self.active_frames -= 1
+        else:
+            self.stats['skipped'] += 1
+            return []
+
+        gray = self.to_gray(frame)
+        if self.full_scene:
+            detections = self.decode_full(gray)
+            self.stats['found'] += bool(detections)
+            return detections
+
+        detections = self.decode_roi(gray)
+        if not detections and not self.escalated:
+            detections = self.decode_reduced(gray)
+        if not detections and self.escalated:
+            detections = self.decode_full(gray)
+
+        if detections:
+            self.stats['found'] += 1
+            self.remember_roi(detections, gray.shape)
+            self.misses = 0
+            self.escalated = False
+            # Nothing more to find until something moves again
+            self.active_frames = 0
+        else:
+            self.misses += 1
+            if self.misses >= self.escalate_after:
+                self.escalated = True
+            if self.active_frames == 0:
+                # Scene went idle without a hit - start cheap next time
+                self.misses = 0
+                self.escalated = False
+
+        return detections
+
+    def scene_changed(self, frame):
+        """Compare a thumbnail of the frame with the previous one"""
+        small = cv2.resize(frame, self.THUMB_SIZE, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+        previous = self.previous_thumb
+        self.previous_thumb = small
+        if previous is None:
+            return True
+        return cv2.absdiff(small, previous).mean() > self.motion_threshold
+
+    def to_gray(self, frame):
+        """Grayscale view of the frame in a reused buffer"""
+        if frame.ndim == 2:
+            return frame
+        if self.gray is None or self.gray.shape != frame.shape[:2]:
+            self.gray = np.empty(frame.shape[:2], np.uint8)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self.gray)
+        return self.gray
+
+    def decode_roi(self, gray):
+        """Decode around the last detection while it is recent"""
+        if self.roi is None or time.monotonic() - self.roi_time > self.roi_lifetime:
+            self.roi = None
+            return []
+
+        self.stats['roi'] += 1
+        x0, y0, x1, y1 = self.roi
+        return self.run_decoder(gray[y0:y1, x0:x1], 1.0, x0, y0)
+
+    def decode_reduced(self, gray):
+        """Decode a downscaled frame; large, close barcodes survive it"""
+        height, width = gray.shape
+        if width <= self.reduced_width:
+            return self.decode_full(gray)
+
+        scale = self.reduced_width / width
+        size = (self.reduced_width, max(1, int(height * scale)))
+        if self.reduced is None or self.reduced.shape != (size[1], size[0]):
+            self.reduced = np.empty((size[1], size[0]), np.uint8)
+        cv2.resize(gray, size, dst=self.reduced, interpolation=cv2.INTER_AREA)
+
+        self.stats['reduced'] += 1
+        return self.run_decoder(self.reduced, 1.0 / scale, 0, 0)
+
+    def decode_full(self, gray):
+        """Decode the whole frame at full resolution"""
+        self.stats['full'] += 1
+        return self.run_decoder(gray, 1.0, 0, 0)
+
+    def run_decoder(self, image, scale, offset_x, offset_y):
+        """Decode an image and map the results back to frame coordinates"""
+        detections = []
+        for barcode in self.decode(image):
+            left, top, width, height = barcode.rect
+            rect = (int(left * scale) + offset_x, int(top * scale) + offset_y,
+                    int(width * scale), int(height * scale))
+            detections.append(Detection(barcode.data.decode('utf-8'), barcode.type, rect))
+        return detections
+
+    def remember_roi(self, detections, shape):
+        """Keep a margin around the detected barcodes for the next attempt"""
+        height, width = shape
+        x0 = min(d.rect[0] for d in detections)
+        y0 = min(d.rect[1] for d in detections)
+        x1 = max(d.rect[0] + d.rect[2] for d in detections)
+        y1 = max(d.rect[1] + d.rect[3] for d in detections)
+
+        margin_x = int((x1 - x0) * self.roi_margin) + 16
+        margin_y = int((y1 - y0) * self.roi_margin) + 16
+        self.roi = (max(0, x0 - margin_x), max(0, y0 - margin_y),
+                    min(width, x1 + margin_x), min(height, y1 + margin_y))
+        self.roi_time = time.monotonic()
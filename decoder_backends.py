@@ -0,0 +1,254 @@
+"""
+Decoder Backends for POS System
+Interchangeable barcode decoders and a calibration that picks the fastest reliable one
+"""
+
+import os
+import json
+import time
+import platform
+from collections import namedtuple
+from datetime import datetime
+import cv2
+import numpy as np
+
+try:
+    from pyzbar import pyzbar
+    PYZBAR_AVAILABLE = True
+except ImportError:
+    PYZBAR_AVAILABLE = False
+
+
+RawBarcode = namedtuple('RawBarcode', ['data', 'type', 'rect'])  # data bytes, pyzbar type name, (x, y, w, h)
+
+DEFAULT_BACKEND = 'pyzbar'
+CALIBRATION_FILE = "decoder_calibration.json"
+
+DEFAULT_DECODER_SETTINGS = {
+    'decoder_backend': 'auto',  # 'auto' uses the calibrated backend of this machine
+}
+
+# OpenCV symbology names (or enum values of the contrib module) -> pyzbar names
+OPENCV_TYPES = {
+    'EAN_8': 'EAN8', 'EAN_13': 'EAN13', 'UPC_A': 'UPCA', 'UPC_E': 'UPCE',
+    1: 'EAN8', 2: 'EAN13', 3: 'UPCA', 4: 'UPCE',
+}
+
+
+def points_to_rect(points):
+    """Bounding (x, y, w, h) of a detector's corner points"""
+    points = np.asarray(points).reshape(-1, 2)
+    x0, y0 = points.min(axis=0)
+    x1, y1 = points.max(axis=0)
+    return (int(x0), int(y0), int(x1 - x0), int(y1 - y0))
+
+
+class PyzbarBackend:
+    """ZBar through pyzbar, the original decoder"""
+
+    def __call__(self, gray):
+        return pyzbar.decode(gray)
+
+
+class ThresholdBackend:
+    """pyzbar on an Otsu-binarized frame
+
+    Binarizing first helps cameras with low contrast or glare on shiny
+    packaging, and ZBar scans the two-level image faster.
+    """
+
+    def __init__(self):
+        self.binary = None
+
+    def __call__(self, gray):
+        if self.binary is None or self.binary.shape != gray.shape:
+            self.binary = np.empty(gray.shape, np.uint8)
+        cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU, dst=self.binary)
+        return pyzbar.decode(self.binary)
+
+
+class OpenCVBarcodeBackend:
+    """OpenCV's barcode module (EAN/UPC), no ZBar needed"""
+
+    def __init__(self):
+        if hasattr(cv2, 'barcode'):
+            self.detector = cv2.barcode.BarcodeDetector()
+        else:
+            self.detector = cv2.barcode_BarcodeDetector()  # opencv-contrib before 4.8
+        self.detect = getattr(self.detector, 'detectAndDecodeWithType', None) or self.detector.detectAndDecode
+
+    def __call__(self, gray):
+        found, infos, types, points = self.detect(gray)
+        if not found or points is None:
+            return []
+        return [RawBarcode(info.encode('utf-8'), OPENCV_TYPES.get(kind, str(kind)), points_to_rect(corners))
+                for info, kind, corners in zip(infos, types, points) if info]
+
+
+class OpenCVQRBackend:
+    """OpenCV's QR code detector for QR labels and coupons"""
+
+    def __init__(self):
+        self.detector = cv2.QRCodeDetector()
+
+    def __call__(self, gray):
+        found, infos, points, _ = self.detector.detectAndDecodeMulti(gray)
+        if not found or points is None:
+            return []
+        return [RawBarcode(info.encode('utf-8'), 'QRCODE', points_to_rect(corners))
+                for info, corners in zip(infos, points) if info]
+
+
+DECODER_BACKENDS = {
+    'pyzbar': PyzbarBackend,
+    'pyzbar-threshold': ThresholdBackend,
+    'opencv-barcode': OpenCVBarcodeBackend,
+    'opencv-qr': OpenCVQRBackend,
+}
+
+
+def create_backend(name):
+    """New decoder instance; raises when it cannot run on this machine"""
+    if name not in DECODER_BACKENDS:
+        raise ValueError(f"Unknown decoder backend: {name}")
+    if name.startswith('pyzbar') and not PYZBAR_AVAILABLE:
+        raise ImportError("pyzbar is not installed")
+    return DECODER_BACKENDS[name]()
+
+
+def available_backends():
+    """Names of the backends this machine can run"""
+    names = []
+    for name in DECODER_BACKENDS:
+        try:
+            create_backend(name)
+            names.append(name)
+        except Exception:
+            pass
+    return names
+
+
+def machine_id():
+    return platform.node() or "default"
+
+
+def load_calibration():
+    """{machine: {'backend': name, 'results': [...], 'calibrated': iso date}}"""
+    try:
+        if os.path.exists(CALIBRATION_FILE):
+            with open(CALIBRATION_FILE, 'r') as f:
+                return json.load(f)
+    except Exception as e:
+        print(f"Error loading decoder calibration: {e}")
+    return {}
+
+
+def save_calibration(backend, results):
+    """Remember the calibrated backend of this machine"""
+    calibration = load_calibration()
+    calibration[machine_id()] = {
+        'backend': backend,
+        'results': results,
+        'calibrated': datetime.now().isoformat(timespec='seconds'),
+    }
+    try:
+        with open(f"{CALIBRATION_FILE}.tmp", 'w') as f:
+            json.dump(calibration, f, indent=2)
+        os.replace(f"{CALIBRATION_FILE}.tmp", CALIBRATION_FILE)
+    except Exception as e:
+        print(f"Error saving decoder calibration: {e}")
+
+
+def selected_backend(settings):
+    """(backend name, whether a calibration should run) for app settings"""
+    choice = (settings or {}).get('decoder_backend', DEFAULT_DECODER_SETTINGS['decoder_backend'])
+    available = available_backends()
+    if choice in available:
+        return choice, False
+
+    calibrated = load_calibration().get(machine_id(), {}).get('backend')
+    if calibrated in available:
+        return calibrated, False
+
+    fallback = DEFAULT_BACKEND if DEFAULT_BACKEND in available else (available or [DEFAULT_BACKEND])[0]
+    return fallback, True
+
+
+def calibrate(frames, names=None, min_recall=0.9):
+    """Time every backend on the same grayscale frames
+
+    The codes found by any backend on a frame are taken as the truth for
+    that frame. The fastest backend finding at least min_recall of them
+    wins; when none does, the one finding the most. Returns (name or None
+    when no frame had a code, results).
+    """
+    names = names or available_backends()
+    found = {}
+    results = []
+    for name in names:
+        try:
+            backend = create_backend(name)
+            backend(frames[0])  # Warm up lazily built detector state
+            started = time.perf_counter()
+            found[name] = [{barcode.data for barcode in backend(frame)} for frame in frames]
+            elapsed = time.perf_counter() - started
+        except Exception as e:
+            print(f"Error calibrating {name} decoder: {e}")
+            continue
+        results.append({'backend': name, 'ms_per_frame': elapsed * 1000 / len(frames)})
+
+    truth = [set().union(*(codes[position] for codes in found.values())) for position in range(len(frames))]
+    expected = sum(len(codes) for codes in truth)
+    if not expected:
+        return None, results
+
+    for result in results:
+        codes = found[result['backend']]
+        result['recall'] = sum(len(codes[position] & truth[position]) for position in range(len(frames))) / expected
+
+    reliable = [result for result in results if result['recall'] >= min_recall]
+    if reliable:
+        best = min(reliable, key=lambda result: result['ms_per_frame'])
+    else:
+        best = max(results, key=lambda result: (result['recall'], -result['ms_per_frame']))
+    return best['backend'], results
+
+
+class BackendCalibration:
+    """Collects frames from a running scanner and calibrates once enough arrived
+
+    Only frames the scanner chose to decode are kept, so the sample is
+    made of scenes with something moving in front of the camera. A round
+    without any code in view is discarded; after max_rounds the scanner
+    keeps its current backend for the session.
+    """
+
+    def __init__(self, frame_count=20, interval=0.15, max_rounds=3):
+        self.frame_count = frame_count
+        self.interval = interval
+        self.max_rounds = max_rounds
+        self.frames = []
+        self.rounds = 0
+        self.next_time = 0.0
+        self.done = False
+
+    def add_frame(self, frame):
+        """Keep a grayscale copy when due; True once a round is complete"""
+        now = time.monotonic()
+        if self.done or now < self.next_time:
+            return False
+        self.next_time = now + self.interval
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame.copy()
+        self.frames.append(gray)
+        return len(self.frames) >= self.frame_count
+
+    def run(self):
+        """Calibrate on the collected frames and save the choice"""
+        frames, self.frames = self.frames, []
+        self.rounds += 1
+        backend, results = calibrate(frames)
+        if backend is not None:
+            save_calibration(backend, results)
+        if backend is not None or self.rounds >= self.max_rounds:
+            self.done = True
+        return backend
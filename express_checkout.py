@@ -0,0 +1,59 @@
+"""
+Express Checkout for POS System
+Settings and receipt printing used when serving customers at peak times
+"""
+
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+from PyQt5.QtPrintSupport import QPrinter, QPrinterInfo
+
+
+RECEIPT_POLICIES = ["Ask", "Always", "Never"]
+
+DEFAULT_EXPRESS_SETTINGS = {
+    'express_checkout': False,
+    'receipt_print_policy': 'Ask',
+    'exact_cash_key': 'F12',
+}
+
+
+def express_setting(settings, key):
+    """Read an express checkout setting with its default"""
+    return (settings or {}).get(key, DEFAULT_EXPRESS_SETTINGS[key])
+
+
+def receipt_policy(settings):
+    """Receipt printing policy: Ask, Always or Never"""
+    policy = express_setting(settings, 'receipt_print_policy')
+    return policy if policy in RECEIPT_POLICIES else 'Ask'
+
+
+def install_exact_cash_shortcut(widget, settings, callback):
+    """Bind the single exact-cash key of a POS screen"""
+    key = express_setting(settings, 'exact_cash_key')
+    shortcut = QShortcut(QKeySequence(key), widget)
+    shortcut.setContext(Qt.WidgetWithChildrenShortcut)
+    shortcut.activated.connect(callback)
+    return shortcut
+
+
+def send_receipt_to_printer(content):
+    """Print receipt text on the default printer without any dialog
+
+    Returns False when no printer is configured.
+    """
+    try:
+        printer_info = QPrinterInfo.defaultPrinter()
+        if printer_info.isNull():
+            return False
+
+        printer = QPrinter(printer_info)
+        document = QTextDocument()
+        document.setDefaultFont(QFont("Courier New", 9))
+        document.setPlainText(content)
+        document.print_(printer)
+        return True
+    except Exception as e:
+        print(f"Error printing receipt: {e}")
+        return False
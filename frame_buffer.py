@@ -0,0 +1,38 @@
+"""
+Frame Ring Buffer for POS System
+Preallocated camera frames reused by the capture thread
+"""
+
+import numpy as np
+
+
+class FrameRingBuffer:
+    """Fixed set of frame slots reused for the lifetime of a camera
+
+    The capture thread reads straight into a free slot and publishes it,
+    then decodes and renders the preview from that slot before the next
+    capture, so no frame is ever copied or allocated per frame. Only the
+    capture thread touches the buffer; the preview leaves it as its own
+    QImage.
+    """
+
+    def __init__(self, slots=2):
+        self.slot_count = max(slots, 2)  # latest + one being written
+        self.frames = None
+        self.latest = -1
+
+    def allocate(self, shape, dtype=np.uint8):
+        """Allocate every slot once the frame size is known"""
+        self.frames = [np.empty(shape, dtype) for _ in range(self.slot_count)]
+        self.latest = -1
+
+    def acquire_write(self):
+        """Get a free slot for the next frame as (index, array)"""
+        if self.frames is None:
+            return -1, None
+        index = (self.latest + 1) % self.slot_count
+        return index, self.frames[index]
+
+    def publish(self, index):
+        """Make a written slot the latest frame"""
+        self.latest = index
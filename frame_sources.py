@@ -0,0 +1,175 @@
+"""
+Frame Sources for POS System
+Cameras and recorded videos or image folders behind one reading interface
+"""
+
+import os
+import time
+import cv2
+
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff')
+
+
+class FrameSource:
+    """Something the scanner threads can read frames from
+
+    read() returns (ok, frame) like cv2.VideoCapture and may fill the
+    given array in place. finished becomes True when a recording ran out,
+    which a camera never does.
+    """
+
+    name = "source"
+
+    def __init__(self):
+        self.finished = False
+        self.frame_name = ""  # Label of the last frame read, e.g. the image file
+
+    def open(self):
+        return False
+
+    def read(self, out=None):
+        return False, None
+
+    def grab(self):
+        """Take and drop a frame while paused; False when there is no need"""
+        return False
+
+    def release(self):
+        pass
+
+
+class CameraSource(FrameSource):
+    """Live camera through cv2.VideoCapture"""
+
+    def __init__(self, camera_index=0, width=640, height=480, fps=30):
+        super().__init__()
+        self.camera_index = camera_index
+        self.name = f"camera {camera_index}"
+        self.size = (width, height)
+        self.fps = fps
+        self.cap = None
+
+    def open(self):
+        self.cap = cv2.VideoCapture(self.camera_index)
+        if not self.cap.isOpened():
+            return False
+
+        # Camera properties that suit barcode scanning
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.size[0])
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.size[1])
+        self.cap.set(cv2.CAP_PROP_FPS, self.fps)
+        return True
+
+    def read(self, out=None):
+        return self.cap.read(out) if out is not None else self.cap.read()
+
+    def grab(self):
+        # Keeps the driver queue fresh so a resume starts on a current frame
+        return self.cap.grab()
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+class FileSource(FrameSource):
+    """Replay of a video file or a folder of images
+
+    With realtime set, frames are handed out at the recording's frame rate
+    as a camera would; otherwise as fast as they can be read.
+    """
+
+    def __init__(self, path, realtime=True, loop=False, fps=30):
+        super().__init__()
+        self.path = path
+        self.name = os.path.basename(os.path.normpath(path))
+        self.realtime = realtime
+        self.loop = loop
+        self.fps = fps
+        self.files = None
+        self.cap = None
+        self.position = 0
+        self.start_time = 0.0
+
+    def open(self):
+        if os.path.isdir(self.path):
+            self.files = sorted(os.path.join(self.path, name) for name in os.listdir(self.path)
+                                if name.lower().endswith(IMAGE_EXTENSIONS))
+            if not self.files:
+                return False
+        else:
+            self.cap = cv2.VideoCapture(self.path)
+            if not self.cap.isOpened():
+                return False
+            self.fps = self.cap.get(cv2.CAP_PROP_FPS) or self.fps
+
+        self.position = 0
+        self.finished = False
+        self.start_time = time.monotonic()
+        return True
+
+    def read(self, out=None):
+        if self.finished:
+            return False, None
+
+        if self.files is not None:
+            ret, frame = self.read_image()
+        else:
+            ret, frame = self.cap.read(out) if out is not None else self.cap.read()
+            if not ret and self.loop and self.position:
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                self.position = 0
+                self.start_time = time.monotonic()
+                ret, frame = self.cap.read(out) if out is not None else self.cap.read()
+            if ret:
+                self.frame_name = str(self.position)
+
+        if not ret:
+            self.finished = True
+            return False, None
+
+        self.position += 1
+        if self.realtime:
+            delay = self.start_time + self.position / self.fps - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        return True, frame
+
+    def read_image(self):
+        """Next readable image of the folder
+
+        Gives up after a full pass over the folder without a readable image,
+        so a looping source of broken files ends instead of spinning.
+        """
+        unreadable = 0
+        while unreadable < len(self.files):
+            if self.position >= len(self.files):
+                if not self.loop:
+                    return False, None
+                self.position = 0
+                self.start_time = time.monotonic()
+
+            path = self.files[self.position]
+            frame = cv2.imread(path)
+            if frame is not None:
+                self.frame_name = os.path.basename(path)
+                return True, frame
+
+            print(f"Error reading image: {path}")
+            self.position += 1
+            unreadable += 1
+        return False, None
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+def open_frame_source(spec, realtime=True, loop=False):
+    """Frame source for a camera index or a video/image folder path"""
+    if isinstance(spec, int) or str(spec).isdigit():
+        return CameraSource(int(spec))
+    return FileSource(str(spec), realtime=realtime, loop=loop)
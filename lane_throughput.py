@@ -0,0 +1,167 @@
+"""
+Lane Throughput for POS System
+Items per minute, basket time, idle gaps and payment time per lane and cashier
+"""
+
+import time
+import platform
+from collections import namedtuple
+from datetime import datetime
+from PyQt5.QtCore import *
+
+
+LANE_CLOSED_SECONDS = 30 * 60  # A longer gap between baskets is a break, not idle time
+
+# Additive per-sale counters; every figure shown is a ratio of their sums
+COUNTERS = ('baskets', 'items', 'timed_baskets', 'timed_items', 'busy_seconds',
+            'pay_seconds', 'idle_seconds', 'idle_gaps')
+
+Throughput = namedtuple('Throughput', ['key', 'baskets', 'items', 'items_per_minute', 'seconds_per_basket',
+                                       'pay_seconds', 'idle_minutes', 'idle_gaps', 'longest_idle'])
+
+
+def throughput_from_sums(key, baskets, items, timed_baskets, timed_items, busy_seconds,
+                         pay_seconds, idle_seconds, idle_gaps, longest_idle):
+    """Throughput figures from summed counters"""
+    return Throughput(
+        key=key,
+        baskets=baskets,
+        items=items,
+        items_per_minute=timed_items * 60 / busy_seconds if busy_seconds else 0.0,
+        seconds_per_basket=busy_seconds / timed_baskets if timed_baskets else 0.0,
+        pay_seconds=pay_seconds / timed_baskets if timed_baskets else 0.0,
+        idle_minutes=idle_seconds / 60,
+        idle_gaps=idle_gaps,
+        longest_idle=longest_idle or 0.0,
+    )
+
+
+class LaneThroughput(QObject):
+    """Running throughput counters per day, lane and cashier
+
+    A committed sale adds one row's worth of counters: its items, the time
+    from the first item to payment, the time from the last item to
+    payment, and the idle gap since the lane's previous payment. Rows hold
+    sums only, so a month for every lane is one grouped SUM over about
+    days x lanes x cashiers rows. The lane is the machine name, as in
+    the scan latency metrics.
+    """
+
+    updated = pyqtSignal()
+
+    def __init__(self, conn, parent=None):
+        super().__init__(parent)
+        self.conn = conn
+        self.lane = platform.node() or "lane"
+        self.last_payment = None  # Wall-clock time of this lane's previous sale
+        self.ensure_table()
+
+    def ensure_table(self):
+        """Create the throughput table on databases that predate it"""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS lane_throughput (
+                    day TEXT NOT NULL,
+                    lane TEXT NOT NULL,
+                    cashier_id INTEGER NOT NULL DEFAULT 0,
+                    baskets INTEGER DEFAULT 0,
+                    items INTEGER DEFAULT 0,
+                    timed_baskets INTEGER DEFAULT 0,
+                    timed_items INTEGER DEFAULT 0,
+                    busy_seconds REAL DEFAULT 0,
+                    pay_seconds REAL DEFAULT 0,
+                    idle_seconds REAL DEFAULT 0,
+                    idle_gaps INTEGER DEFAULT 0,
+                    longest_idle REAL DEFAULT 0,
+                    PRIMARY KEY (day, lane, cashier_id)
+                )
+            ''')
+            self.conn.commit()
+        except Exception as e:
+            print(f"Error creating lane throughput table: {e}")
+
+    def record_sale(self, cashier_id, item_count, basket_timer, paid_at=None):
+        """Add a committed sale, timed by the basket's BasketTimer"""
+        paid_at = time.time() if paid_at is None else paid_at
+        counters = dict.fromkeys(COUNTERS, 0)
+        counters['baskets'] = 1
+        counters['items'] = item_count
+        longest_idle = 0.0
+
+        if basket_timer.started is not None:
+            counters['timed_baskets'] = 1
+            counters['timed_items'] = item_count
+            counters['busy_seconds'] = max(0.0, paid_at - basket_timer.started)
+            counters['pay_seconds'] = max(0.0, paid_at - basket_timer.last_item)
+
+            if self.last_payment is not None:
+                gap = basket_timer.started - self.last_payment
+                same_day = datetime.fromtimestamp(self.last_payment).date() == datetime.fromtimestamp(paid_at).date()
+                if 0 < gap <= LANE_CLOSED_SECONDS and same_day:
+                    counters['idle_seconds'] = gap
+                    counters['idle_gaps'] = 1
+                    longest_idle = gap
+        self.last_payment = paid_at
+
+        day = datetime.fromtimestamp(paid_at).strftime("%Y-%m-%d")
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(f'''
+                INSERT INTO lane_throughput (day, lane, cashier_id, {', '.join(COUNTERS)}, longest_idle)
+                VALUES (?, ?, ?, {', '.join('?' * len(COUNTERS))}, ?)
+                ON CONFLICT (day, lane, cashier_id) DO UPDATE SET
+                    {', '.join(f'{name} = {name} + excluded.{name}' for name in COUNTERS)},
+                    longest_idle = MAX(longest_idle, excluded.longest_idle)
+            ''', (day, self.lane, cashier_id or 0, *(counters[name] for name in COUNTERS), longest_idle))
+            self.conn.commit()
+        except Exception as e:
+            print(f"Error saving lane throughput: {e}")
+        self.updated.emit()
+
+    def summary(self, by='lane', since=None, until=None, cashier_id=None):
+        """Throughput per lane, cashier or day over days since..until (YYYY-MM-DD, inclusive)
+
+        by=None sums every matching row into a single Throughput.
+        """
+        group = {'lane': 'lane', 'cashier': 'cashier_id', 'day': 'day', None: "'all'"}[by]
+        query = f'''
+            SELECT {group}, {', '.join(f'SUM({name})' for name in COUNTERS)}, MAX(longest_idle)
+            FROM lane_throughput WHERE 1 = 1
+        '''
+        params = []
+        if since:
+            query += ' AND day >= ?'
+            params.append(since)
+        if until:
+            query += ' AND day <= ?'
+            params.append(until)
+        if cashier_id is not None:
+            query += ' AND cashier_id = ?'
+            params.append(cashier_id)
+        if by is not None:
+            query += f' GROUP BY {group} ORDER BY {group}'
+
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(query, params)
+            return [throughput_from_sums(*row) for row in cursor.fetchall() if row[1]]
+        except Exception as e:
+            print(f"Error reading lane throughput: {e}")
+            return []
+
+    def totals(self, since=None, until=None, cashier_id=None):
+        """Throughput of all matching rows together, None without sales"""
+        rows = self.summary(None, since, until, cashier_id)
+        return rows[0] if rows else None
+
+
+_lane_throughput = None
+
+
+def get_lane_throughput(conn):
+    """Get the application-wide lane throughput counters"""
+    global _lane_throughput
+    if _lane_throughput is None:
+        _lane_throughput = LaneThroughput(conn, QCoreApplication.instance())
+    return _lane_throughput
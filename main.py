@@ -7,10 +7,14 @@ from datetime import datetime
 import json
 import os
 import time
+import multiprocessing
 from dashboard_widget import DashboardWidget
+from sales_sketches import get_sales_sketches
+from lane_throughput import get_lane_throughput
 from pos_widget import POSWidget
 from product_management_widget import ProductManagementWidget
 from ticket_management_widget import TicketManagementWidget
+from settings_widget import SettingsWidget as POSSettingsWidget
 
 DB_PATH = "pos_database.db"
 
@@ -1040,6 +1044,13 @@ class SettingsWidget(QWidget):
         system_tab = self.create_system_settings_tab()
         tab_widget.addTab(system_tab, "  System Settings")
         
+        # POS, scanner and checkout settings (app_settings.json)
+        pos_scroll = QScrollArea()
+        pos_scroll.setWidgetResizable(True)
+        pos_scroll.setFrameShape(QFrame.NoFrame)
+        pos_scroll.setWidget(POSSettingsWidget(self.parent, embedded=True))
+        tab_widget.addTab(pos_scroll, "  POS && Scanner")
+        
         # User Management Tab
         user_tab = self.create_user_management_tab()
         tab_widget.addTab(user_tab, "  User Management")
@@ -1508,12 +1519,14 @@ class DayStateWidget(QWidget):
         self.items_card = self.create_stat_card("Items Sold", "0", "#f39c12", "📦")
         self.customers_card = self.create_stat_card("Customers", "0", "#9b59b6", "👥")
         self.avg_sale_card = self.create_stat_card("Avg. Sale", "0.00", "#e74c3c", "📊")
+        self.median_sale_card = self.create_stat_card("Median Sale", "0.00", "#16a085", "⚖️")
         
         stats_layout.addWidget(self.sales_card)
         stats_layout.addWidget(self.transactions_card)
         stats_layout.addWidget(self.items_card)
         stats_layout.addWidget(self.customers_card)
         stats_layout.addWidget(self.avg_sale_card)
+        stats_layout.addWidget(self.median_sale_card)
         
         stats_scroll.setWidget(stats_container)
         
@@ -1748,6 +1761,12 @@ class DayStateWidget(QWidget):
             self.customers_card.value_label.setText(f"{unique_customers:,}")
             self.avg_sale_card.value_label.setText(f"{stats[2]:.2f} DA")
             
+            # Median from the day's sketches, p90 on hover
+            count, (median, p90, p99) = get_sales_sketches(self.parent.conn).quantiles(
+                'ticket_value', since=selected_date, until=selected_date)
+            self.median_sale_card.value_label.setText(f"{median or 0:.2f} DA")
+            self.median_sale_card.setToolTip(f"P90: {p90 or 0:.2f} DA - P99: {p99 or 0:.2f} DA")
+            
             # Load tables
             self.load_top_products(selected_date)
             self.load_recent_transactions(selected_date)
@@ -1981,10 +2000,16 @@ class SellerAccountWidget(QWidget):
         self.sales_today_card = self.create_stat_card("💰", "Today's Sales", "0.00 DA", "#2ecc71")
         self.sales_month_card = self.create_stat_card("📅", "Monthly Sales", "0.00 DA", "#3498db")
         self.transactions_card = self.create_stat_card("🧾", "Transactions", "0", "#f39c12")
+        self.pace_card = self.create_stat_card("⚡", "Items / Minute (month)", "0.0", "#9b59b6")
+        self.basket_time_card = self.create_stat_card("⏱️", "Seconds / Basket (month)", "0", "#16a085")
+        self.pay_time_card = self.create_stat_card("💳", "Last Scan to Payment (month)", "0 s", "#e67e22")
         
         stats_layout.addWidget(self.sales_today_card)
         stats_layout.addWidget(self.sales_month_card)
         stats_layout.addWidget(self.transactions_card)
+        stats_layout.addWidget(self.pace_card)
+        stats_layout.addWidget(self.basket_time_card)
+        stats_layout.addWidget(self.pay_time_card)
         
         profile_layout.addWidget(self.profile_pic, alignment=Qt.AlignCenter)
         profile_layout.addWidget(self.user_name)
@@ -2242,6 +2267,16 @@ class SellerAccountWidget(QWidget):
             self.sales_month_card.value_label.setText(f"{month_sales:,.2f} DA")
             self.transactions_card.value_label.setText(f"{today_count:,}")
             
+            # Throughput from the running lane counters
+            throughput = get_lane_throughput(self.parent.conn).totals(
+                since=datetime.now().strftime("%Y-%m-01"), cashier_id=user_id)
+            if throughput:
+                self.pace_card.value_label.setText(f"{throughput.items_per_minute:.1f}")
+                self.basket_time_card.value_label.setText(f"{throughput.seconds_per_basket:.0f}")
+                self.pay_time_card.value_label.setText(f"{throughput.pay_seconds:.0f} s")
+                self.pace_card.setToolTip(f"Idle: {throughput.idle_minutes:.0f} min in {throughput.idle_gaps:,} gaps, "
+                                          f"longest {throughput.longest_idle / 60:.1f} min")
+            
         except Exception as e:
             print(f"Error loading statistics: {e}")
     
@@ -2440,6 +2475,8 @@ class AddUserDialog(QDialog):
             QMessageBox.critical(self, "Error", f"Failed to save user: {str(e)}")
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()  # Decode pool workers of the frozen exe must not open the GUI
+
     # Set high DPI scaling before creating QApplication
     QApplication.setAttribute(Qt.AA_EnableHighDpiScaling, True)
     QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps, True)
@@ -8,6 +8,7 @@ from PyQt5.QtGui import *
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
+from catalog_events import get_catalog_events
 
 class POSMainWindow(QMainWindow):
     def __init__(self):
@@ -518,9 +519,15 @@ class POSInterface(QWidget):
         self.parent = parent
         self.cart_items = []
         self.total = 0.0
+        self.products_by_id = {}
+        self.product_buttons = {}
+        self.max_grid_products = 12
         self.init_ui()
         self.load_products()
         
+        # Apply products added from other screens in place
+        get_catalog_events().catalog_changed.connect(self.apply_catalog_change)
+        
         # Timer for clock
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_clock)
@@ -820,36 +827,85 @@ class POSInterface(QWidget):
     def load_products(self):
         """Load products from database and create buttons"""
         cursor = self.parent.conn.cursor()
-        cursor.execute('SELECT * FROM products LIMIT 12')  # Limit for grid layout
+        cursor.execute('SELECT * FROM products LIMIT ?', (self.max_grid_products,))  # Limit for grid layout
         products = cursor.fetchall()
         
-        row, col = 0, 0
         for product in products:
-            btn = QPushButton(product[1])  # product name
-            btn.setStyleSheet("""
-                QPushButton {
-                    background-color: #4fc3f7;
-                    color: white;
-                    border: none;
-                    border-radius: 10px;
-                    padding: 20px;
-                    font-weight: bold;
-                    font-size: 14px;
-                    text-align: center;
-                }
-                QPushButton:hover {
-                    background-color: #29b6f6;
-                }
-            """)
-            btn.setMinimumSize(120, 100)
-            btn.clicked.connect(lambda checked, p=product: self.add_to_cart(p))
+            self.products_by_id[product[0]] = product
+            self.product_buttons[product[0]] = self.create_product_button(product)
+        
+        self.layout_product_buttons()
+    
+    def create_product_button(self, product):
+        """Create a grid button for a product"""
+        btn = QPushButton(product[1])  # product name
+        btn.setStyleSheet("""
+            QPushButton {
+                background-color: #4fc3f7;
+                color: white;
+                border: none;
+                border-radius: 10px;
+                padding: 20px;
+                font-weight: bold;
+                font-size: 14px;
+                text-align: center;
+            }
+            QPushButton:hover {
+                background-color: #29b6f6;
+            }
+        """)
+        btn.setMinimumSize(120, 100)
+        btn.clicked.connect(lambda checked, pid=product[0]: self.add_to_cart(self.products_by_id[pid]))
+        return btn
+    
+    def layout_product_buttons(self):
+        """Place the product buttons in the grid"""
+        for btn in self.product_buttons.values():
+            self.product_layout.removeWidget(btn)
+        
+        for index, btn in enumerate(self.product_buttons.values()):
+            self.product_layout.addWidget(btn, index // 2, index % 2)  # 2 columns as shown in screenshot
+    
+    def apply_catalog_change(self, change):
+        """Apply a catalog diff to the grid and cart without reloading"""
+        try:
+            changed_layout = False
+            
+            for product_id in change.deleted:
+                self.products_by_id.pop(product_id, None)
+                btn = self.product_buttons.pop(product_id, None)
+                if btn is not None:
+                    self.product_layout.removeWidget(btn)
+                    btn.deleteLater()
+                    changed_layout = True
+            
+            for product_id in change.rows:
+                product = change.row_tuple(product_id)
+                if product_id in self.product_buttons:
+                    self.products_by_id[product_id] = product
+                    self.product_buttons[product_id].setText(product[1])
+                elif len(self.product_buttons) < self.max_grid_products:
+                    self.products_by_id[product_id] = product
+                    self.product_buttons[product_id] = self.create_product_button(product)
+                    changed_layout = True
             
-            self.product_layout.addWidget(btn, row, col)
+            if changed_layout:
+                self.layout_product_buttons()
             
-            col += 1
-            if col >= 2:  # 2 columns as shown in screenshot
-                col = 0
-                row += 1
+            # Stock column of cart lines
+            cart_changed = False
+            for item in self.cart_items:
+                if item['id'] in change.rows:
+                    item['name'] = change.rows[item['id']]['name']
+                    item['stock'] = change.rows[item['id']]['quantity']
+                    cart_changed = True
+            if cart_changed:
+                self.update_transaction_table()
+                
+        except RuntimeError:
+            pass  # Widget already deleted
+        except Exception as e:
+            print(f"Error applying catalog change: {e}")
     
     def add_to_cart(self, product):
         """Add product to cart"""
@@ -1217,6 +1273,7 @@ class ProductAddDialog(QDialog):
             ''', (name, code_bar, price_buy, price_sell, quantity))
             
             self.parent.conn.commit()
+            get_catalog_events().publish_inserted(self.parent.conn, [cursor.lastrowid])
             self.accept()
             
         except ValueError:
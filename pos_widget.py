@@ -4,6 +4,19 @@ from PyQt5.QtGui import *
 from datetime import datetime
 import json
 import traceback
+from scheduler import get_scheduler
+from catalog_events import get_catalog_events, fetch_product_rows
+from product_record import product_cursor
+from top_sellers import get_top_sellers
+from sales_sketches import get_sales_sketches
+from basket_timer import BasketTimer
+from lane_throughput import get_lane_throughput
+from toast import show_toast
+from express_checkout import (express_setting, receipt_policy, install_exact_cash_shortcut,
+                              send_receipt_to_printer)
+from unknown_barcodes import get_unknown_barcodes, UnknownBarcodesDialog
+from wedge_scanner import get_keyboard_wedge
+from product_thumbnails import get_product_thumbnails
 
 class POSWidget(QWidget):
     def __init__(self, parent):
@@ -14,13 +27,34 @@ class POSWidget(QWidget):
         self.selected_client = "Walk-in Customer"
         self.remise = 0.0
         self.payment_received = 0.0
+        self.products_by_id = {}
+        self.product_buttons = {}
+        self.last_sale = None  # (items, total) kept for reprinting
+        self.basket_timer = BasketTimer()
+        self.settings = getattr(parent, 'app_settings', {})
+        self.express_mode = bool(express_setting(self.settings, 'express_checkout'))
+        self.unknown_barcodes = get_unknown_barcodes(self.parent.conn)
+        self.thumbnails = get_product_thumbnails()
+        self.thumbnails.apply_settings(self.settings)
+        self.thumbnails.thumbnail_ready.connect(self.set_product_thumbnail)
+        self.thumbnails.thumbnails_changed.connect(self.refresh_product_thumbnails)
         self.init_ui()
         self.load_products()
         
-        # Timer for clock
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_clock)
-        self.timer.start(1000)
+        # Single key completes a cash sale for the exact amount
+        install_exact_cash_shortcut(self, self.settings, self.quick_cash_payment)
+        self.unknown_barcodes.changed.connect(self.update_unknown_button)
+        
+        # Keyboard scanners add to the cart whatever widget has focus
+        wedge = get_keyboard_wedge()
+        wedge.apply_settings(self.settings)
+        wedge.register(self, self.add_barcode_to_cart)
+        
+        # Apply product edits, additions and sales from any screen in place
+        get_catalog_events().catalog_changed.connect(self.apply_catalog_change)
+        
+        # Shared application clock
+        get_scheduler().connect_clock(self, self.update_clock)
         self.update_clock()
     
     def init_ui(self):
@@ -111,6 +145,36 @@ class POSWidget(QWidget):
             btn.clicked.connect(callback)
             buttons_layout.addWidget(btn)
         
+        # Express mode swaps modal dialogs for toasts
+        self.express_btn = QPushButton("⚡ Express")
+        self.express_btn.setCheckable(True)
+        self.express_btn.setChecked(self.express_mode)
+        self.express_btn.setMinimumSize(100, 40)
+        self.express_btn.setStyleSheet("""
+            QPushButton {
+                background: #6c757d;
+                color: white;
+                border: none;
+                border-radius: 6px;
+                padding: 8px 12px;
+                font-weight: 600;
+                font-size: 13px;
+                min-width: 90px;
+            }
+            QPushButton:checked {
+                background: #fd7e14;
+            }
+        """)
+        self.express_btn.toggled.connect(self.set_express_mode)
+        buttons_layout.addWidget(self.express_btn)
+        
+        self.unknown_btn = QPushButton()
+        self.unknown_btn.setMinimumSize(100, 40)
+        self.unknown_btn.setStyleSheet(self.express_btn.styleSheet().replace("#6c757d", "#343a40"))
+        self.unknown_btn.clicked.connect(self.show_unknown_barcodes)
+        self.update_unknown_button()
+        buttons_layout.addWidget(self.unknown_btn)
+        
         buttons_container.setLayout(buttons_layout)
         
         # Scroll area for buttons if needed
@@ -208,6 +272,7 @@ class POSWidget(QWidget):
             }
         """)
         self.search_input.textChanged.connect(self.filter_products)
+        self.search_input.returnPressed.connect(self.add_product_by_barcode)
         
         clear_search_btn = QPushButton("✕")
         clear_search_btn.setFixedSize(40, 40)
@@ -532,36 +597,98 @@ class POSWidget(QWidget):
         widget.setLayout(layout)
         return widget
     
+    def set_express_mode(self, enabled):
+        """Switch between express (toasts) and normal (dialogs) checkout"""
+        self.express_mode = enabled
+        show_toast(self, "Express checkout ON" if enabled else "Express checkout OFF")
+    
+    def notify(self, title, message, level='info'):
+        """Tell the cashier something without blocking scanning in express mode"""
+        if self.express_mode:
+            show_toast(self, f"{title}: {message}", level)
+        elif level in ('warning', 'error'):
+            QMessageBox.warning(self, title, message)
+        else:
+            QMessageBox.information(self, title, message)
+    
+    def update_unknown_button(self, *args):
+        """Show how many unknown barcodes wait for triage"""
+        self.unknown_btn.setText(f"❓ Unknown ({len(self.unknown_barcodes)})")
+    
+    def show_unknown_barcodes(self):
+        """Open the unknown barcode triage list"""
+        dialog = UnknownBarcodesDialog(self, self.unknown_barcodes, self.quick_add_barcode)
+        dialog.exec_()
+    
+    def quick_add_barcode(self, barcode):
+        """Quick add a product for an unknown barcode"""
+        dialog = QuickAddProductDialog(self)
+        dialog.code_input.setText(barcode)
+        dialog.exec_()
+    
+    def add_product_by_barcode(self):
+        """Add the product whose barcode was typed or scanned into the search box"""
+        barcode = self.search_input.text().strip()
+        if barcode and self.add_barcode_to_cart(barcode):
+            self.search_input.clear()
+    
+    def add_barcode_to_cart(self, barcode):
+        """Add a product by barcode with a single lookup; True if the code was handled"""
+        try:
+            cursor = product_cursor(self.parent.conn)
+            cursor.execute('SELECT * FROM products WHERE code_bar = ?', (barcode,))
+            product = cursor.fetchone()
+        except Exception as e:
+            print(f"Error searching barcode: {e}")
+            return False
+        
+        if product:
+            self.add_to_cart_safe(product)
+            self.basket_timer.scan()
+            return True
+        if barcode.isdigit():
+            # Queue it for later instead of stopping the line
+            self.unknown_barcodes.add(barcode)
+            self.notify("Unknown Barcode", f"{barcode} added to the unknown list", 'warning')
+            return True
+        return False
+    
     def load_products(self):
         """Load products from database with error handling"""
         try:
-            cursor = self.parent.conn.cursor()
+            cursor = product_cursor(self.parent.conn)
             cursor.execute('SELECT * FROM products ORDER BY name')
             products = cursor.fetchall()
             
-            # Clear existing buttons safely
-            self.clear_product_buttons()
-            
-            row, col = 0, 0
-            max_cols = 3
-            
-            for product in products:
-                try:
-                    btn = self.create_product_button(product)
-                    self.product_layout.addWidget(btn, row, col)
-                    
-                    col += 1
-                    if col >= max_cols:
-                        col = 0
-                        row += 1
-                except Exception as e:
-                    print(f"Error creating button for product {product}: {e}")
-                    continue
+            self.populate_product_grid(products)
                     
         except Exception as e:
             print(f"Error loading products: {e}")
             QMessageBox.critical(self, "Error", f"Failed to load products: {str(e)}")
     
+    def populate_product_grid(self, products):
+        """Rebuild the product grid from a list of product rows"""
+        # Clear existing buttons safely
+        self.clear_product_buttons()
+        
+        row, col = 0, 0
+        max_cols = 3
+        
+        for product in products:
+            try:
+                self.products_by_id[product[0]] = product
+                btn = self.create_product_button(product)
+                self.product_buttons[product[0]] = btn
+                self.product_layout.addWidget(btn, row, col)
+                
+                col += 1
+                if col >= max_cols:
+                    col = 0
+                    row += 1
+            except Exception as e:
+                print(f"Error creating button for product {product}: {e}")
+                continue
+    
     def clear_product_buttons(self):
         """Safely clear all product buttons"""
         try:
@@ -571,56 +698,22 @@ class POSWidget(QWidget):
                     child.widget().deleteLater()
         except Exception as e:
             print(f"Error clearing product buttons: {e}")
+        
+        self.product_buttons = {}
+        self.products_by_id = {}
     
     def create_product_button(self, product):
         """Create a product button with error handling"""
         try:
             btn = QPushButton()
             btn.setFixedSize(160, 120)
+            btn.setIconSize(QSize(40, 40))
             
-            # Safely extract product data
             product_id = product[0] if len(product) > 0 else 0
-            product_name = product[1] if len(product) > 1 else "Unknown"
-            product_barcode = product[2] if len(product) > 2 else ""
-            product_buy_price = product[3] if len(product) > 3 else 0.0
-            product_sell_price = product[4] if len(product) > 4 else 0.0
-            product_quantity = product[5] if len(product) > 5 else 0
-            
-            # Determine button color based on stock
-            if product_quantity <= 0:
-                color = "#dc3545"  # Red for out of stock
-            elif product_quantity < 10:
-                color = "#ffc107"  # Yellow for low stock
-            else:
-                color = "#28a745"  # Green for good stock
-            
-            btn.setStyleSheet(f"""
-                QPushButton {{
-                    background: {color};
-                    color: white;
-                    border: none;
-                    border-radius: 10px;
-                    padding: 10px;
-                    font-weight: 600;
-                    font-size: 12px;
-                    text-align: center;
-                }}
-                QPushButton:hover {{
-                    opacity: 0.9;
-                    transform: scale(1.02);
-                }}
-                QPushButton:pressed {{
-                    opacity: 0.8;
-                    transform: scale(0.98);
-                }}
-            """)
-            
-            # Button text with product info
-            btn_text = f"{product_name}\n{product_sell_price:.2f} DA\nStock: {product_quantity}"
-            btn.setText(btn_text)
+            self.update_product_button(btn, product)
             
-            # Connect click event with error handling
-            btn.clicked.connect(lambda checked, p=product: self.add_to_cart_safe(p))
+            # Look the product up at click time so stock values are never stale
+            btn.clicked.connect(lambda checked, pid=product_id: self.add_product_by_id(pid))
             return btn
             
         except Exception as e:
@@ -641,6 +734,178 @@ class POSWidget(QWidget):
             """)
             return btn
     
+    def update_product_button(self, btn, product):
+        """Apply text and stock color of a product to its tile"""
+        # Safely extract product data
+        product_name = product[1] if len(product) > 1 else "Unknown"
+        product_sell_price = product[4] if len(product) > 4 else 0.0
+        product_quantity = product[5] if len(product) > 5 else 0
+        
+        # Determine button color based on stock
+        if product_quantity <= 0:
+            color = "#dc3545"  # Red for out of stock
+        elif product_quantity < 10:
+            color = "#ffc107"  # Yellow for low stock
+        else:
+            color = "#28a745"  # Green for good stock
+        
+        btn.setStyleSheet(f"""
+            QPushButton {{
+                background: {color};
+                color: white;
+                border: none;
+                border-radius: 10px;
+                padding: 10px;
+                font-weight: 600;
+                font-size: 12px;
+                text-align: center;
+            }}
+            QPushButton:hover {{
+                opacity: 0.9;
+                transform: scale(1.02);
+            }}
+            QPushButton:pressed {{
+                opacity: 0.8;
+                transform: scale(0.98);
+            }}
+        """)
+        
+        # Button text with product info
+        btn.setText(f"{product_name}\n{product_sell_price:.2f} DA\nStock: {product_quantity}")
+        btn.setEnabled(product_quantity > 0)
+        
+        # Cached thumbnail now, or set_product_thumbnail once it is decoded
+        thumbnail = self.thumbnails.thumbnail(product[0], product[2] if len(product) > 2 else None)
+        btn.setIcon(QIcon(thumbnail) if thumbnail is not None else QIcon())
+    
+    def set_product_thumbnail(self, product_id, pixmap):
+        """Show a thumbnail decoded in the background on its tile"""
+        btn = self.product_buttons.get(product_id)
+        if btn is not None:
+            btn.setIcon(QIcon(pixmap))
+    
+    def refresh_product_thumbnails(self):
+        """Pick up product images added or replaced on disk"""
+        for product_id, btn in self.product_buttons.items():
+            product = self.products_by_id.get(product_id)
+            if product is not None:
+                thumbnail = self.thumbnails.thumbnail(product_id, product[2])
+                btn.setIcon(QIcon(thumbnail) if thumbnail is not None else QIcon())
+    
+    def product_matches_search(self, product):
+        """Check a product against the current search term"""
+        search_term = self.search_input.text().lower()
+        if not search_term:
+            return True
+        return search_term in str(product[1]).lower() or search_term in str(product[2] or '')
+    
+    def apply_catalog_change(self, change):
+        """Apply a catalog diff to the product grid and cart without reloading"""
+        try:
+            changed_layout = False
+            
+            for product_id in change.deleted:
+                changed_layout |= self.remove_product_tile(product_id)
+            
+            for product_id in change.rows:
+                product = change.row_tuple(product_id)
+                btn = self.product_buttons.get(product_id)
+                
+                if not self.product_matches_search(product):
+                    changed_layout |= self.remove_product_tile(product_id)
+                    continue
+                
+                self.products_by_id[product_id] = product
+                if btn is None:
+                    btn = self.create_product_button(product)
+                    self.product_buttons[product_id] = btn
+                    changed_layout = True
+                else:
+                    self.update_product_button(btn, product)
+                    if 'name' in change.changed_fields(product_id):
+                        changed_layout = True  # Grid is ordered by name
+            
+            if changed_layout:
+                self.layout_product_grid()
+            
+            self.apply_catalog_change_to_cart(change)
+            
+        except RuntimeError:
+            pass  # Widget already deleted
+        except Exception as e:
+            print(f"Error applying catalog change: {e}")
+    
+    def remove_product_tile(self, product_id):
+        """Remove a single product tile, returning True if one was shown"""
+        self.products_by_id.pop(product_id, None)
+        btn = self.product_buttons.pop(product_id, None)
+        if btn is None:
+            return False
+        self.product_layout.removeWidget(btn)
+        btn.deleteLater()
+        return True
+    
+    def layout_product_grid(self):
+        """Place the existing product tiles in name order"""
+        ordered = sorted(self.products_by_id.values(), key=lambda p: str(p[1]))
+        
+        # Detach tiles without deleting them, then re-place
+        for btn in self.product_buttons.values():
+            self.product_layout.removeWidget(btn)
+        
+        max_cols = 3
+        for index, product in enumerate(ordered):
+            btn = self.product_buttons.get(product[0])
+            if btn is not None:
+                self.product_layout.addWidget(btn, index // max_cols, index % max_cols)
+    
+    def apply_catalog_change_to_cart(self, change):
+        """Refresh name and stock of cart lines whose product changed"""
+        for row, item in enumerate(self.cart_items):
+            product_id = item['id']
+            
+            if product_id in change.deleted:
+                item['stock'] = 0
+            elif product_id in change.rows:
+                fields = change.changed_fields(product_id)
+                product_row = change.rows[product_id]
+                if 'name' in fields:
+                    item['name'] = product_row['name']
+                    name_item = self.transaction_table.item(row, 0)
+                    if name_item is not None:
+                        name_item.setText(str(item['name']))
+                if 'quantity' not in fields:
+                    continue
+                item['stock'] = product_row['quantity']
+            else:
+                continue
+            
+            # Prices in the cart stay as quoted; only the stock column changes
+            self.transaction_table.blockSignals(True)
+            self.transaction_table.setItem(row, 3, self.create_stock_item(item['stock']))
+            self.transaction_table.blockSignals(False)
+    
+    def create_stock_item(self, stock):
+        """Create a color coded stock cell for the cart table"""
+        stock_item = QTableWidgetItem(str(stock))
+        stock_item.setFlags(stock_item.flags() & ~Qt.ItemIsEditable)
+        stock_item.setTextAlignment(Qt.AlignCenter)
+        if stock <= 0:
+            stock_item.setBackground(QColor(248, 215, 218))
+            stock_item.setForeground(QColor(220, 53, 69))
+        elif stock < 10:
+            stock_item.setBackground(QColor(255, 243, 205))
+            stock_item.setForeground(QColor(255, 193, 7))
+        return stock_item
+    
+    def add_product_by_id(self, product_id):
+        """Add the current version of a product to the cart"""
+        product = self.products_by_id.get(product_id)
+        if product is None:
+            QMessageBox.warning(self, "Error", "Product is no longer available")
+            return
+        self.add_to_cart_safe(product)
+    
     def add_to_cart_safe(self, product):
         """Safely add product to cart with comprehensive error handling"""
         try:
@@ -656,7 +921,7 @@ class POSWidget(QWidget):
             
             # Check stock availability
             if product_quantity <= 0:
-                QMessageBox.warning(self, "Out of Stock", f"Product '{product_name}' is out of stock!")
+                self.notify("Out of Stock", f"Product '{product_name}' is out of stock!", 'warning')
                 return
             
             # Check if product already in cart
@@ -671,8 +936,8 @@ class POSWidget(QWidget):
                 if existing_item['quantity'] < product_quantity:
                     existing_item['quantity'] += 1
                 else:
-                    QMessageBox.warning(self, "Insufficient Stock", 
-                                      f"Only {product_quantity} units available for '{product_name}'")
+                    self.notify("Insufficient Stock",
+                                f"Only {product_quantity} units available for '{product_name}'", 'warning')
                     return
             else:
                 # Add new item to cart
@@ -685,6 +950,8 @@ class POSWidget(QWidget):
                 }
                 self.cart_items.append(new_item)
             
+            self.basket_timer.item_added()
+            
             # Update displays
             self.update_transaction_table()
             self.update_total()
@@ -719,7 +986,7 @@ class POSWidget(QWidget):
         """Filter products based on search term with error handling"""
         try:
             search_term = self.search_input.text().lower()
-            cursor = self.parent.conn.cursor()
+            cursor = product_cursor(self.parent.conn)
             
             if search_term:
                 cursor.execute('''
@@ -732,24 +999,7 @@ class POSWidget(QWidget):
             
             products = cursor.fetchall()
             
-            # Clear existing buttons safely
-            self.clear_product_buttons()
-            
-            row, col = 0, 0
-            max_cols = 3
-            
-            for product in products:
-                try:
-                    btn = self.create_product_button(product)
-                    self.product_layout.addWidget(btn, row, col)
-                    
-                    col += 1
-                    if col >= max_cols:
-                        col = 0
-                        row += 1
-                except Exception as e:
-                    print(f"Error creating filtered button for product {product}: {e}")
-                    continue
+            self.populate_product_grid(products)
                     
         except Exception as e:
             print(f"Error filtering products: {e}")
@@ -766,6 +1016,9 @@ class POSWidget(QWidget):
     def update_transaction_table(self):
         """Update transaction table with error handling"""
         try:
+            if not self.cart_items:
+                self.basket_timer.reset()  # Paid, cleared or emptied line by line
+            
             self.transaction_table.setRowCount(len(self.cart_items))
             
             # Temporarily disconnect signal to avoid recursion
@@ -793,16 +1046,7 @@ class POSWidget(QWidget):
                     self.transaction_table.setItem(row, 2, qty_item)
                     
                     # Stock with color coding
-                    stock_item = QTableWidgetItem(str(item['stock']))
-                    stock_item.setFlags(stock_item.flags() & ~Qt.ItemIsEditable)
-                    stock_item.setTextAlignment(Qt.AlignCenter)
-                    if item['stock'] <= 0:
-                        stock_item.setBackground(QColor(248, 215, 218))
-                        stock_item.setForeground(QColor(220, 53, 69))
-                    elif item['stock'] < 10:
-                        stock_item.setBackground(QColor(255, 243, 205))
-                        stock_item.setForeground(QColor(255, 193, 7))
-                    self.transaction_table.setItem(row, 3, stock_item)
+                    self.transaction_table.setItem(row, 3, self.create_stock_item(item['stock']))
                     
                     # Total
                     total_item = QTableWidgetItem(f"{item['price'] * item['quantity']:.2f}")
@@ -877,6 +1121,9 @@ class POSWidget(QWidget):
             total_with_discount = self.total - self.remise
             self.total_display.setText(f"{total_with_discount:.2f} DA")
             self.calculate_change()
+            
+            # Reporting refreshes back off while items are being rung up
+            get_scheduler().set_checkout_active(self, bool(self.cart_items))
         except Exception as e:
             print(f"Error updating total: {e}")
             self.total_display.setText("Error")
@@ -979,19 +1226,22 @@ class POSWidget(QWidget):
         """Quick add product dialog"""
         try:
             dialog = QuickAddProductDialog(self)
-            if dialog.exec_() == QDialog.Accepted:
-                self.load_products()
+            dialog.exec_()  # The new tile arrives through the catalog feed
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to open quick add dialog: {str(e)}")
     
     def print_receipt(self):
         """Print receipt"""
         try:
-            if not self.cart_items:
+            if self.cart_items:
+                receipt_dialog = ReceiptDialog(self, self.cart_items, self.total - self.remise)
+            elif self.last_sale:
+                # Reprint the sale that was just completed
+                receipt_dialog = ReceiptDialog(self, *self.last_sale)
+            else:
                 QMessageBox.warning(self, "Empty Cart", "Add items to cart before printing receipt")
                 return
             
-            receipt_dialog = ReceiptDialog(self, self.cart_items, self.total - self.remise)
             receipt_dialog.exec_()
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to print receipt: {str(e)}")
@@ -1145,7 +1395,8 @@ class POSWidget(QWidget):
                 payment = float(self.payment_input.text() or 0)
                 total_with_discount = self.total - self.remise
                 
-                if payment < total_with_discount:
+                # Compare in cents: exact cash is the total rounded to 2 decimals
+                if round(payment, 2) < round(total_with_discount, 2):
                     QMessageBox.warning(self, "Insufficient Payment", 
                                       f"Payment amount ({payment:.2f} DA) is less than total ({total_with_discount:.2f} DA)")
                     return
@@ -1185,28 +1436,48 @@ class POSWidget(QWidget):
                 ))
                 
                 # Update product quantities
+                stock_before = fetch_product_rows(self.parent.conn,
+                                                  [item['id'] for item in self.cart_items])
                 for item in self.cart_items:
                     cursor.execute('UPDATE products SET quantity = quantity - ? WHERE id = ?',
                                  (item['quantity'], item['id']))
                 
                 self.parent.conn.commit()
                 
+                # Publish new stock levels so open grids update in place
+                get_catalog_events().publish_stock_changes(self.parent.conn, stock_before)
+                get_top_sellers(self.parent.conn).record_sale(self.cart_items)
+                cashier_id = self.parent.current_user['id'] if self.parent.current_user else None
+                item_count = sum(item['quantity'] for item in self.cart_items)
+                get_sales_sketches(self.parent.conn).record_sale(cashier_id, total_with_discount, item_count,
+                                                                 self.basket_timer.intervals())
+                get_lane_throughput(self.parent.conn).record_sale(cashier_id, item_count, self.basket_timer)
+                
                 # Show success message
-                change = payment - total_with_discount
+                change = max(0.0, round(payment - total_with_discount, 2))
                 success_msg = f"Sale completed successfully!\n\n"
                 success_msg += f"Ticket: {ticket_number}\n"
                 success_msg += f"Total: {total_with_discount:.2f} DA\n"
                 success_msg += f"Payment: {payment:.2f} DA\n"
                 success_msg += f"Change: {change:.2f} DA"
                 
-                QMessageBox.information(self, "Sale Completed", success_msg)
+                self.last_sale = (list(self.cart_items), total_with_discount)
                 
-                # Print receipt option
-                reply = QMessageBox.question(self, "Print Receipt", "Would you like to print the receipt?",
-                                           QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes)
-                if reply == QMessageBox.Yes:
-                    receipt_dialog = ReceiptDialog(self, self.cart_items, total_with_discount)
-                    receipt_dialog.exec_()
+                if self.express_mode:
+                    show_toast(self, f"{ticket_number} - Change: {change:.2f} DA", 'success', 4000)
+                else:
+                    QMessageBox.information(self, "Sale Completed", success_msg)
+                
+                # Print receipt according to the configured policy
+                policy = receipt_policy(self.settings)
+                if policy == 'Always':
+                    self.print_last_receipt_silently()
+                elif policy == 'Ask' and not self.express_mode:
+                    reply = QMessageBox.question(self, "Print Receipt", "Would you like to print the receipt?",
+                                               QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes)
+                    if reply == QMessageBox.Yes:
+                        receipt_dialog = ReceiptDialog(self, self.cart_items, total_with_discount)
+                        receipt_dialog.exec_()
                 
                 # Clear cart
                 self.cart_items = []
@@ -1214,7 +1485,6 @@ class POSWidget(QWidget):
                 self.payment_input.clear()
                 self.update_transaction_table()
                 self.update_total()
-                self.load_products()  # Refresh to show updated stock
                 
             except ValueError:
                 QMessageBox.warning(self, "Invalid Payment", "Please enter a valid payment amount")
@@ -1227,12 +1497,28 @@ class POSWidget(QWidget):
             QMessageBox.critical(self, "Critical Error", f"A critical error occurred: {str(e)}")
     
     def quick_cash_payment(self):
-        """Quick cash payment - set payment to exact total"""
+        """Quick cash payment - set payment to exact total
+
+        In express mode the sale is completed right away.
+        """
         try:
             total_with_discount = self.total - self.remise
             self.payment_input.setText(f"{total_with_discount:.2f}")
+            
+            if self.express_mode and self.cart_items:
+                self.process_sale()
         except Exception as e:
             print(f"Error setting quick cash payment: {e}")
+    
+    def print_last_receipt_silently(self):
+        """Send the last sale's receipt straight to the printer"""
+        if not self.last_sale:
+            return
+        
+        items, total = self.last_sale
+        cashier = self.parent.current_user['username'] if self.parent.current_user else None
+        if not send_receipt_to_printer(format_receipt(items, total, cashier)):
+            show_toast(self, "No printer available - receipt not printed", 'warning')
 
 # Dialog classes with full functionality
 class QuickAddProductDialog(QDialog):
@@ -1320,6 +1606,7 @@ class QuickAddProductDialog(QDialog):
             ''', (name, self.code_input.text().strip(), buy_price, sell_price, quantity, 'General', datetime.now().isoformat()))
             
             self.parent.parent.conn.commit()
+            get_catalog_events().publish_inserted(self.parent.parent.conn, [cursor.lastrowid])
             QMessageBox.information(self, "Success", "Product added successfully!")
             self.accept()
             
@@ -1851,33 +2138,41 @@ class ReceiptDialog(QDialog):
     
     def generate_receipt_content(self):
         """Generate receipt content"""
-        content = ""
-        content += "=" * 40 + "\n"
-        content += "           STORE MANAGER\n"
-        content += "        Professional POS\n"
-        content += "=" * 40 + "\n"
-        content += f"Date: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n"
-        if self.parent.parent.current_user:
-            content += f"Cashier: {self.parent.parent.current_user['username']}\n"
-        content += "-" * 40 + "\n"
-        
-        for item in self.cart_items:
-            content += f"{item['name']:<20}\n"
-            content += f"  {item['quantity']} x {item['price']:.2f} = {item['quantity'] * item['price']:.2f} DA\n"
-        
-        content += "-" * 40 + "\n"
-        content += f"{'TOTAL:':<30} {self.total:.2f} DA\n"
-        content += "=" * 40 + "\n"
-        content += "      Thank you for shopping!\n"
-        content += "         Visit us again!\n"
-        content += "=" * 40 + "\n"
-        
-        return content
+        cashier = self.parent.parent.current_user['username'] if self.parent.parent.current_user else None
+        return format_receipt(self.cart_items, self.total, cashier)
     
     def print_receipt(self):
         """Print the receipt"""
-        QMessageBox.information(self, "Print", "Receipt sent to printer!")
-        self.accept()
+        if send_receipt_to_printer(self.generate_receipt_content()):
+            QMessageBox.information(self, "Print", "Receipt sent to printer!")
+            self.accept()
+        else:
+            QMessageBox.warning(self, "Print", "No printer available")
+
+def format_receipt(cart_items, total, cashier=None):
+    """Build the plain text of a receipt"""
+    content = ""
+    content += "=" * 40 + "\n"
+    content += "           STORE MANAGER\n"
+    content += "        Professional POS\n"
+    content += "=" * 40 + "\n"
+    content += f"Date: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n"
+    if cashier:
+        content += f"Cashier: {cashier}\n"
+    content += "-" * 40 + "\n"
+    
+    for item in cart_items:
+        content += f"{item['name']:<20}\n"
+        content += f"  {item['quantity']} x {item['price']:.2f} = {item['quantity'] * item['price']:.2f} DA\n"
+    
+    content += "-" * 40 + "\n"
+    content += f"{'TOTAL:':<30} {total:.2f} DA\n"
+    content += "=" * 40 + "\n"
+    content += "      Thank you for shopping!\n"
+    content += "         Visit us again!\n"
+    content += "=" * 40 + "\n"
+    
+    return content
 
 class CustomerManagementDialog(QDialog):
     def __init__(self, parent):
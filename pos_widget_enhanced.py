@@ -8,8 +8,22 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from datetime import datetime
 import json
+import time
 import sqlite3
 from barcode_scanner_enhanced import BarcodeScannerWidget
+from scheduler import get_scheduler
+from catalog_events import get_catalog_events, fetch_product_rows
+from product_record import product_cursor
+from top_sellers import get_top_sellers
+from sales_sketches import get_sales_sketches
+from basket_timer import BasketTimer
+from lane_throughput import get_lane_throughput
+from toast import show_toast
+from express_checkout import (express_setting, receipt_policy, install_exact_cash_shortcut,
+                              send_receipt_to_printer)
+from unknown_barcodes import get_unknown_barcodes, UnknownBarcodesDialog
+from wedge_scanner import get_keyboard_wedge
+from scan_latency import get_scan_latency, ScanLatencyDialog
 
 class EnhancedPOSWidget(QWidget):
     """Enhanced POS Widget with barcode scanner integration"""
@@ -21,17 +35,46 @@ class EnhancedPOSWidget(QWidget):
         self.cart_items = []
         self.total_amount = 0.0
         self.selected_client = "Walk-in Customer"
+        self.quick_products = {}  # product_id -> current product row
+        self.quick_buttons = {}   # product_id -> tile
+        self.max_quick_products = 12
+        self.basket_timer = BasketTimer()
+        
+        self.last_receipt = None  # Receipt text of the last completed sale
         
         # Load settings
         self.load_settings()
+        self.express_mode = bool(express_setting(self.settings, 'express_checkout'))
+        self.unknown_barcodes = get_unknown_barcodes(self.conn)
+        self.latency = get_scan_latency()
+        self.latency.apply_settings(self.settings)
         
         # Initialize UI
         self.init_ui()
         
-        # Timer for clock
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_clock)
-        self.timer.start(1000)
+        # Single key completes a cash sale for the exact amount
+        install_exact_cash_shortcut(self, self.settings, self.quick_cash_payment)
+        self.unknown_barcodes.changed.connect(self.update_unknown_button)
+        
+        # Keyboard scanners go through the same lookup as the camera
+        wedge = get_keyboard_wedge()
+        wedge.apply_settings(self.settings)
+        wedge.register(self, self.barcode_scanner.search_product)
+        
+        # Apply product edits, additions and sales from any screen in place
+        get_catalog_events().catalog_changed.connect(self.apply_catalog_change)
+        
+        # Scan latency budget flag and metrics file
+        self.latency.budget_changed.connect(self.update_latency_button)
+        get_scheduler().register_job(self, 60000, self.latency.write_metrics,
+                                     name="scan_metrics", deferrable=True)
+        
+        # Quick keys follow what is selling this hour
+        get_scheduler().register_job(self, 60000, self.refresh_quick_products,
+                                     name="quick_products", deferrable=True)
+        
+        # Shared application clock
+        get_scheduler().connect_clock(self, self.update_clock)
         self.update_clock()
     
     def load_settings(self):
@@ -129,6 +172,38 @@ class EnhancedPOSWidget(QWidget):
             btn.clicked.connect(callback)
             buttons_layout.addWidget(btn)
         
+        # Express mode swaps modal dialogs for toasts
+        self.express_btn = QPushButton("⚡ Express")
+        self.express_btn.setCheckable(True)
+        self.express_btn.setChecked(self.express_mode)
+        self.express_btn.setStyleSheet("""
+            QPushButton {
+                background: #6c757d;
+                color: white;
+                border: none;
+                border-radius: 8px;
+                padding: 10px 15px;
+                font-weight: 600;
+                font-size: 12px;
+            }
+            QPushButton:checked {
+                background: #fd7e14;
+            }
+        """)
+        self.express_btn.toggled.connect(self.set_express_mode)
+        buttons_layout.addWidget(self.express_btn)
+        
+        self.unknown_btn = QPushButton()
+        self.unknown_btn.setStyleSheet(self.express_btn.styleSheet().replace("#6c757d", "#343a40"))
+        self.unknown_btn.clicked.connect(self.show_unknown_barcodes)
+        self.update_unknown_button()
+        buttons_layout.addWidget(self.unknown_btn)
+        
+        self.latency_btn = QPushButton()
+        self.latency_btn.clicked.connect(self.show_scan_latency)
+        self.update_latency_button(self.latency.over_budget)
+        buttons_layout.addWidget(self.latency_btn)
+        
         # Right side - Clock and info
         info_widget = QWidget()
         info_layout = QVBoxLayout()
@@ -192,7 +267,9 @@ class EnhancedPOSWidget(QWidget):
         
         # Create barcode scanner widget
         self.barcode_scanner = BarcodeScannerWidget(self, self.conn)
-        self.barcode_scanner.product_scanned.connect(self.on_product_scanned)
+        self.barcode_scanner.products_scanned.connect(self.on_products_scanned)
+        self.barcode_scanner.barcode_not_found.connect(self.on_unknown_barcode)
+        self.barcode_scanner.show_not_found_dialog = not self.express_mode
         
         scanner_layout.addWidget(self.barcode_scanner)
         scanner_group.setLayout(scanner_layout)
@@ -510,35 +587,201 @@ class EnhancedPOSWidget(QWidget):
         right_widget.setLayout(right_layout)
         return right_widget
     
-    def load_quick_products(self):
+    def set_express_mode(self, enabled):
+        """Switch between express (toasts) and normal (dialogs) checkout"""
+        self.express_mode = enabled
+        self.barcode_scanner.show_not_found_dialog = not enabled
+        show_toast(self, "Express checkout ON" if enabled else "Express checkout OFF")
+    
+    def notify(self, title, message, level='info'):
+        """Tell the cashier something without blocking scanning in express mode"""
+        if self.express_mode:
+            show_toast(self, f"{title}: {message}", level)
+        elif level in ('warning', 'error'):
+            QMessageBox.warning(self, title, message)
+        else:
+            QMessageBox.information(self, title, message)
+    
+    def on_unknown_barcode(self, barcode):
+        """Queue an unknown barcode for triage after the rush"""
+        self.unknown_barcodes.add(barcode)
+        if self.express_mode:
+            show_toast(self, f"Unknown barcode {barcode} queued", 'warning')
+    
+    def update_unknown_button(self, *args):
+        """Show how many unknown barcodes wait for triage"""
+        self.unknown_btn.setText(f"❓ Unknown ({len(self.unknown_barcodes)})")
+    
+    def update_latency_button(self, over_budget):
+        """Flag the lane when scans take longer than the budget"""
+        if over_budget:
+            self.latency_btn.setText("⚠ Scan Slow")
+            self.latency_btn.setStyleSheet(self.express_btn.styleSheet().replace("#6c757d", "#dc3545"))
+        else:
+            self.latency_btn.setText("⏱ Scan OK")
+            self.latency_btn.setStyleSheet(self.express_btn.styleSheet().replace("#6c757d", "#343a40"))
+    
+    def show_scan_latency(self):
+        """Open the scan latency diagnostics panel"""
+        dialog = ScanLatencyDialog(self, self.latency)
+        dialog.exec_()
+    
+    def show_unknown_barcodes(self):
+        """Open the unknown barcode triage list"""
+        dialog = UnknownBarcodesDialog(self, self.unknown_barcodes, self.quick_add_barcode)
+        dialog.exec_()
+    
+    def quick_add_barcode(self, barcode):
+        """Quick add a product for an unknown barcode"""
+        from pos_widget import QuickAddProductDialog
+        dialog = QuickAddProductDialog(self)
+        dialog.code_input.setText(barcode)
+        dialog.exec_()
+    
+    def select_quick_products(self):
+        """Best sellers of the last hour and week in stock, topped up by name"""
+        cursor = product_cursor(self.conn)
+        products = []
+        
+        trending = get_top_sellers(self.conn).trending_product_ids(self.max_quick_products)
+        if trending:
+            placeholders = ','.join('?' * len(trending))
+            cursor.execute(f'SELECT * FROM products WHERE quantity > 0 AND id IN ({placeholders})',
+                           trending)
+            in_stock = {product.id: product for product in cursor.fetchall()}
+            products = [in_stock[product_id] for product_id in trending if product_id in in_stock]
+        
+        if len(products) < self.max_quick_products:
+            chosen = {product.id for product in products}
+            cursor.execute('SELECT * FROM products WHERE quantity > 0 ORDER BY name LIMIT ?',
+                           (self.max_quick_products + len(chosen),))
+            for product in cursor.fetchall():
+                if len(products) >= self.max_quick_products:
+                    break
+                if product.id not in chosen:
+                    products.append(product)
+        
+        return products
+    
+    def refresh_quick_products(self):
+        """Swap the quick keys between sales when the best sellers changed"""
+        if self.cart_items:
+            return  # Keep the keys still while a sale is rung up
+        try:
+            products = self.select_quick_products()
+            if {product.id for product in products} != set(self.quick_products):
+                self.load_quick_products(products)
+        except Exception as e:
+            print(f"Error refreshing quick products: {e}")
+    
+    def load_quick_products(self, products=None):
         """Load quick access products"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute('SELECT * FROM products WHERE quantity > 0 ORDER BY name LIMIT 12')
-            products = cursor.fetchall()
+            if products is None:
+                products = self.select_quick_products()
             
             # Clear existing buttons
             for i in reversed(range(self.products_layout.count())): 
                 self.products_layout.itemAt(i).widget().setParent(None)
             
-            row, col = 0, 0
+            self.quick_products = {}
+            self.quick_buttons = {}
             for product in products:
-                btn = self.create_product_button(product)
-                self.products_layout.addWidget(btn, row, col)
-                
-                col += 1
-                if col >= 2:  # 2 columns
-                    col = 0
-                    row += 1
+                self.quick_products[product[0]] = product
+                self.quick_buttons[product[0]] = self.create_product_button(product)
+            
+            self.layout_quick_products()
                     
         except Exception as e:
             print(f"Error loading products: {e}")
     
+    def layout_quick_products(self):
+        """Place the existing quick product tiles in name order"""
+        ordered = sorted(self.quick_products.values(), key=lambda p: p[1])
+        
+        # Detach tiles without deleting them, then re-place
+        for btn in self.quick_buttons.values():
+            self.products_layout.removeWidget(btn)
+        
+        row, col = 0, 0
+        for product in ordered:
+            self.products_layout.addWidget(self.quick_buttons[product[0]], row, col)
+            
+            col += 1
+            if col >= 2:  # 2 columns
+                col = 0
+                row += 1
+    
+    def apply_catalog_change(self, change):
+        """Apply a catalog diff to the quick tiles and cart without reloading"""
+        try:
+            changed_layout = False
+            
+            for product_id in change.deleted:
+                changed_layout |= self.remove_quick_product(product_id)
+            
+            for product_id in change.rows:
+                product = change.row_tuple(product_id)
+                
+                if product_id in self.quick_products:
+                    if product[5] <= 0:
+                        # Sold out - drop just this tile
+                        changed_layout |= self.remove_quick_product(product_id)
+                    else:
+                        self.quick_products[product_id] = product
+                        self.update_product_button(self.quick_buttons[product_id], product)
+                        if 'name' in change.changed_fields(product_id):
+                            changed_layout = True  # Tiles are ordered by name
+                
+                elif product[5] > 0 and len(self.quick_products) < self.max_quick_products:
+                    # New or back in stock and there is room - add just this tile
+                    self.quick_products[product_id] = product
+                    self.quick_buttons[product_id] = self.create_product_button(product)
+                    changed_layout = True
+            
+            if changed_layout:
+                self.layout_quick_products()
+            
+            # Keep cart lines current; prices stay as quoted
+            for row, item in enumerate(self.cart_items):
+                if item['id'] in change.deleted:
+                    item['stock'] = 0
+                elif item['id'] in change.rows:
+                    product_row = change.rows[item['id']]
+                    item['stock'] = product_row['quantity']
+                    if 'name' in change.changed_fields(item['id']):
+                        item['name'] = product_row['name']
+                        name_item = self.cart_table.item(row, 0)
+                        if name_item is not None:
+                            name_item.setText(item['name'])
+                
+        except RuntimeError:
+            pass  # Widget already deleted
+        except Exception as e:
+            print(f"Error applying catalog change: {e}")
+    
+    def remove_quick_product(self, product_id):
+        """Remove a single quick tile, returning True if one was shown"""
+        self.quick_products.pop(product_id, None)
+        btn = self.quick_buttons.pop(product_id, None)
+        if btn is None:
+            return False
+        self.products_layout.removeWidget(btn)
+        btn.deleteLater()
+        return True
+    
     def create_product_button(self, product):
         """Create a product button"""
         btn = QPushButton()
         btn.setFixedSize(150, 100)
+        self.update_product_button(btn, product)
         
+        # Look the product up at click time so stock values are never stale
+        btn.clicked.connect(lambda checked, pid=product[0]: self.add_quick_product(pid))
+        return btn
+    
+    def update_product_button(self, btn, product):
+        """Apply text and stock color of a product to its tile"""
         # Determine color based on stock
         if product[5] <= 0:
             color = "#dc3545"
@@ -566,58 +809,85 @@ class EnhancedPOSWidget(QWidget):
         
         btn_text = f"{product[1]}\n{product[4]:.2f} DA\nStock: {product[5]}"
         btn.setText(btn_text)
-        
-        btn.clicked.connect(lambda: self.add_product_to_cart(product))
-        return btn
     
-    def on_product_scanned(self, product_dict):
+    def add_quick_product(self, product_id):
+        """Add the current version of a quick product to the cart"""
+        product = self.quick_products.get(product_id)
+        if product is not None:
+            self.add_product_to_cart(product)
+    
+    def on_product_scanned(self, product):
         """Handle product scanned from barcode scanner"""
-        # Convert dict back to tuple format for compatibility
-        product = (
-            product_dict['id'],
-            product_dict['name'],
-            product_dict['code_bar'],
-            product_dict['price_buy'],
-            product_dict['price_sell'],
-            product_dict['quantity'],
-            product_dict.get('category', 'General')
-        )
-        
-        self.add_product_to_cart(product)
-    
-    def add_product_to_cart(self, product):
-        """Add product to cart"""
+        self.on_products_scanned([(product, 1, [time.time()])])
+    
+    def on_products_scanned(self, scans):
+        """Add a batch of scans as one quantity change per product, then redraw the cart once"""
+        added = []
+        added_scan_times = []
+        for product, count, scan_times in scans:
+            if self.add_product_to_cart(product, refresh=False, quantity=count):
+                added.append(product.code_bar)
+                added_scan_times.extend(scan_times)
+        
+        if added:
+            # One scan per code read, timed when it was queued, not per drained batch
+            for when in sorted(added_scan_times):
+                self.basket_timer.scan(when)
+            self.update_cart_display()
+            for barcode in dict.fromkeys(added):
+                self.latency.finish(barcode)
+    
+    def add_product_to_cart(self, product, refresh=True, quantity=1):
+        """Add quantity units of a product to cart; returns True when any were added
+        
+        With refresh off the caller redraws the cart and finishes the
+        latency measurement after adding a whole batch.
+        """
         if not product or product[5] <= 0:
-            QMessageBox.warning(self, "Out of Stock", f"Product '{product[1]}' is out of stock!")
-            return
+            self.notify("Out of Stock", f"Product '{product[1]}' is out of stock!", 'warning')
+            return False
         
         # Check if product already in cart
         for item in self.cart_items:
             if item['id'] == product[0]:
-                if item['quantity'] < product[5]:
-                    item['quantity'] += 1
-                    item['total'] = item['quantity'] * item['price']
-                else:
-                    QMessageBox.warning(self, "Insufficient Stock", 
-                                      f"Only {product[5]} units available!")
-                    return
                 break
         else:
             # Add new item
-            cart_item = {
+            item = {
                 'id': product[0],
                 'name': product[1],
                 'price': product[4],
-                'quantity': 1,
-                'total': product[4],
+                'quantity': 0,
+                'total': 0,
                 'stock': product[5]
             }
-            self.cart_items.append(cart_item)
+            self.cart_items.append(item)
+        
+        available = product[5] - item['quantity']
+        if available <= 0:
+            self.notify("Insufficient Stock", f"Only {product[5]} units available!", 'warning')
+            return False
+        if quantity > available:
+            self.notify("Insufficient Stock", f"Only {product[5]} units available!", 'warning')
+            quantity = available
         
-        self.update_cart_display()
+        item['quantity'] += quantity
+        item['total'] = item['quantity'] * item['price']
+        self.basket_timer.item_added()
+        
+        self.latency.mark(product[2], 'added')
+        if refresh:
+            self.update_cart_display()
+            self.latency.finish(product[2])
+        return True
     
     def update_cart_display(self):
         """Update cart table and totals"""
+        if not self.cart_items:
+            self.basket_timer.reset()  # Paid, cleared or emptied line by line
+        
+        # One repaint for the whole table instead of one per cell
+        self.cart_table.setUpdatesEnabled(False)
         self.cart_table.setRowCount(len(self.cart_items))
         
         subtotal = 0
@@ -626,8 +896,11 @@ class EnhancedPOSWidget(QWidget):
             self.cart_table.setItem(i, 1, QTableWidgetItem(f"{item['price']:.2f}"))
             self.cart_table.setItem(i, 2, QTableWidgetItem(str(item['quantity'])))
             self.cart_table.setItem(i, 3, QTableWidgetItem(f"{item['total']:.2f}"))
+            subtotal += item['total']
             
-            # Remove button
+            # Remove button; a row keeps its button, which always removes that row
+            if self.cart_table.cellWidget(i, 4) is not None:
+                continue
             remove_btn = QPushButton("❌")
             remove_btn.setStyleSheet("""
                 QPushButton {
@@ -644,8 +917,8 @@ class EnhancedPOSWidget(QWidget):
             """)
             remove_btn.clicked.connect(lambda checked, row=i: self.remove_cart_item(row))
             self.cart_table.setCellWidget(i, 4, remove_btn)
-            
-            subtotal += item['total']
+        
+        self.cart_table.setUpdatesEnabled(True)
         
         # Update totals
         tax = subtotal * 0.19  # 19% tax
@@ -658,6 +931,9 @@ class EnhancedPOSWidget(QWidget):
         self.total_amount = total
         self.checkout_btn.setEnabled(len(self.cart_items) > 0)
         
+        # Reporting refreshes back off while items are being rung up
+        get_scheduler().set_checkout_active(self, bool(self.cart_items))
+        
         # Update payment amount
         self.payment_amount_input.setText(f"{total:.2f}")
         self.calculate_change()
@@ -701,16 +977,26 @@ class EnhancedPOSWidget(QWidget):
         try:
             payment_amount = float(self.payment_amount_input.text() or 0)
             
-            if payment_amount < self.total_amount:
+            # Compare in cents: exact cash is the total rounded to 2 decimals
+            if round(payment_amount, 2) < round(self.total_amount, 2):
                 QMessageBox.warning(self, "Insufficient Payment", 
                                   f"Payment amount is less than total!")
                 return
             
             # Process the sale
             if self.complete_sale(payment_amount):
-                change = payment_amount - self.total_amount
-                QMessageBox.information(self, "Payment Processed", 
-                                      f"Payment successful!\nChange: {change:.2f} DA")
+                change = max(0.0, round(payment_amount - self.total_amount, 2))
+                self.last_receipt = self.generate_receipt_content()
+                
+                if self.express_mode:
+                    show_toast(self, f"Payment successful - Change: {change:.2f} DA", 'success', 4000)
+                else:
+                    QMessageBox.information(self, "Payment Processed", 
+                                          f"Payment successful!\nChange: {change:.2f} DA")
+                
+                if receipt_policy(self.settings) == 'Always':
+                    if not send_receipt_to_printer(self.last_receipt):
+                        show_toast(self, "No printer available - receipt not printed", 'warning')
                 
                 # Clear cart
                 self.cart_items.clear()
@@ -720,6 +1006,15 @@ class EnhancedPOSWidget(QWidget):
         except ValueError:
             QMessageBox.warning(self, "Invalid Amount", "Please enter a valid payment amount!")
     
+    def quick_cash_payment(self):
+        """Exact cash payment - completes the sale in express mode"""
+        if not self.cart_items:
+            return
+        
+        self.payment_amount_input.setText(f"{self.total_amount:.2f}")
+        if self.express_mode:
+            self.process_payment()
+    
     def complete_sale(self, payment_amount):
         """Complete the sale and update database"""
         try:
@@ -744,11 +1039,23 @@ class EnhancedPOSWidget(QWidget):
                   self.selected_client, datetime.now().isoformat()))
             
             # Update product stock
+            stock_before = fetch_product_rows(self.conn, [item['id'] for item in self.cart_items])
             for item in self.cart_items:
                 cursor.execute('UPDATE products SET quantity = quantity - ? WHERE id = ?',
                              (item['quantity'], item['id']))
             
             self.conn.commit()
+            
+            # Publish new stock levels so open grids update in place
+            get_catalog_events().publish_stock_changes(self.conn, stock_before)
+            get_top_sellers(self.conn).record_sale(self.cart_items)
+            
+            current_user = getattr(self.parent, 'current_user', None)
+            cashier_id = current_user['id'] if current_user else None
+            item_count = sum(item['quantity'] for item in self.cart_items)
+            get_sales_sketches(self.conn).record_sale(cashier_id, self.total_amount, item_count,
+                                                      self.basket_timer.intervals())
+            get_lane_throughput(self.conn).record_sale(cashier_id, item_count, self.basket_timer)
             return True
             
         except Exception as e:
@@ -757,13 +1064,15 @@ class EnhancedPOSWidget(QWidget):
     
     def print_receipt(self):
         """Print receipt"""
-        if not self.cart_items:
+        if self.cart_items:
+            receipt_content = self.generate_receipt_content()
+        elif self.last_receipt:
+            # Reprint the sale that was just completed
+            receipt_content = self.last_receipt
+        else:
             QMessageBox.warning(self, "Empty Cart", "No items to print receipt for!")
             return
         
-        # Generate receipt content
-        receipt_content = self.generate_receipt_content()
-        
         # Show receipt dialog
         dialog = ReceiptDialog(self, receipt_content)
         dialog.exec_()
@@ -918,5 +1227,8 @@ class ReceiptDialog(QDialog):
     
     def print_receipt(self):
         """Print the receipt"""
-        QMessageBox.information(self, "Print", "Receipt sent to printer!")
-        self.accept()
\ No newline at end of file
+        if send_receipt_to_printer(self.content):
+            QMessageBox.information(self, "Print", "Receipt sent to printer!")
+            self.accept()
+        else:
+            QMessageBox.warning(self, "Print", "No printer available")
\ No newline at end of file
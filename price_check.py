@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Price Check Kiosk for POS System
+Read-only barcode price lookup for wall-mounted price checkers
+
+Usage: python price_check.py [--db pos_database.db] [--fullscreen]
+
+Only PyQt5 core widgets and sqlite3 are imported. The catalog is copied
+into memory once at start-up and the database is closed again, so the
+kiosk never locks it and every scan is a dictionary lookup.
+"""
+
+import os
+import sys
+import sqlite3
+
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtWidgets import QApplication, QLabel, QLineEdit, QVBoxLayout, QWidget
+
+
+RESULT_TIMEOUT_MS = 5000     # Back to the idle screen after showing a price
+RELOAD_CHECK_MS = 60000      # How often to look for catalog changes
+
+
+class CatalogSnapshot:
+    """In-memory copy of the barcode, name and price of every product"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.products = {}  # code_bar -> (name, price_sell, quantity)
+        self.store_name = "Smart Store"
+        self.currency = "DA"
+        self.loaded_mtime = None
+
+    def load(self):
+        """Read the catalog through a read-only connection"""
+        try:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+            try:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT code_bar, name, price_sell, quantity
+                    FROM products
+                    WHERE code_bar IS NOT NULL AND code_bar != ''
+                ''')
+                self.products = {str(code).strip(): (name, price, quantity)
+                                 for code, name, price, quantity in cursor.fetchall()}
+
+                cursor.execute("SELECT key, value FROM settings WHERE key IN ('store_name', 'currency')")
+                settings = dict(cursor.fetchall())
+                self.store_name = settings.get('store_name') or self.store_name
+                self.currency = settings.get('currency') or self.currency
+            finally:
+                conn.close()
+
+            self.loaded_mtime = os.path.getmtime(self.db_path)
+            return True
+        except Exception as e:
+            print(f"Error loading catalog: {e}")
+            return False
+
+    def reload_if_changed(self):
+        """Take a new snapshot when the database file was modified"""
+        try:
+            if os.path.getmtime(self.db_path) != self.loaded_mtime:
+                self.load()
+        except OSError as e:
+            print(f"Error checking catalog: {e}")
+
+    def lookup(self, code):
+        """Find a product, allowing for UPC-A codes stored as EAN-13 and back"""
+        code = code.strip()
+        candidates = [code]
+        if len(code) == 12:
+            candidates.append("0" + code)
+        elif len(code) == 13 and code.startswith("0"):
+            candidates.append(code[1:])
+
+        for candidate in candidates:
+            product = self.products.get(candidate)
+            if product is not None:
+                return product
+        return None
+
+
+class PriceCheckWindow(QWidget):
+    """Single screen that shows the price of the scanned product"""
+
+    def __init__(self, catalog):
+        super().__init__()
+        self.catalog = catalog
+        self.init_ui()
+
+        self.reset_timer = QTimer(self)
+        self.reset_timer.setSingleShot(True)
+        self.reset_timer.timeout.connect(self.show_idle)
+
+        self.reload_timer = QTimer(self)
+        self.reload_timer.timeout.connect(self.catalog.reload_if_changed)
+        self.reload_timer.start(RELOAD_CHECK_MS)
+
+        self.show_idle()
+
+    def init_ui(self):
+        self.setWindowTitle("Price Check")
+        self.setStyleSheet("background: #1f2d3d; color: white;")
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(40, 40, 40, 40)
+
+        self.store_label = QLabel(self.catalog.store_name)
+        self.store_label.setAlignment(Qt.AlignCenter)
+        self.store_label.setStyleSheet("font-size: 28px; font-weight: 600; color: #adb5bd;")
+
+        self.name_label = QLabel()
+        self.name_label.setAlignment(Qt.AlignCenter)
+        self.name_label.setWordWrap(True)
+        self.name_label.setStyleSheet("font-size: 40px; font-weight: 600;")
+
+        self.price_label = QLabel()
+        self.price_label.setAlignment(Qt.AlignCenter)
+        self.price_label.setStyleSheet("font-size: 96px; font-weight: 700; color: #28a745;")
+
+        # Keyboard-wedge scanners type the code followed by Enter
+        self.code_input = QLineEdit()
+        self.code_input.setAlignment(Qt.AlignCenter)
+        self.code_input.setStyleSheet("""
+            font-size: 18px;
+            padding: 8px;
+            border: 1px solid #34495e;
+            border-radius: 6px;
+            background: #2c3e50;
+            color: #adb5bd;
+        """)
+        self.code_input.returnPressed.connect(self.check_price)
+
+        layout.addWidget(self.store_label)
+        layout.addStretch()
+        layout.addWidget(self.name_label)
+        layout.addWidget(self.price_label)
+        layout.addStretch()
+        layout.addWidget(self.code_input)
+        self.setLayout(layout)
+
+    def show_idle(self):
+        """Invite the customer to scan"""
+        self.name_label.setText("Scan a product to check its price")
+        self.price_label.setText("")
+        self.code_input.clear()
+        self.code_input.setFocus()
+
+    def check_price(self):
+        """Look up the scanned code in the snapshot"""
+        code = self.code_input.text()
+        self.code_input.clear()
+        if not code.strip():
+            return
+
+        product = self.catalog.lookup(code)
+        if product is None:
+            self.name_label.setText("Product not found\nPlease ask a member of staff")
+            self.price_label.setText("")
+        else:
+            name, price, quantity = product
+            self.name_label.setText(name if quantity > 0 else f"{name}\n(currently out of stock)")
+            self.price_label.setText(f"{price:.2f} {self.catalog.currency}")
+
+        self.reset_timer.start(RESULT_TIMEOUT_MS)
+
+
+def main():
+    """Start the price check kiosk"""
+    args = sys.argv[1:]
+    db_path = "pos_database.db"
+    if "--db" in args and args.index("--db") + 1 < len(args):
+        db_path = args[args.index("--db") + 1]
+
+    catalog = CatalogSnapshot(db_path)
+    if not catalog.load():
+        print("Run database_setup.py first or pass --db with the store database")
+
+    app = QApplication(sys.argv)
+    window = PriceCheckWindow(catalog)
+
+    if "--fullscreen" in args:
+        window.setCursor(Qt.BlankCursor)
+        window.showFullScreen()
+    else:
+        window.resize(800, 480)
+        window.show()
+
+    sys.exit(app.exec_())
+
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,7 @@ from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 import sqlite3
+from catalog_events import get_catalog_events, fetch_product_rows
 
 class ProductDialog(QDialog):
     def __init__(self, parent, title, product=None):
@@ -124,9 +125,11 @@ class ProductDialog(QDialog):
                 QMessageBox.warning(self, "Erreur", "Le nom du produit est requis!")
                 return
             
-            cursor = self.parent.parent.conn.cursor()
+            conn = self.parent.parent.conn
+            cursor = conn.cursor()
             
             if self.product:  # Edit existing product
+                before_rows = fetch_product_rows(conn, [self.product[0]])
                 cursor.execute('''
                     UPDATE products 
                     SET name=?, code_bar=?, price_buy=?, price_sell=?, quantity=?, category=?
@@ -138,7 +141,13 @@ class ProductDialog(QDialog):
                     VALUES (?, ?, ?, ?, ?, ?)
                 ''', (name, code_bar, price_buy, price_sell, quantity, category))
             
-            self.parent.parent.conn.commit()
+            conn.commit()
+            
+            # Let open screens apply the change in place
+            if self.product:
+                get_catalog_events().publish_updated(conn, before_rows)
+            else:
+                get_catalog_events().publish_inserted(conn, [cursor.lastrowid])
             self.accept()
             
         except ValueError:
@@ -7,6 +7,9 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdi
 from PyQt5.QtGui import QColor
 from PyQt5.QtCore import Qt
 
+from catalog_events import get_catalog_events, fetch_product_rows
+from catalog_audit import NUMPY_AVAILABLE, CatalogAuditDialog, audit_catalog, load_catalog
+
 class ProductManagementWidget(QWidget):
     def __init__(self, parent):
         super().__init__(parent)
@@ -79,10 +82,28 @@ class ProductManagementWidget(QWidget):
         """)
         refresh_btn.clicked.connect(self.load_products)
         
+        audit_btn = QPushButton("🩺 Audit")
+        audit_btn.setStyleSheet("""
+            QPushButton {
+                background: #f39c12;
+                color: white;
+                padding: 12px 24px;
+                border-radius: 8px;
+                font-weight: 600;
+                font-size: 14px;
+            }
+            QPushButton:hover {
+                background: #d68910;
+            }
+        """)
+        audit_btn.setToolTip("Find duplicate or invalid barcodes, negative stock and prices below cost")
+        audit_btn.clicked.connect(self.audit_catalog)
+        
         header_layout.addWidget(back_btn)
         header_layout.addWidget(title_label)
         header_layout.addStretch()
         header_layout.addWidget(add_btn)
+        header_layout.addWidget(audit_btn)
         header_layout.addWidget(refresh_btn)
         
         # Search and filter
@@ -463,10 +484,24 @@ class ProductManagementWidget(QWidget):
                 cursor = self.parent.conn.cursor()
                 cursor.execute('DELETE FROM products WHERE id = ?', (product[0],))
                 self.parent.conn.commit()
+                get_catalog_events().publish_deleted([product[0]])
                 QMessageBox.information(self, "Success", "Product deleted successfully!")
                 self.load_products()
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to delete product: {str(e)}")
+    
+    def audit_catalog(self):
+        """Check the whole catalog and show the fix-up report"""
+        if not NUMPY_AVAILABLE:
+            QMessageBox.warning(self, "Catalog Audit",
+                                "The catalog audit needs numpy. Install it with: pip install numpy")
+            return
+        try:
+            report = audit_catalog(load_catalog(self.parent.conn))
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to audit catalog: {str(e)}")
+            return
+        CatalogAuditDialog(self, report).exec_()
 
 class ProductDialog(QDialog):
     def __init__(self, parent, product=None):
@@ -570,9 +605,11 @@ class ProductDialog(QDialog):
             sell_price = float(sell_price_text)
             quantity = int(self.quantity_input.text() or 0)
             
-            cursor = self.parent.parent.conn.cursor()
+            conn = self.parent.parent.conn
+            cursor = conn.cursor()
             
             if self.product:  # Edit existing product
+                before_rows = fetch_product_rows(conn, [self.product[0]])
                 cursor.execute('''
                     UPDATE products 
                     SET name = ?, code_bar = ?, price_buy = ?, price_sell = ?, 
@@ -589,7 +626,13 @@ class ProductDialog(QDialog):
                       quantity, self.category_input.text().strip()))
                 message = "Product added successfully!"
             
-            self.parent.parent.conn.commit()
+            conn.commit()
+            
+            # Let open screens apply the change in place
+            if self.product:
+                get_catalog_events().publish_updated(conn, before_rows)
+            else:
+                get_catalog_events().publish_inserted(conn, [cursor.lastrowid])
             QMessageBox.information(self, "Success", message)
             self.accept()
             
@@ -0,0 +1,93 @@
+"""
+Product Record for POS System
+Compact product row type produced directly by sqlite3
+"""
+
+
+PRODUCT_COLUMNS = ('id', 'name', 'code_bar', 'price_buy', 'price_sell',
+                   'quantity', 'category', 'created_date', 'updated_date')
+
+
+class Product:
+    """One row of the products table
+
+    Attributes live in __slots__, so a product costs about as much memory
+    as the tuple sqlite3 would return and far less than a dict. Existing
+    code keeps working unchanged: product[4] reads by position like the
+    tuple did, and product['price_sell'] / product.get('category') read
+    by column like the {column: value} rows of catalog events did.
+    """
+
+    __slots__ = PRODUCT_COLUMNS
+
+    def __init__(self, id=None, name=None, code_bar=None, price_buy=None, price_sell=None,
+                 quantity=None, category=None, created_date=None, updated_date=None):
+        self.id = id
+        self.name = name
+        self.code_bar = code_bar
+        self.price_buy = price_buy
+        self.price_sell = price_sell
+        self.quantity = quantity
+        self.category = category
+        self.created_date = created_date
+        self.updated_date = updated_date
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key not in PRODUCT_COLUMNS:
+                raise KeyError(key)
+            return getattr(self, key)
+        if isinstance(key, slice):
+            return tuple(self)[key]
+        return getattr(self, PRODUCT_COLUMNS[key])
+
+    def __len__(self):
+        return len(PRODUCT_COLUMNS)
+
+    def __iter__(self):
+        for column in PRODUCT_COLUMNS:
+            yield getattr(self, column)
+
+    def __eq__(self, other):
+        if isinstance(other, (Product, tuple)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    def __hash__(self):
+        # Equal to the row tuple, so hash like it too
+        return hash(tuple(self))
+
+    def __repr__(self):
+        return f"Product(id={self.id!r}, name={self.name!r}, code_bar={self.code_bar!r})"
+
+    def get(self, column, default=None):
+        """Column value, like dict.get"""
+        return getattr(self, column, default) if column in PRODUCT_COLUMNS else default
+
+    def keys(self):
+        return PRODUCT_COLUMNS
+
+    def items(self):
+        return zip(PRODUCT_COLUMNS, self)
+
+
+def product_factory(cursor, row):
+    """sqlite3 row factory building Product records
+
+    Rows of SELECT * become Product records, also on older products tables
+    that lack the trailing date columns; those read as None. Any selection
+    that is not a leading run of the product columns in table order comes
+    back as the plain tuple sqlite3 would return, so product[i] always reads
+    the i-th selected column.
+    """
+    names = tuple(description[0] for description in cursor.description)
+    if names == PRODUCT_COLUMNS[:len(names)]:
+        return Product(*row)
+    return row
+
+
+def product_cursor(conn):
+    """Cursor whose rows are Product records"""
+    cursor = conn.cursor()
+    cursor.row_factory = product_factory
+    return cursor
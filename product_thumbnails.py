@@ -0,0 +1,391 @@
+"""
+Product Thumbnails for POS System
+Indexed product image directory with background decoding and a pixmap cache
+"""
+
+import os
+import json
+from itertools import chain
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+
+
+IMAGE_EXTENSIONS = ('.jpg', '.png', '.jpeg')  # Preferred first when a product has several
+THUMBNAIL_SIZE = 96
+ATLAS_COLUMNS = 32
+ATLAS_SHARD_SIZE = ATLAS_COLUMNS * 8  # Thumbnails per atlas file
+MAX_ATLAS_SHARDS = 16                 # Atlas files kept at most
+
+DEFAULT_THUMBNAIL_SETTINGS = {
+    'thumbnail_cache_mb': 32,
+    'thumbnail_atlas': True,
+}
+
+
+class ProductImageIndex(QObject):
+    """Images of the product image directory by name
+
+    The directory is listed once, then again only when QFileSystemWatcher
+    reports a change, so finding a product's image is a dictionary lookup
+    instead of a series of os.path.exists calls.
+    """
+
+    changed = pyqtSignal(set)  # image names added, removed or modified
+
+    def __init__(self, images_dir, parent=None):
+        super().__init__(parent)
+        self.images_dir = images_dir
+        self.entries = {}  # 'product_12' / 'barcode_5901234123457' -> (path, mtime)
+
+        self.rescan_timer = QTimer(self)
+        self.rescan_timer.setSingleShot(True)
+        self.rescan_timer.setInterval(200)  # Copying many images fires many changes
+        self.rescan_timer.timeout.connect(self.refresh)
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(lambda *args: self.rescan_timer.start())
+
+        self.refresh()
+
+    def refresh(self):
+        """List the directory and report what changed"""
+        if os.path.isdir(self.images_dir) and not self.watcher.directories():
+            self.watcher.addPath(self.images_dir)
+
+        entries = {}
+        try:
+            with os.scandir(self.images_dir) as scan:
+                for entry in scan:
+                    name, extension = os.path.splitext(entry.name)
+                    extension = extension.lower()
+                    if extension not in IMAGE_EXTENSIONS or not entry.is_file():
+                        continue
+                    current = entries.get(name)
+                    if current and (IMAGE_EXTENSIONS.index(os.path.splitext(current[0])[1].lower())
+                                    <= IMAGE_EXTENSIONS.index(extension)):
+                        continue
+                    entries[name] = (entry.path, entry.stat().st_mtime)
+        except OSError as e:
+            print(f"Error indexing product images: {e}")
+
+        changed = {name for name in entries.keys() | self.entries.keys()
+                   if entries.get(name) != self.entries.get(name)}
+        self.entries = entries
+        if changed:
+            self.changed.emit(changed)
+
+    def lookup(self, product_id, barcode=None):
+        """(path, mtime) of a product's image, or None"""
+        entry = self.entries.get(f"product_{product_id}")
+        if entry is None and barcode:
+            entry = self.entries.get(f"barcode_{barcode}")
+        return entry
+
+
+class ThumbnailSignals(QObject):
+    """Carries finished thumbnails from the pool back to the GUI thread"""
+
+    loaded = pyqtSignal(str, QImage)  # cache key, thumbnail (null on failure)
+    atlas_loaded = pyqtSignal(int, object)  # shard, {cache key: (cell, QImage)}
+    atlas_saved = pyqtSignal(int, object)   # shard, {cache key: cell} or None on failure
+
+
+class ThumbnailTask(QRunnable):
+    """Decode one image straight to thumbnail size"""
+
+    def __init__(self, key, path, size, signals):
+        super().__init__()
+        self.key = key
+        self.path = path
+        self.size = size
+        self.signals = signals
+
+    def run(self):
+        reader = QImageReader(self.path)
+        reader.setAutoTransform(True)
+        original = reader.size()
+        if original.isValid():
+            # JPEG decoders scale while decoding, which is much cheaper
+            reader.setScaledSize(original.scaled(self.size, self.size, Qt.KeepAspectRatio))
+
+        image = reader.read()
+        if image.isNull():
+            print(f"Error loading thumbnail {self.path}: {reader.errorString()}")
+        self.signals.loaded.emit(self.key, image)
+
+
+class AtlasLoadTask(QRunnable):
+    """Decode one atlas file and cut out the thumbnails that are still current"""
+
+    def __init__(self, shard, image_path, index_path, valid, signals):
+        super().__init__()
+        self.shard = shard
+        self.image_path = image_path
+        self.index_path = index_path
+        self.valid = valid
+        self.signals = signals
+
+    def run(self):
+        thumbnails = {}
+        try:
+            with open(self.index_path, 'r') as f:
+                cells = json.load(f)
+            if any(key in self.valid for key in cells):
+                atlas = QImage(self.image_path)
+                if not atlas.isNull():
+                    thumbnails = {key: (tuple(cell), atlas.copy(*cell))
+                                  for key, cell in cells.items() if key in self.valid}
+        except Exception as e:
+            print(f"Error loading thumbnail atlas {self.image_path}: {e}")
+        self.signals.atlas_loaded.emit(self.shard, thumbnails)
+
+
+class AtlasSaveTask(QRunnable):
+    """Paint one atlas file from its kept cells and new thumbnails
+
+    Both files are written next to their final names; the GUI thread
+    renames them into place when the task reports back.
+    """
+
+    def __init__(self, shard, image_path, index_path, kept, images, signals):
+        super().__init__()
+        self.shard = shard
+        self.image_path = image_path
+        self.index_path = index_path
+        self.kept = kept      # cache key -> cell in the current file
+        self.images = images  # cache key -> QImage not saved yet
+        self.signals = signals
+
+    def run(self):
+        try:
+            kept = self.kept
+            old_atlas = QImage(self.image_path) if kept else QImage()
+            if old_atlas.isNull():
+                kept = {}
+
+            thumbnails = chain(((key, old_atlas.copy(*cell)) for key, cell in kept.items()),
+                               self.images.items())
+            rows = (len(kept) + len(self.images) + ATLAS_COLUMNS - 1) // ATLAS_COLUMNS
+
+            atlas = QImage(ATLAS_COLUMNS * THUMBNAIL_SIZE, max(1, rows) * THUMBNAIL_SIZE,
+                           QImage.Format_ARGB32)
+            atlas.fill(Qt.transparent)
+            cells = {}
+            painter = QPainter(atlas)
+            for position, (key, image) in enumerate(thumbnails):
+                x = (position % ATLAS_COLUMNS) * THUMBNAIL_SIZE
+                y = (position // ATLAS_COLUMNS) * THUMBNAIL_SIZE
+                painter.drawImage(x, y, image)
+                cells[key] = (x, y, image.width(), image.height())
+            painter.end()
+
+            if not atlas.save(f"{self.image_path}.tmp", "PNG"):
+                raise IOError("could not write atlas image")
+            with open(f"{self.index_path}.tmp", 'w') as f:
+                json.dump(cells, f)
+            self.signals.atlas_saved.emit(self.shard, cells)
+        except Exception as e:
+            print(f"Error saving thumbnail atlas: {e}")
+            self.signals.atlas_saved.emit(self.shard, None)
+
+
+class ProductThumbnails(QObject):
+    """Product thumbnails for the grids, never decoded on the GUI thread
+
+    thumbnail() answers from QPixmapCache, which evicts the least recently
+    used pixmaps beyond its size limit. A miss queues the image on a
+    thread pool and thumbnail_ready follows once it is decoded. Default
+    size thumbnails can be persisted in atlas images so later start-ups
+    decode a few files instead of every product image. The atlas is split
+    into files of ATLAS_SHARD_SIZE thumbnails that are read and written on
+    the pool; a save rewrites only the file receiving the new thumbnails.
+    """
+
+    thumbnail_ready = pyqtSignal(object, QPixmap)  # product_id, thumbnail
+    thumbnails_changed = pyqtSignal()  # Images were added, replaced or removed
+
+    def __init__(self, images_dir="product_images", parent=None):
+        super().__init__(parent)
+        self.index = ProductImageIndex(images_dir, self)
+        self.index.changed.connect(self.on_images_changed)
+
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max(1, min(4, QThread.idealThreadCount() - 1)))
+        self.signals = ThumbnailSignals(self)
+        self.signals.loaded.connect(self.on_thumbnail_loaded)
+        self.signals.atlas_loaded.connect(self.on_atlas_loaded)
+        self.signals.atlas_saved.connect(self.on_atlas_saved)
+        self.waiting = {}  # cache key -> product ids waiting for it
+        self.failed = set()  # cache keys of images that cannot be decoded
+
+        self.atlas_enabled = DEFAULT_THUMBNAIL_SETTINGS['thumbnail_atlas']
+        self.atlas_dir = os.path.join(images_dir, ".thumbnails")
+        self.atlas_shards = {}   # shard -> {cache key: (x, y, w, h)} in its saved file
+        self.atlas_cells = {}    # cache key -> shard holding it
+        self.atlas_pending = {}  # cache key -> QImage not saved yet
+        self.atlas_saving = {}   # cache key -> QImage being written by a save task
+        self.atlas_loaded = False
+        self.atlas_loading = 0   # Atlas files still being read
+        self.atlas_timer = QTimer(self)
+        self.atlas_timer.setSingleShot(True)
+        self.atlas_timer.setInterval(3000)
+        self.atlas_timer.timeout.connect(self.save_atlas)
+
+        QPixmapCache.setCacheLimit(DEFAULT_THUMBNAIL_SETTINGS['thumbnail_cache_mb'] * 1024)
+
+    def apply_settings(self, settings):
+        """Read cache size and atlas settings from app settings"""
+        settings = settings or {}
+        cache_mb = settings.get('thumbnail_cache_mb', DEFAULT_THUMBNAIL_SETTINGS['thumbnail_cache_mb'])
+        QPixmapCache.setCacheLimit(int(cache_mb) * 1024)
+        self.atlas_enabled = bool(settings.get('thumbnail_atlas', DEFAULT_THUMBNAIL_SETTINGS['thumbnail_atlas']))
+        if self.atlas_enabled and not self.atlas_loaded:
+            self.load_atlas()
+
+    def cache_key(self, entry, size):
+        """Key that changes whenever the image file is replaced"""
+        path, mtime = entry
+        return f"thumb:{os.path.basename(path)}:{mtime:.3f}:{size}"
+
+    def thumbnail(self, product_id, barcode=None, size=THUMBNAIL_SIZE):
+        """Cached thumbnail, or None while it loads or when there is no image"""
+        entry = self.index.lookup(product_id, barcode)
+        if entry is None:
+            return None
+
+        key = self.cache_key(entry, size)
+        pixmap = QPixmapCache.find(key)
+        if pixmap is not None and not pixmap.isNull():
+            return pixmap
+        if key in self.failed:
+            return None
+
+        if key not in self.waiting:
+            self.waiting[key] = set()
+            self.pool.start(ThumbnailTask(key, entry[0], size, self.signals))
+        self.waiting[key].add(product_id)
+        return None
+
+    def on_thumbnail_loaded(self, key, image):
+        """Cache a decoded thumbnail and hand it to whoever asked"""
+        product_ids = self.waiting.pop(key, set())
+        if image.isNull():
+            self.failed.add(key)
+            return
+
+        pixmap = QPixmap.fromImage(image)
+        QPixmapCache.insert(key, pixmap)
+
+        if self.atlas_enabled and key.endswith(f":{THUMBNAIL_SIZE}") and key not in self.atlas_cells:
+            self.atlas_pending[key] = image
+            self.atlas_timer.start()
+
+        for product_id in product_ids:
+            self.thumbnail_ready.emit(product_id, pixmap)
+
+    def on_images_changed(self, names):
+        """Let the grids ask again after images changed on disk"""
+        self.failed.clear()
+        self.thumbnails_changed.emit()
+
+    # Atlas
+    def atlas_paths(self, shard):
+        return (os.path.join(self.atlas_dir, f"atlas_{shard}.png"),
+                os.path.join(self.atlas_dir, f"atlas_{shard}.json"))
+
+    def current_atlas_keys(self):
+        """Cache keys of default size thumbnails for the images on disk now"""
+        return {self.cache_key(entry, THUMBNAIL_SIZE) for entry in self.index.entries.values()}
+
+    def load_atlas(self):
+        """Fill the cache from the saved atlas files, decoded on the pool"""
+        self.atlas_loaded = True
+        for legacy in ("atlas.png", "atlas.json"):  # Single-file atlas of earlier versions
+            try:
+                os.remove(os.path.join(self.atlas_dir, legacy))
+            except OSError:
+                pass
+        valid = self.current_atlas_keys()
+        for shard in range(MAX_ATLAS_SHARDS):
+            image_path, index_path = self.atlas_paths(shard)
+            if os.path.exists(image_path) and os.path.exists(index_path):
+                self.atlas_loading += 1
+                self.pool.start(AtlasLoadTask(shard, image_path, index_path, valid, self.signals))
+
+    def on_atlas_loaded(self, shard, thumbnails):
+        """Cache the thumbnails of one atlas file"""
+        self.atlas_loading -= 1
+        self.atlas_shards[shard] = {key: cell for key, (cell, image) in thumbnails.items()}
+        for key, (cell, image) in thumbnails.items():
+            QPixmapCache.insert(key, QPixmap.fromImage(image))
+            self.atlas_cells[key] = shard
+            self.atlas_pending.pop(key, None)
+
+    def save_atlas(self):
+        """Hand newly decoded thumbnails to a save task for the first file with room
+
+        Only that file is rewritten, dropping its thumbnails of replaced
+        images. Once every file is full, further thumbnails are not saved.
+        """
+        if not self.atlas_pending:
+            return
+        if self.atlas_saving or self.atlas_loading:
+            self.atlas_timer.start()  # One task per file at a time
+            return
+
+        valid = self.current_atlas_keys()
+        pending = [(key, image) for key, image in self.atlas_pending.items()
+                   if key in valid and key not in self.atlas_cells]
+        self.atlas_pending = {}
+        if not pending:
+            return
+
+        for shard in range(MAX_ATLAS_SHARDS):
+            kept = {key: cell for key, cell in self.atlas_shards.get(shard, {}).items() if key in valid}
+            room = ATLAS_SHARD_SIZE - len(kept)
+            if room > 0:
+                break
+        else:
+            return  # Atlas full
+
+        self.atlas_saving = dict(pending[:room])
+        self.atlas_pending = dict(pending[room:])
+        image_path, index_path = self.atlas_paths(shard)
+        try:
+            os.makedirs(self.atlas_dir, exist_ok=True)
+        except OSError as e:
+            print(f"Error saving thumbnail atlas: {e}")
+            self.atlas_saving = {}
+            return
+        self.pool.start(AtlasSaveTask(shard, image_path, index_path, kept,
+                                      dict(self.atlas_saving), self.signals))
+
+    def on_atlas_saved(self, shard, cells):
+        """Move a written atlas file into place"""
+        self.atlas_saving = {}
+        if cells is not None:
+            image_path, index_path = self.atlas_paths(shard)
+            try:
+                os.replace(f"{image_path}.tmp", image_path)
+                os.replace(f"{index_path}.tmp", index_path)
+                for key in self.atlas_shards.get(shard, {}):
+                    if self.atlas_cells.get(key) == shard:
+                        del self.atlas_cells[key]
+                self.atlas_shards[shard] = cells
+                for key in cells:
+                    self.atlas_cells[key] = shard
+            except OSError as e:
+                print(f"Error saving thumbnail atlas: {e}")
+        if self.atlas_pending:
+            self.atlas_timer.start()
+
+_product_thumbnails = None
+
+
+def get_product_thumbnails():
+    """Get the application-wide product thumbnail service"""
+    global _product_thumbnails
+    if _product_thumbnails is None:
+        _product_thumbnails = ProductThumbnails(parent=QCoreApplication.instance())
+    return _product_thumbnails
@@ -0,0 +1,240 @@
+"""
+Sales Chart Widget for POS System
+QPainter-based time-series chart with downsampling for long ranges
+"""
+
+from bisect import bisect_left
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+
+
+def lttb_downsample(values, threshold):
+    """Largest-Triangle-Three-Buckets downsampling
+
+    Returns the indices of the points to keep. The first and last points
+    are always kept and peaks survive, which plain striding would lose.
+    """
+    count = len(values)
+    if threshold >= count or threshold < 3:
+        return list(range(count))
+
+    indices = [0]
+    bucket_size = (count - 2) / (threshold - 2)
+    a = 0
+
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third triangle vertex
+        next_start = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, count)
+        if next_start >= next_end:
+            next_start = next_end - 1
+        avg_x = (next_start + next_end - 1) / 2.0
+        avg_y = sum(values[next_start:next_end]) / (next_end - next_start)
+
+        # Pick the point of this bucket with the largest triangle area
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        ax, ay = a, values[a]
+        best_area = -1.0
+        best_index = start
+
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (values[j] - ay) - (ax - j) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best_index = j
+
+        indices.append(best_index)
+        a = best_index
+
+    indices.append(count - 1)
+    return indices
+
+
+class SalesChartWidget(QWidget):
+    """Time-series chart that paints itself instead of building widgets
+
+    Data is replaced in place with set_data(). The downsampled points and
+    painter paths are cached and only rebuilt when the data or the widget
+    size changes; hover tooltips read from the cached points.
+    """
+
+    def __init__(self, parent=None, color="#4285f4", value_suffix=" DA"):
+        super().__init__(parent)
+        self.color = QColor(color)
+        self.value_suffix = value_suffix
+        self.labels = []
+        self.values = []
+
+        # Cache rebuilt lazily in paintEvent
+        self.cache_valid = False
+        self.line_path = QPainterPath()
+        self.area_path = QPainterPath()
+        self.points = []       # [(QPointF, index)] of kept samples
+        self.point_xs = []     # x pixels of kept samples for hover lookup
+        self.max_value = 0.0
+        self.hover_index = None
+
+        self.margins = QMargins(55, 12, 12, 28)
+        self.setMinimumHeight(120)
+        self.setMouseTracking(True)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+
+    def set_data(self, labels, values):
+        """Replace the series and schedule a repaint"""
+        self.labels = list(labels)
+        self.values = [float(v or 0) for v in values]
+        self.hover_index = None
+        self.invalidate()
+
+    def set_color(self, color):
+        """Change the series color"""
+        self.color = QColor(color)
+        self.update()
+
+    def invalidate(self):
+        """Drop cached paths so they are rebuilt on next paint"""
+        self.cache_valid = False
+        self.update()
+
+    def plot_rect(self):
+        """Area inside the axis margins"""
+        return QRectF(self.rect().marginsRemoved(self.margins))
+
+    def rebuild_cache(self):
+        """Downsample to the pixel width and build the painter paths"""
+        self.line_path = QPainterPath()
+        self.area_path = QPainterPath()
+        self.points = []
+        self.point_xs = []
+        self.cache_valid = True
+
+        if not self.values:
+            self.max_value = 0.0
+            return
+
+        rect = self.plot_rect()
+        self.max_value = max(self.values) or 1.0
+        count = len(self.values)
+
+        # One sample per pixel column is the most the screen can show
+        indices = lttb_downsample(self.values, max(int(rect.width()), 3))
+        x_step = rect.width() / (count - 1) if count > 1 else 0.0
+
+        for index in indices:
+            x = rect.left() + index * x_step if count > 1 else rect.center().x()
+            y = rect.bottom() - (self.values[index] / self.max_value) * rect.height()
+            point = QPointF(x, y)
+            self.points.append((point, index))
+            self.point_xs.append(x)
+
+        first_point = self.points[0][0]
+        self.line_path.moveTo(first_point)
+        self.area_path.moveTo(QPointF(first_point.x(), rect.bottom()))
+        self.area_path.lineTo(first_point)
+
+        for point, _ in self.points[1:]:
+            self.line_path.lineTo(point)
+            self.area_path.lineTo(point)
+
+        self.area_path.lineTo(QPointF(self.points[-1][0].x(), rect.bottom()))
+        self.area_path.closeSubpath()
+
+    def format_value(self, value):
+        """Format a value for axis labels and tooltips"""
+        return f"{value:,.0f}{self.value_suffix}"
+
+    def paintEvent(self, event):
+        """Paint the cached chart"""
+        if not self.cache_valid:
+            self.rebuild_cache()
+
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        rect = self.plot_rect()
+
+        # Grid and axis labels
+        painter.setPen(QPen(QColor("#e9ecef"), 1))
+        for step in range(5):
+            y = rect.top() + rect.height() * step / 4
+            painter.drawLine(QPointF(rect.left(), y), QPointF(rect.right(), y))
+
+        painter.setPen(QColor("#6c757d"))
+        font = painter.font()
+        font.setPointSize(8)
+        painter.setFont(font)
+
+        if not self.points:
+            painter.drawText(rect, Qt.AlignCenter, "No sales data")
+            painter.end()
+            return
+
+        painter.drawText(QRectF(0, rect.top() - 6, self.margins.left() - 6, 12),
+                         Qt.AlignRight | Qt.AlignVCenter, self.format_value(self.max_value))
+        painter.drawText(QRectF(0, rect.bottom() - 6, self.margins.left() - 6, 12),
+                         Qt.AlignRight | Qt.AlignVCenter, self.format_value(0))
+
+        if self.labels:
+            label_rect = QRectF(rect.left(), rect.bottom() + 6, rect.width(), 14)
+            painter.drawText(label_rect, Qt.AlignLeft, str(self.labels[0]))
+            painter.drawText(label_rect, Qt.AlignRight, str(self.labels[-1]))
+            if len(self.labels) > 2:
+                painter.drawText(label_rect, Qt.AlignHCenter,
+                                 str(self.labels[len(self.labels) // 2]))
+
+        # Series
+        fill = QColor(self.color)
+        fill.setAlpha(40)
+        painter.fillPath(self.area_path, fill)
+        painter.setPen(QPen(self.color, 2))
+        painter.drawPath(self.line_path)
+
+        # Markers only when samples are far enough apart to be seen
+        if len(self.points) <= rect.width() / 8:
+            painter.setBrush(self.color)
+            for point, _ in self.points:
+                painter.drawEllipse(point, 3, 3)
+
+        # Hover marker
+        if self.hover_index is not None:
+            point = self.points[self.hover_index][0]
+            painter.setPen(QPen(QColor("#adb5bd"), 1, Qt.DashLine))
+            painter.drawLine(QPointF(point.x(), rect.top()), QPointF(point.x(), rect.bottom()))
+            painter.setPen(QPen(Qt.white, 2))
+            painter.setBrush(self.color)
+            painter.drawEllipse(point, 5, 5)
+
+        painter.end()
+
+    def resizeEvent(self, event):
+        """Pixel width changed - downsample again"""
+        self.cache_valid = False
+        super().resizeEvent(event)
+
+    def mouseMoveEvent(self, event):
+        """Show the nearest sample as a tooltip"""
+        if not self.cache_valid:
+            self.rebuild_cache()
+        if not self.points:
+            return
+
+        x = event.pos().x()
+        position = bisect_left(self.point_xs, x)
+        candidates = [i for i in (position - 1, position) if 0 <= i < len(self.points)]
+        nearest = min(candidates, key=lambda i: abs(self.point_xs[i] - x))
+
+        if nearest != self.hover_index:
+            self.hover_index = nearest
+            index = self.points[nearest][1]
+            label = self.labels[index] if index < len(self.labels) else str(index)
+            QToolTip.showText(event.globalPos(),
+                              f"{label}: {self.format_value(self.values[index])}", self)
+            self.update()
+
+    def leaveEvent(self, event):
+        """Clear the hover marker"""
+        self.hover_index = None
+        QToolTip.hideText()
+        self.update()
+        super().leaveEvent(event)
@@ -0,0 +1,295 @@
+"""
+Sales Sketches for POS System
+Mergeable quantile sketches of ticket value, basket size and scan pace per day and cashier
+"""
+
+import json
+import random
+from datetime import datetime
+from PyQt5.QtCore import *
+
+
+SKETCH_K = 200  # Rank error around 1% per sketch; a day of sales is usually kept exactly
+
+METRICS = {
+    'ticket_value': "Ticket value (DA)",
+    'basket_items': "Items per basket",
+    'scan_interval': "Seconds between scans",
+}
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+TICKET_METRICS = ('ticket_value', 'basket_items')  # Metrics that can be rebuilt from tickets
+
+
+class KLLSketch:
+    """KLL quantile sketch (Karnin, Lang and Liberty)
+
+    Values enter level 0; a full level is sorted and every other value
+    moves up a level, where it stands for twice the weight. Lower levels
+    get geometrically smaller capacities, so the sketch keeps about 3k
+    values however many it has seen. Two sketches merge by joining their
+    levels, which is what lets daily sketches add up to any period.
+    """
+
+    def __init__(self, k=SKETCH_K):
+        self.k = k
+        self.levels = [[]]
+        self.count = 0
+        self.min = None
+        self.max = None
+
+    def capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return int(self.k * (2 / 3) ** depth) + 2
+
+    def max_size(self):
+        return sum(self.capacity(level) for level in range(len(self.levels)))
+
+    def size(self):
+        return sum(len(values) for values in self.levels)
+
+    def update(self, value):
+        """Add one value"""
+        self.levels[0].append(value)
+        self.count += 1
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if self.size() >= self.max_size():
+            self.compress()
+
+    def compress(self):
+        """Compact full levels until the sketch is under its size budget"""
+        while self.size() >= self.max_size():
+            for level, values in enumerate(self.levels):
+                if len(values) >= self.capacity(level):
+                    if level + 1 == len(self.levels):
+                        self.levels.append([])
+                    values.sort()
+                    # Keep an unpaired value at this level
+                    keep = values.pop() if len(values) % 2 else None
+                    self.levels[level + 1].extend(values[random.getrandbits(1)::2])
+                    self.levels[level] = [keep] if keep is not None else []
+                    break
+            else:
+                break
+
+    def merge(self, other):
+        """Add another sketch's values into this one"""
+        if not other.count:
+            return
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for level, values in enumerate(other.levels):
+            self.levels[level].extend(values)
+        self.count += other.count
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self.compress()
+
+    def quantiles(self, fractions=QUANTILES):
+        """Estimated value at each fraction of the sorted data, None when empty"""
+        if not self.count:
+            return [None for fraction in fractions]
+
+        weighted = sorted((value, 1 << level) for level, values in enumerate(self.levels) for value in values)
+        total = sum(weight for value, weight in weighted)
+        results = []
+        for fraction in fractions:
+            if fraction <= 0:
+                results.append(self.min)
+                continue
+            if fraction >= 1:
+                results.append(self.max)
+                continue
+            target = fraction * total
+            seen = 0
+            for value, weight in weighted:
+                seen += weight
+                if seen >= target:
+                    break
+            results.append(value)
+        return results
+
+    def to_json(self):
+        return json.dumps({'k': self.k, 'n': self.count, 'min': self.min, 'max': self.max,
+                           'levels': self.levels}, separators=(',', ':'))
+
+    @classmethod
+    def from_json(cls, text):
+        data = json.loads(text)
+        sketch = cls(data.get('k', SKETCH_K))
+        sketch.levels = data.get('levels') or [[]]
+        sketch.count = data.get('n', 0)
+        sketch.min = data.get('min')
+        sketch.max = data.get('max')
+        return sketch
+
+
+class SalesSketches(QObject):
+    """Quantile sketches of every metric per day and cashier
+
+    Each committed sale updates today's sketches of its cashier, which
+    are written back to the sales_sketches table as compact JSON. A period
+    is answered by merging its daily rows, never by reading tickets. Days
+    from before the table existed are built once from the ticket history;
+    those have no scan intervals. Deleting a ticket rebuilds the ticket
+    metrics of its day; scan intervals are not kept per ticket and stay.
+    """
+
+    updated = pyqtSignal()
+
+    def __init__(self, conn, parent=None):
+        super().__init__(parent)
+        self.conn = conn
+        self.open_day = None
+        self.open_sketches = {}  # (cashier_id, metric) -> KLLSketch of open_day
+        self.ensure_table()
+
+    def ensure_table(self):
+        """Create the sketch table, backfilling it from tickets when new"""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS sales_sketches (
+                    day TEXT NOT NULL,
+                    cashier_id INTEGER NOT NULL DEFAULT 0,
+                    metric TEXT NOT NULL,
+                    sketch TEXT NOT NULL,
+                    PRIMARY KEY (day, cashier_id, metric)
+                )
+            ''')
+            cursor.execute('SELECT COUNT(*) FROM sales_sketches')
+            if cursor.fetchone()[0] == 0:
+                self.backfill(cursor)
+            self.conn.commit()
+        except Exception as e:
+            print(f"Error creating sales sketch table: {e}")
+
+    def backfill(self, cursor):
+        """Sketch the ticket history in one pass"""
+        self.save_ticket_sketches(cursor, self.sketch_tickets(cursor))
+
+    def sketch_tickets(self, cursor, day=None):
+        """{(day, cashier_id, metric): KLLSketch} of the tickets, of one day if given"""
+        where, params = ('WHERE date LIKE ?', (f"{day}%",)) if day else ('', ())
+        try:
+            cursor.execute(f'SELECT date, total_price, items, cashier_id FROM tickets {where}', params)
+        except Exception:
+            cursor.execute(f'SELECT date, total_price, items, NULL FROM tickets {where}', params)  # Tickets without cashiers
+
+        sketches = {}
+        for sold_at, total, items, cashier_id in cursor.fetchall():
+            try:
+                sold_on = str(sold_at)[:10]
+                item_count = sum(item.get('quantity', 0) for item in json.loads(items or '[]'))
+            except Exception as e:
+                print(f"Error reading ticket from {sold_at}: {e}")
+                continue
+            for metric, value in zip(TICKET_METRICS, (total or 0, item_count)):
+                sketches.setdefault((sold_on, cashier_id or 0, metric), KLLSketch()).update(value)
+        return sketches
+
+    def save_ticket_sketches(self, cursor, sketches):
+        cursor.executemany('INSERT OR REPLACE INTO sales_sketches (day, cashier_id, metric, sketch) VALUES (?, ?, ?, ?)',
+                           [(day, cashier_id, metric, sketch.to_json())
+                            for (day, cashier_id, metric), sketch in sketches.items()])
+
+    def rebuild_day(self, day):
+        """Re-sketch a day's ticket metrics from its remaining tickets, e.g. after a deletion"""
+        try:
+            cursor = self.conn.cursor()
+            sketches = self.sketch_tickets(cursor, day)
+            placeholders = ", ".join("?" for _ in TICKET_METRICS)
+            cursor.execute(f'DELETE FROM sales_sketches WHERE day = ? AND metric IN ({placeholders})',
+                           (day,) + TICKET_METRICS)
+            self.save_ticket_sketches(cursor, sketches)
+            self.conn.commit()
+        except Exception as e:
+            print(f"Error rebuilding sales sketches of {day}: {e}")
+        if day == self.open_day:
+            self.open_sketches = {}
+        self.updated.emit()
+
+    def sketch_for(self, day, cashier_id, metric):
+        """Today's sketch of a cashier and metric, read once per day"""
+        if day != self.open_day:
+            self.open_day = day
+            self.open_sketches = {}
+
+        key = (cashier_id, metric)
+        if key not in self.open_sketches:
+            cursor = self.conn.cursor()
+            cursor.execute('SELECT sketch FROM sales_sketches WHERE day = ? AND cashier_id = ? AND metric = ?',
+                           (day, cashier_id, metric))
+            row = cursor.fetchone()
+            self.open_sketches[key] = KLLSketch.from_json(row[0]) if row else KLLSketch()
+        return self.open_sketches[key]
+
+    def record_sale(self, cashier_id, total, item_count, scan_intervals=(), when=None):
+        """Add a committed sale to today's sketches"""
+        day = (when or datetime.now()).strftime("%Y-%m-%d")
+        cashier_id = cashier_id or 0
+        values = {
+            'ticket_value': [total],
+            'basket_items': [item_count],
+            'scan_interval': [round(interval, 3) for interval in scan_intervals],
+        }
+
+        try:
+            rows = []
+            for metric, metric_values in values.items():
+                if not metric_values:
+                    continue
+                sketch = self.sketch_for(day, cashier_id, metric)
+                for value in metric_values:
+                    sketch.update(value)
+                rows.append((day, cashier_id, metric, sketch.to_json()))
+
+            cursor = self.conn.cursor()
+            cursor.executemany('INSERT OR REPLACE INTO sales_sketches (day, cashier_id, metric, sketch) VALUES (?, ?, ?, ?)',
+                               rows)
+            self.conn.commit()
+        except Exception as e:
+            print(f"Error saving sales sketches: {e}")
+        self.updated.emit()
+
+    def merged(self, metric, since=None, until=None, cashier_id=None):
+        """One sketch of a metric over days since..until (YYYY-MM-DD, inclusive)"""
+        query = 'SELECT sketch FROM sales_sketches WHERE metric = ?'
+        params = [metric]
+        if since:
+            query += ' AND day >= ?'
+            params.append(since)
+        if until:
+            query += ' AND day <= ?'
+            params.append(until)
+        if cashier_id is not None:
+            query += ' AND cashier_id = ?'
+            params.append(cashier_id)
+
+        sketch = KLLSketch()
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(query, params)
+            for (text,) in cursor.fetchall():
+                sketch.merge(KLLSketch.from_json(text))
+        except Exception as e:
+            print(f"Error reading sales sketches: {e}")
+        return sketch
+
+    def quantiles(self, metric, since=None, until=None, cashier_id=None, fractions=QUANTILES):
+        """(number of values, [value at each fraction]) of a metric over a period"""
+        sketch = self.merged(metric, since, until, cashier_id)
+        return sketch.count, sketch.quantiles(fractions)
+
+
+_sales_sketches = None
+
+
+def get_sales_sketches(conn):
+    """Get the application-wide sales sketches"""
+    global _sales_sketches
+    if _sales_sketches is None:
+        _sales_sketches = SalesSketches(conn, QCoreApplication.instance())
+    return _sales_sketches
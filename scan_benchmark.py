@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Scan Benchmark for POS System
+Replays a recording through each decoder configuration and reports throughput
+
+Usage: python scan_benchmark.py VIDEO_OR_FOLDER [--labels labels.csv]
+                                [--config NAME ...] [--realtime] [--json out.json]
+
+The labels file has one "frame,barcode" line per expected code. The frame
+is the image file name for folders and the frame number (from 0) for videos.
+Frames without a label are expected to contain no barcode.
+
+False negatives are counted only on frames the decoder looked at; labels
+on frames it chose to skip are reported on their own. Recall is also
+measured per appearance (a run of consecutive frames showing a code), which
+is what a cashier notices: an appearance counts as found when any of its
+frames decoded the code.
+"""
+
+import sys
+import csv
+import json
+import time
+import argparse
+import cv2
+from frame_sources import FileSource
+from decode_scheduler import DecodeScheduler
+from decoder_backends import DECODER_BACKENDS, DEFAULT_BACKEND, create_backend
+
+
+class FixedCadenceDecoder:
+    """Decode every nth frame at full resolution, the original behaviour"""
+
+    def __init__(self, every=1, backend=DEFAULT_BACKEND):
+        self.every = every
+        self.count = 0
+        self.decode = create_backend(backend)
+
+    def __call__(self, gray):
+        self.count += 1
+        if (self.count - 1) % self.every:
+            return None
+        return [barcode.data.decode('utf-8') for barcode in self.decode(gray)]
+
+
+class SchedulerDecoder:
+    """Motion-gated DecodeScheduler as used by the camera threads"""
+
+    def __init__(self, backend=DEFAULT_BACKEND, **options):
+        self.scheduler = DecodeScheduler(create_backend(backend), **options)
+
+    def __call__(self, gray):
+        skipped = self.scheduler.stats['skipped']
+        detections = self.scheduler.process(gray)
+        if self.scheduler.stats['skipped'] != skipped:
+            return None
+        return [detection.data for detection in detections]
+
+
+# name -> factory of a decoder; a decoder returns codes, or None when it skipped the frame
+BENCHMARK_CONFIGS = {
+    'every-frame': lambda: FixedCadenceDecoder(1),
+    'every-3rd': lambda: FixedCadenceDecoder(3),
+    'scheduler': lambda: SchedulerDecoder(),
+    'scheduler-full-only': lambda: SchedulerDecoder(reduced_width=100000),
+}
+# Every decoder backend on every frame, to compare backends directly
+BENCHMARK_CONFIGS.update({f'backend-{name}': (lambda name=name: FixedCadenceDecoder(1, name))
+                          for name in DECODER_BACKENDS})
+
+
+def load_labels(path):
+    """{frame name: set of expected barcodes}"""
+    labels = {}
+    with open(path, newline='') as f:
+        for row in csv.reader(f):
+            if len(row) >= 2 and not row[0].startswith('#'):
+                labels.setdefault(row[0].strip(), set()).add(row[1].strip())
+    return labels
+
+
+def run_config(name, path, labels, realtime):
+    """Replay the recording once through one decoder configuration"""
+    decoder = BENCHMARK_CONFIGS[name]()
+    source = FileSource(path, realtime=realtime)
+    if not source.open():
+        raise RuntimeError(f"Could not open {path}")
+
+    frames = decodes = found = false_negatives = false_positives = skipped_labels = 0
+    appearances = missed_appearances = 0
+    open_appearances = {}  # code -> decoded in its current appearance yet
+    decode_wall = decode_cpu = 0.0
+    started = time.perf_counter()
+
+    try:
+        while True:
+            ret, frame = source.read()
+            if not ret:
+                break
+            frames += 1
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+
+            wall, cpu = time.perf_counter(), time.process_time()
+            codes = decoder(gray)
+            decode_wall += time.perf_counter() - wall
+            decode_cpu += time.process_time() - cpu
+
+            skipped = codes is None
+            codes = set(codes or [])
+            decodes += not skipped
+            found += bool(codes)
+
+            if labels is not None:
+                expected = labels.get(source.frame_name, set())
+                if skipped:
+                    skipped_labels += len(expected)
+                else:
+                    false_negatives += len(expected - codes)
+                    false_positives += len(codes - expected)
+
+                for code in list(open_appearances):
+                    if code not in expected:
+                        appearances += 1
+                        missed_appearances += not open_appearances.pop(code)
+                for code in expected:
+                    open_appearances[code] = open_appearances.get(code, False) or code in codes
+    finally:
+        source.release()
+
+    appearances += len(open_appearances)
+    missed_appearances += sum(not decoded for decoded in open_appearances.values())
+
+    elapsed = time.perf_counter() - started
+    return {
+        'config': name,
+        'frames': frames,
+        'decodes': decodes,
+        'frames_with_codes': found,
+        'decodes_per_second': decodes / decode_wall if decode_wall else 0.0,
+        'frames_per_second': frames / elapsed if elapsed else 0.0,
+        'cpu_ms_per_decode': decode_cpu * 1000 / decodes if decodes else 0.0,
+        'cpu_ms_per_frame': decode_cpu * 1000 / frames if frames else 0.0,
+        'false_negatives': false_negatives if labels is not None else None,
+        'false_positives': false_positives if labels is not None else None,
+        'skipped_labels': skipped_labels if labels is not None else None,
+        'appearances': appearances if labels is not None else None,
+        'missed_appearances': missed_appearances if labels is not None else None,
+        'expected_codes': sum(len(codes) for codes in labels.values()) if labels is not None else None,
+    }
+
+
+def print_report(results):
+    """Print one line per configuration"""
+    header = (f"{'config':<22}{'frames':>8}{'decodes':>9}{'dec/s':>9}{'cpu ms/dec':>12}"
+              f"{'cpu ms/frm':>12}{'FN':>6}{'FP':>6}{'skip':>6}{'missed':>10}")
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        if result['false_negatives'] is None:
+            fn = fp = skip = missed = "-"
+        else:
+            fn, fp, skip = result['false_negatives'], result['false_positives'], result['skipped_labels']
+            missed = f"{result['missed_appearances']}/{result['appearances']}"
+        print(f"{result['config']:<22}{result['frames']:>8}{result['decodes']:>9}"
+              f"{result['decodes_per_second']:>9.1f}{result['cpu_ms_per_decode']:>12.2f}"
+              f"{result['cpu_ms_per_frame']:>12.2f}{fn:>6}{fp:>6}{skip:>6}{missed:>10}")
+
+
+def main():
+    """Run the benchmark from the command line"""
+    parser = argparse.ArgumentParser(description="Benchmark barcode decoding on a recording")
+    parser.add_argument('source', help="video file or folder of images")
+    parser.add_argument('--labels', help="CSV of frame,barcode for false negative counts")
+    parser.add_argument('--config', action='append', choices=sorted(BENCHMARK_CONFIGS),
+                        help="decoder configuration to run (default: all)")
+    parser.add_argument('--realtime', action='store_true',
+                        help="replay at the recording frame rate instead of maximum speed")
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args()
+
+    labels = load_labels(args.labels) if args.labels else None
+    results = []
+    for name in args.config or list(BENCHMARK_CONFIGS):
+        try:
+            results.append(run_config(name, args.source, labels, args.realtime))
+        except Exception as e:
+            print(f"Error running {name}: {e}")
+
+    print_report(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    return 0 if results else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
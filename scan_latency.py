@@ -0,0 +1,236 @@
+"""
+Scan Latency Metrics for POS System
+Times every stage from camera frame to cart row and keeps rolling percentiles
+"""
+
+import os
+import json
+import math
+import time
+import platform
+import threading
+from collections import deque
+from datetime import datetime
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+
+
+# Each stage ends at the named mark and starts at the previous one
+STAGES = [
+    ('decode', 'decoded'),      # frame captured -> pyzbar result
+    ('signal', 'received'),     # barcode_detected emitted -> widget slot
+    ('lookup', 'looked_up'),    # product query in search_product
+    ('cart', 'added'),          # product_scanned -> cart item updated
+    ('render', 'rendered'),     # update_cart_display
+]
+
+DEFAULT_LATENCY_SETTINGS = {
+    'scan_latency_budget_ms': 300,
+    'scan_metrics_file': 'scan_metrics.json',
+}
+
+WINDOW_SIZE = 500       # Scans kept per stage for the rolling percentiles
+MIN_BUDGET_SAMPLES = 20 # Do not flag a lane on a handful of scans
+TRACE_TIMEOUT = 5.0     # Seconds before an unfinished trace is dropped
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class ScanLatencyTracker(QObject):
+    """Rolling per-stage latency of camera scans
+
+    The scanner thread opens a trace for a barcode with the frame and
+    decode times; the GUI marks each later stage. Finished traces feed a
+    fixed window of durations per stage from which p50/p95/p99 are taken.
+    """
+
+    updated = pyqtSignal()
+    budget_changed = pyqtSignal(bool)  # True when p95 is over budget
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.lock = threading.Lock()
+        self.traces = {}  # barcode -> {mark: monotonic time}
+        self.durations = {name: deque(maxlen=WINDOW_SIZE) for name, mark in STAGES}
+        self.durations['total'] = deque(maxlen=WINDOW_SIZE)
+        self.budget_ms = DEFAULT_LATENCY_SETTINGS['scan_latency_budget_ms']
+        self.metrics_file = DEFAULT_LATENCY_SETTINGS['scan_metrics_file']
+        self.over_budget = False
+        self.lane = platform.node() or "lane"
+
+    def apply_settings(self, settings):
+        """Read the budget and metrics file from app settings"""
+        settings = settings or {}
+        self.budget_ms = settings.get('scan_latency_budget_ms', DEFAULT_LATENCY_SETTINGS['scan_latency_budget_ms'])
+        self.metrics_file = settings.get('scan_metrics_file', DEFAULT_LATENCY_SETTINGS['scan_metrics_file'])
+        self.check_budget()
+
+    def begin(self, barcode, frame_time, decoded_time):
+        """Open a trace; called from the scanner thread"""
+        with self.lock:
+            trace = self.traces.get(barcode)
+            if trace and decoded_time - trace['decoded'] < TRACE_TIMEOUT:
+                return  # Another camera already reported this scan
+            self.traces[barcode] = {'frame': frame_time, 'decoded': decoded_time}
+
+    def mark(self, barcode, mark):
+        """Timestamp a stage of an open trace"""
+        with self.lock:
+            trace = self.traces.get(barcode)
+            if trace is not None:
+                trace[mark] = time.monotonic()
+
+    def discard(self, barcode):
+        """Drop a trace that will never reach the cart"""
+        with self.lock:
+            self.traces.pop(barcode, None)
+
+    def finish(self, barcode):
+        """Close a trace once its cart row is painted"""
+        now = time.monotonic()
+        with self.lock:
+            trace = self.traces.pop(barcode, None)
+            # Forget traces abandoned on the way (e.g. out of stock)
+            self.traces = {code: t for code, t in self.traces.items()
+                           if now - t['decoded'] < TRACE_TIMEOUT}
+        if trace is None:
+            return
+
+        trace['rendered'] = now
+        previous = trace['frame']
+        for name, mark in STAGES:
+            current = trace.get(mark, previous)
+            self.durations[name].append((current - previous) * 1000)
+            previous = current
+        self.durations['total'].append((now - trace['frame']) * 1000)
+
+        self.check_budget()
+        self.updated.emit()
+
+    def summary(self):
+        """{stage: {'p50', 'p95', 'p99', 'count'}} in milliseconds"""
+        result = {}
+        for name, values in self.durations.items():
+            ordered = sorted(values)
+            result[name] = {
+                'p50': percentile(ordered, 0.50),
+                'p95': percentile(ordered, 0.95),
+                'p99': percentile(ordered, 0.99),
+                'count': len(ordered),
+            }
+        return result
+
+    def total_p95(self):
+        return percentile(sorted(self.durations['total']), 0.95)
+
+    def check_budget(self):
+        """Flag the lane when end-to-end p95 goes over the budget"""
+        over = (len(self.durations['total']) >= MIN_BUDGET_SAMPLES and
+                self.total_p95() > self.budget_ms)
+        if over != self.over_budget:
+            self.over_budget = over
+            self.budget_changed.emit(over)
+
+    def write_metrics(self):
+        """Write the current percentiles to the local metrics file"""
+        if not self.durations['total']:
+            return
+        try:
+            metrics = {
+                'lane': self.lane,
+                'updated': datetime.now().isoformat(),
+                'budget_ms': self.budget_ms,
+                'over_budget': self.over_budget,
+                'stages': self.summary(),
+            }
+            temp_file = f"{self.metrics_file}.tmp"
+            with open(temp_file, 'w') as f:
+                json.dump(metrics, f, indent=2)
+            os.replace(temp_file, self.metrics_file)
+        except Exception as e:
+            print(f"Error writing scan metrics: {e}")
+
+
+class ScanLatencyDialog(QDialog):
+    """Diagnostics panel with live scan latency percentiles"""
+
+    def __init__(self, parent, tracker):
+        super().__init__(parent)
+        self.tracker = tracker
+        self.setWindowTitle("Scan Latency")
+        self.resize(520, 320)
+        self.init_ui()
+        self.refresh()
+
+        self.tracker.updated.connect(self.refresh)
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+
+        self.budget_label = QLabel()
+        self.budget_label.setStyleSheet("font-size: 14px; font-weight: 600; padding: 6px;")
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(5)
+        self.table.setHorizontalHeaderLabels(["Stage", "p50 (ms)", "p95 (ms)", "p99 (ms)", "Scans"])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+
+        button_layout = QHBoxLayout()
+        save_btn = QPushButton("💾 Write Metrics File")
+        save_btn.clicked.connect(self.tracker.write_metrics)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.accept)
+        button_layout.addWidget(save_btn)
+        button_layout.addStretch()
+        button_layout.addWidget(close_btn)
+
+        layout.addWidget(self.budget_label)
+        layout.addWidget(self.table)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+
+    def refresh(self):
+        """Show the current percentiles"""
+        summary = self.tracker.summary()
+        self.table.setRowCount(len(summary))
+        for row, (stage, values) in enumerate(summary.items()):
+            self.table.setItem(row, 0, QTableWidgetItem(stage))
+            for column, key in enumerate(('p50', 'p95', 'p99'), 1):
+                self.table.setItem(row, column, QTableWidgetItem(f"{values[key]:.1f}"))
+            self.table.setItem(row, 4, QTableWidgetItem(str(values['count'])))
+
+        p95 = summary['total']['p95']
+        if self.tracker.over_budget:
+            self.budget_label.setText(f"⚠ p95 {p95:.0f} ms is over the {self.tracker.budget_ms} ms budget")
+            self.budget_label.setStyleSheet("font-size: 14px; font-weight: 600; padding: 6px; color: #dc3545;")
+        else:
+            self.budget_label.setText(f"p95 {p95:.0f} ms (budget {self.tracker.budget_ms} ms)")
+            self.budget_label.setStyleSheet("font-size: 14px; font-weight: 600; padding: 6px; color: #28a745;")
+
+    def done(self, result):
+        """Stop following the tracker once closed"""
+        self.tracker.updated.disconnect(self.refresh)
+        super().done(result)
+
+
+_scan_latency = None
+
+
+def get_scan_latency():
+    """Get the application-wide scan latency tracker
+
+    Create it from the GUI thread first; scanner threads only use it.
+    """
+    global _scan_latency
+    if _scan_latency is None:
+        _scan_latency = ScanLatencyTracker(QCoreApplication.instance())
+    return _scan_latency
@@ -0,0 +1,61 @@
+"""
+Scan Queue for POS System
+Collects scans arriving in bursts and hands them on once per event loop pass
+"""
+
+import time
+from PyQt5.QtCore import *
+
+
+class ScanQueue(QObject):
+    """Bounded queue of scanned barcodes, merged per event loop pass
+
+    A scanner gun or a camera can deliver scans faster than the cart can
+    be redrawn. Scans are queued and drained on the next pass of the event
+    loop, so every scan that arrived in the meantime is handled together;
+    repeated codes become one (barcode, count, scan_times) entry in
+    first-scan order, scan_times holding the time.time() of each push so
+    per-scan timing survives the merge.
+    When max_pending scans are waiting the queue drains at once instead of
+    dropping any.
+    """
+
+    def __init__(self, callback, max_pending=512, parent=None):
+        super().__init__(parent)
+        self.callback = callback  # Called with [(barcode, count, scan_times), ...]
+        self.max_pending = max_pending
+        self.pending = []
+        self.scheduled = False
+
+    def push(self, barcode):
+        """Queue one scan"""
+        self.pending.append((barcode, time.time()))
+        if len(self.pending) >= self.max_pending:
+            self.drain()
+        elif not self.scheduled:
+            self.scheduled = True
+            QTimer.singleShot(0, self.drain)
+
+    def push_many(self, barcodes):
+        """Queue several scans, e.g. every code of one camera frame"""
+        for barcode in barcodes:
+            self.push(barcode)
+
+    def drain(self):
+        """Hand every waiting scan on as one merged batch"""
+        self.scheduled = False
+        if not self.pending:
+            return
+
+        pending, self.pending = self.pending, []
+        scan_times = {}
+        for barcode, when in pending:
+            scan_times.setdefault(barcode, []).append(when)
+
+        try:
+            self.callback([(barcode, len(times), times) for barcode, times in scan_times.items()])
+        except Exception as e:
+            print(f"Error handling scans: {e}")
+
+    def __len__(self):
+        return len(self.pending)
@@ -0,0 +1,219 @@
+"""
+Application Scheduler for POS System
+Runs all periodic work (clock labels, dashboard refreshes) from a single timer
+"""
+
+import time
+from datetime import datetime
+from PyQt5.QtCore import *
+
+
+class ScheduledJob:
+    """A periodic callback owned by a widget"""
+
+    def __init__(self, name, interval_ms, callback, owner_key, deferrable=False):
+        self.name = name
+        self.interval = interval_ms / 1000.0
+        self.callback = callback
+        self.owner_key = owner_key
+        self.deferrable = deferrable
+        self.next_due = time.monotonic() + self.interval
+        self.backoff = 1
+        self.deferred_since = None  # When the job first came due during a checkout
+
+    def reschedule(self, now):
+        """Schedule the next run one interval from now"""
+        self.next_due = now + self.interval * self.backoff
+
+
+class AppScheduler(QObject):
+    """Single shared timer that drives the clock and all periodic jobs
+
+    Jobs belong to an owner widget. They pause while the owner is hidden
+    and are dropped as soon as the owner is destroyed, so screens that
+    were replaced never keep querying the database in the background.
+    Deferrable (reporting) jobs back off while a checkout is in progress,
+    but still run once they are MAX_BACKOFF intervals overdue.
+    """
+
+    clock_tick = pyqtSignal(object)  # datetime of the tick
+    checkout_state_changed = pyqtSignal(bool)
+
+    TICK_MS = 1000
+    MAX_BACKOFF = 8  # Deferrable jobs run at most 8 intervals after they came due
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.jobs = []
+        self.clock_callbacks = {}  # owner_key -> [callback]
+        self.paused_owners = set()
+        self.tracked_owners = set()
+        self.checkout_owners = set()
+
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.CoarseTimer)
+        self.timer.timeout.connect(self.tick)
+
+    # Owner tracking
+    def track_owner(self, owner):
+        """Watch an owner for hide/show/destroy events"""
+        key = id(owner)
+        if key in self.tracked_owners:
+            return key
+
+        self.tracked_owners.add(key)
+        owner.installEventFilter(self)
+        owner.destroyed.connect(lambda *args, k=key: self.release_owner(k))
+        return key
+
+    def release_owner(self, key):
+        """Forget every job and clock callback of an owner"""
+        self.jobs = [job for job in self.jobs if job.owner_key != key]
+        self.clock_callbacks.pop(key, None)
+        self.paused_owners.discard(key)
+        self.tracked_owners.discard(key)
+
+        if key in self.checkout_owners:
+            self.checkout_owners.discard(key)
+            if not self.checkout_owners:
+                self.on_checkout_finished()
+
+        self.update_timer()
+
+    def eventFilter(self, obj, event):
+        """Pause an owner's jobs while it is hidden"""
+        if event.type() == QEvent.Hide:
+            self.paused_owners.add(id(obj))
+        elif event.type() == QEvent.Show:
+            key = id(obj)
+            if key in self.paused_owners:
+                self.paused_owners.discard(key)
+                self.resume_owner(key)
+        return False
+
+    def resume_owner(self, key):
+        """Catch an owner up after it becomes visible again"""
+        now = time.monotonic()
+        for callback in list(self.clock_callbacks.get(key, [])):
+            self.run_callback(callback, "clock", key)
+        for job in self.jobs:
+            if job.owner_key == key and job.next_due <= now:
+                self.run_job(job, now)
+
+    # Registration
+    def connect_clock(self, owner, callback):
+        """Call callback once per second while owner is visible"""
+        key = self.track_owner(owner)
+        self.clock_callbacks.setdefault(key, []).append(callback)
+        self.update_timer()
+
+    def register_job(self, owner, interval_ms, callback, name=None, deferrable=False):
+        """Register a periodic job tied to the lifetime of owner"""
+        key = self.track_owner(owner)
+        job = ScheduledJob(name or getattr(callback, '__name__', 'job'),
+                           max(interval_ms, self.TICK_MS), callback, key, deferrable)
+        self.jobs.append(job)
+        self.update_timer()
+        return job
+
+    def cancel_jobs(self, owner):
+        """Stop every job and clock callback registered by owner"""
+        self.release_owner(id(owner))
+
+    def update_timer(self):
+        """Only keep the shared timer running while someone needs it"""
+        if self.jobs or self.clock_callbacks:
+            if not self.timer.isActive():
+                self.timer.start(self.TICK_MS)
+        elif self.timer.isActive():
+            self.timer.stop()
+
+    # Checkout back-off
+    def set_checkout_active(self, owner, active):
+        """Mark whether owner currently has a checkout in progress"""
+        key = self.track_owner(owner)
+        was_active = bool(self.checkout_owners)
+
+        if active:
+            self.checkout_owners.add(key)
+        else:
+            self.checkout_owners.discard(key)
+
+        if was_active and not self.checkout_owners:
+            self.on_checkout_finished()
+        elif not was_active and self.checkout_owners:
+            self.checkout_state_changed.emit(True)
+
+    def is_checkout_active(self):
+        """Check if any screen has a checkout in progress"""
+        return bool(self.checkout_owners)
+
+    def on_checkout_finished(self):
+        """Reset back-off so deferred reports refresh promptly"""
+        now = time.monotonic()
+        for job in self.jobs:
+            if job.deferrable and job.backoff > 1:
+                job.backoff = 1
+                job.next_due = min(job.next_due, now + self.TICK_MS / 1000.0)
+        self.checkout_state_changed.emit(False)
+
+    # Dispatch
+    def tick(self):
+        """Run the clock and every job that is due"""
+        now = time.monotonic()
+        current_time = datetime.now()
+
+        self.clock_tick.emit(current_time)
+
+        for key, callbacks in list(self.clock_callbacks.items()):
+            if key in self.paused_owners:
+                continue
+            for callback in list(callbacks):
+                self.run_callback(callback, "clock", key)
+
+        for job in list(self.jobs):
+            if job not in self.jobs:
+                continue  # Owner released by an earlier callback
+            if job.owner_key in self.paused_owners or job.next_due > now:
+                continue
+
+            if job.deferrable and self.checkout_owners:
+                if job.deferred_since is None:
+                    job.deferred_since = now
+                deadline = job.deferred_since + job.interval * self.MAX_BACKOFF
+                if now < deadline:
+                    # Back off, but never past the deadline of a long checkout
+                    job.backoff = min(job.backoff * 2, self.MAX_BACKOFF)
+                    job.reschedule(now)
+                    job.next_due = min(job.next_due, deadline)
+                    continue
+
+            self.run_job(job, now)
+
+    def run_job(self, job, now):
+        """Run a job and schedule its next run"""
+        job.deferred_since = None
+        job.reschedule(now)
+        self.run_callback(job.callback, job.name, job.owner_key)
+
+    def run_callback(self, callback, name, owner_key):
+        """Invoke a callback without letting one failure stop the others"""
+        try:
+            callback()
+        except RuntimeError as e:
+            # Underlying C++ widget already deleted - drop the owner
+            print(f"Scheduler dropped '{name}': {e}")
+            self.release_owner(owner_key)
+        except Exception as e:
+            print(f"Error in scheduled job '{name}': {e}")
+
+
+_scheduler = None
+
+
+def get_scheduler():
+    """Get the application-wide scheduler, creating it on first use"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = AppScheduler(QCoreApplication.instance())
+    return _scheduler
@@ -3,11 +3,27 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 import json
 import os
+from express_checkout import RECEIPT_POLICIES
+from camera_settings import camera_index_from_setting, configured_cameras, parse_camera_list
+from camera_manager import get_camera_manager
+
+try:
+    from decoder_backends import DECODER_BACKENDS
+except ImportError:
+    DECODER_BACKENDS = {}  # Camera libraries not installed
 
 class SettingsWidget(QWidget):
-    def __init__(self, parent):
+    """POS, scanner and checkout settings kept in app_settings.json
+
+    With embedded set the widget is a tab of the main settings screen: it
+    drops its own header and store section, since the host screen has a
+    back button and edits the store information itself.
+    """
+
+    def __init__(self, parent, embedded=False):
         super().__init__()
         self.parent = parent
+        self.embedded = embedded
         self.settings_file = "app_settings.json"
         self.settings = self.load_settings()
         self.init_ui()
@@ -100,8 +116,37 @@ Simple POS: Basic interface with essential POS functionality
         """)
         pos_description.setStyleSheet("color: #6c757d; font-size: 12px; margin: 10px 0;")
         
+        # Express checkout
+        self.express_checkbox = QCheckBox("Express Checkout (toasts instead of dialogs)")
+        self.express_checkbox.setChecked(self.settings.get('express_checkout', False))
+        
+        receipt_layout = QHBoxLayout()
+        receipt_label = QLabel("Print Receipt After Sale:")
+        receipt_label.setStyleSheet("font-size: 14px; font-weight: 600; color: #495057;")
+        
+        self.receipt_policy_combo = QComboBox()
+        self.receipt_policy_combo.addItems(RECEIPT_POLICIES)
+        self.receipt_policy_combo.setCurrentText(self.settings.get('receipt_print_policy', 'Ask'))
+        self.receipt_policy_combo.setStyleSheet(self.pos_version_combo.styleSheet())
+        
+        cash_key_label = QLabel("Exact Cash Key:")
+        cash_key_label.setStyleSheet("font-size: 14px; font-weight: 600; color: #495057;")
+        
+        self.exact_cash_key_combo = QComboBox()
+        self.exact_cash_key_combo.addItems([f"F{number}" for number in range(1, 13)])
+        self.exact_cash_key_combo.setCurrentText(self.settings.get('exact_cash_key', 'F12'))
+        self.exact_cash_key_combo.setStyleSheet(self.pos_version_combo.styleSheet())
+        
+        receipt_layout.addWidget(receipt_label)
+        receipt_layout.addWidget(self.receipt_policy_combo)
+        receipt_layout.addWidget(cash_key_label)
+        receipt_layout.addWidget(self.exact_cash_key_combo)
+        receipt_layout.addStretch()
+        
         pos_layout.addLayout(pos_version_layout)
         pos_layout.addWidget(pos_description)
+        pos_layout.addWidget(self.express_checkbox)
+        pos_layout.addLayout(receipt_layout)
         pos_group.setLayout(pos_layout)
         
         # Barcode Scanner Settings
@@ -169,10 +214,32 @@ Simple POS: Basic interface with essential POS functionality
             }
         """)
         
+        # Further cameras of the same lane, e.g. a fixed bottom camera
+        self.extra_cameras_input = QLineEdit()
+        self.extra_cameras_input.setPlaceholderText("Extra cameras, e.g. 1, 2")
+        self.extra_cameras_input.setText(", ".join(str(index) for index in self.settings.get('extra_cameras', [])))
+        self.extra_cameras_input.setValidator(QRegExpValidator(QRegExp(r"[0-9, ]*")))
+        self.extra_cameras_input.setStyleSheet(self.camera_combo.styleSheet().replace("QComboBox", "QLineEdit"))
+        
         camera_layout.addWidget(camera_label)
         camera_layout.addWidget(self.camera_combo)
+        camera_layout.addWidget(self.extra_cameras_input)
         camera_layout.addStretch()
         
+        # Barcode decoder; 'auto' calibrates on first start on each machine
+        decoder_layout = QHBoxLayout()
+        decoder_label = QLabel("Barcode Decoder:")
+        decoder_label.setStyleSheet("font-size: 14px; font-weight: 600; color: #495057;")
+        
+        self.decoder_combo = QComboBox()
+        self.decoder_combo.addItems(["auto"] + list(DECODER_BACKENDS))
+        self.decoder_combo.setCurrentText(self.settings.get('decoder_backend', 'auto'))
+        self.decoder_combo.setStyleSheet(self.camera_combo.styleSheet())
+        
+        decoder_layout.addWidget(decoder_label)
+        decoder_layout.addWidget(self.decoder_combo)
+        decoder_layout.addStretch()
+        
         # Scan timeout
         timeout_layout = QHBoxLayout()
         timeout_label = QLabel("Scan Timeout (seconds):")
@@ -196,14 +263,75 @@ Simple POS: Basic interface with essential POS functionality
         timeout_layout.addWidget(self.timeout_spinbox)
         timeout_layout.addStretch()
         
+        # Preview frame rate
+        preview_layout = QHBoxLayout()
+        preview_label = QLabel("Preview FPS (focused / unfocused):")
+        preview_label.setStyleSheet("font-size: 14px; font-weight: 600; color: #495057;")
+        
+        self.preview_fps_spinbox = QSpinBox()
+        self.preview_fps_spinbox.setRange(1, 30)
+        self.preview_fps_spinbox.setValue(self.settings.get('preview_fps', 15))
+        self.preview_fps_spinbox.setStyleSheet(self.timeout_spinbox.styleSheet())
+        
+        self.preview_idle_fps_spinbox = QSpinBox()
+        self.preview_idle_fps_spinbox.setRange(0, 30)
+        self.preview_idle_fps_spinbox.setValue(self.settings.get('preview_idle_fps', 2))
+        self.preview_idle_fps_spinbox.setStyleSheet(self.timeout_spinbox.styleSheet())
+        
+        preview_layout.addWidget(preview_label)
+        preview_layout.addWidget(self.preview_fps_spinbox)
+        preview_layout.addWidget(self.preview_idle_fps_spinbox)
+        preview_layout.addStretch()
+        
+        # Scan-to-cart latency budget
+        latency_layout = QHBoxLayout()
+        latency_label = QLabel("Scan Latency Budget (p95, ms):")
+        latency_label.setStyleSheet("font-size: 14px; font-weight: 600; color: #495057;")
+        
+        self.latency_budget_spinbox = QSpinBox()
+        self.latency_budget_spinbox.setRange(50, 5000)
+        self.latency_budget_spinbox.setSingleStep(50)
+        self.latency_budget_spinbox.setValue(self.settings.get('scan_latency_budget_ms', 300))
+        self.latency_budget_spinbox.setStyleSheet(self.timeout_spinbox.styleSheet())
+        
+        latency_layout.addWidget(latency_label)
+        latency_layout.addWidget(self.latency_budget_spinbox)
+        latency_layout.addStretch()
+        
+        # Prefixes the barcode generator allocates in-store codes from
+        prefix_layout = QHBoxLayout()
+        prefix_label = QLabel("In-Store Barcode Prefixes:")
+        prefix_label.setStyleSheet("font-size: 14px; font-weight: 600; color: #495057;")
+        
+        self.barcode_prefix_input = QLineEdit()
+        self.barcode_prefix_input.setPlaceholderText("e.g. 200-299")
+        self.barcode_prefix_input.setText(self.settings.get('barcode_prefix_range', '200-299'))
+        self.barcode_prefix_input.setValidator(QRegExpValidator(QRegExp(r"[0-9, -]*")))
+        self.barcode_prefix_input.setStyleSheet(self.extra_cameras_input.styleSheet())
+        
+        prefix_layout.addWidget(prefix_label)
+        prefix_layout.addWidget(self.barcode_prefix_input)
+        prefix_layout.addStretch()
+        
         # Sound settings
         self.sound_enabled_checkbox = QCheckBox("Enable Scanner Sound Effects")
         self.sound_enabled_checkbox.setChecked(self.settings.get('sound_enabled', True))
         self.sound_enabled_checkbox.setStyleSheet(self.auto_scan_checkbox.styleSheet())
+        self.express_checkbox.setStyleSheet(self.auto_scan_checkbox.styleSheet())
+        
+        # Keyboard-wedge scanners
+        self.wedge_checkbox = QCheckBox("Recognize Keyboard Scanners in Any Field")
+        self.wedge_checkbox.setChecked(self.settings.get('wedge_scanner_enabled', True))
+        self.wedge_checkbox.setStyleSheet(self.auto_scan_checkbox.styleSheet())
+        
+        # Fixed camera over the counter reading whole baskets
+        self.tray_mode_checkbox = QCheckBox("Start Camera Scanner in Tray Mode (Whole Basket)")
+        self.tray_mode_checkbox.setChecked(self.settings.get('tray_mode', False))
+        self.tray_mode_checkbox.setStyleSheet(self.auto_scan_checkbox.styleSheet())
         
         # Test camera button
-        test_camera_btn = QPushButton("🎥 Test Camera")
-        test_camera_btn.setStyleSheet("""
+        self.test_camera_btn = QPushButton("🎥 Test Camera")
+        self.test_camera_btn.setStyleSheet("""
             QPushButton {
                 background: #17a2b8;
                 color: white;
@@ -216,13 +344,24 @@ Simple POS: Basic interface with essential POS functionality
                 background: #138496;
             }
         """)
-        test_camera_btn.clicked.connect(self.test_camera)
+        self.test_camera_btn.clicked.connect(self.test_camera)
+        
+        # Cameras are enumerated in the background, never on this thread
+        self.camera_test_pending = False
+        get_camera_manager().devices_changed.connect(self.on_cameras_discovered)
+        get_camera_manager().discover()
         
         barcode_layout.addWidget(self.auto_scan_checkbox)
         barcode_layout.addLayout(camera_layout)
+        barcode_layout.addLayout(decoder_layout)
         barcode_layout.addLayout(timeout_layout)
+        barcode_layout.addLayout(preview_layout)
+        barcode_layout.addLayout(latency_layout)
+        barcode_layout.addLayout(prefix_layout)
         barcode_layout.addWidget(self.sound_enabled_checkbox)
-        barcode_layout.addWidget(test_camera_btn)
+        barcode_layout.addWidget(self.wedge_checkbox)
+        barcode_layout.addWidget(self.tray_mode_checkbox)
+        barcode_layout.addWidget(self.test_camera_btn)
         barcode_group.setLayout(barcode_layout)
         
         # Store Settings
@@ -306,10 +445,12 @@ Simple POS: Basic interface with essential POS functionality
         button_layout.addWidget(save_btn)
         
         # Add all sections to main layout
-        main_layout.addLayout(header_layout)
+        if not self.embedded:
+            main_layout.addLayout(header_layout)
         main_layout.addWidget(pos_group)
         main_layout.addWidget(barcode_group)
-        main_layout.addWidget(store_group)
+        if not self.embedded:
+            main_layout.addWidget(store_group)
         main_layout.addLayout(button_layout)
         main_layout.addStretch()
         
@@ -321,8 +462,19 @@ Simple POS: Basic interface with essential POS functionality
             'pos_version': 'Enhanced POS (Git Version)',
             'auto_scan_enabled': True,
             'camera_device': 'Default Camera (0)',
+            'extra_cameras': [],
+            'decoder_backend': 'auto',
             'scan_timeout': 30,
             'sound_enabled': True,
+            'wedge_scanner_enabled': True,
+            'tray_mode': False,
+            'preview_fps': 15,
+            'preview_idle_fps': 2,
+            'scan_latency_budget_ms': 300,
+            'barcode_prefix_range': '200-299',
+            'express_checkout': False,
+            'receipt_print_policy': 'Ask',
+            'exact_cash_key': 'F12',
             'store_name': 'Smart Store',
             'store_address': '123 Business Street',
             'store_phone': '+1 555 123 4567',
@@ -343,25 +495,44 @@ Simple POS: Basic interface with essential POS functionality
     def save_settings(self):
         """Save current settings"""
         try:
-            settings = {
+            # Start from the loaded settings so keys without a control here survive
+            settings = dict(self.settings)
+            settings.update({
                 'pos_version': self.pos_version_combo.currentText(),
                 'auto_scan_enabled': self.auto_scan_checkbox.isChecked(),
                 'camera_device': self.camera_combo.currentText(),
+                'extra_cameras': parse_camera_list(self.extra_cameras_input.text()),
+                'decoder_backend': self.decoder_combo.currentText(),
                 'scan_timeout': self.timeout_spinbox.value(),
                 'sound_enabled': self.sound_enabled_checkbox.isChecked(),
-                'store_name': self.store_name_input.text(),
-                'store_address': self.store_address_input.text(),
-                'store_phone': self.store_phone_input.text(),
-                'currency': self.currency_input.text()
-            }
+                'wedge_scanner_enabled': self.wedge_checkbox.isChecked(),
+                'tray_mode': self.tray_mode_checkbox.isChecked(),
+                'preview_fps': self.preview_fps_spinbox.value(),
+                'preview_idle_fps': self.preview_idle_fps_spinbox.value(),
+                'scan_latency_budget_ms': self.latency_budget_spinbox.value(),
+                'barcode_prefix_range': self.barcode_prefix_input.text().strip() or '200-299',
+                'express_checkout': self.express_checkbox.isChecked(),
+                'receipt_print_policy': self.receipt_policy_combo.currentText(),
+                'exact_cash_key': self.exact_cash_key_combo.currentText()
+            })
+            if not self.embedded:
+                settings.update({
+                    'store_name': self.store_name_input.text(),
+                    'store_address': self.store_address_input.text(),
+                    'store_phone': self.store_phone_input.text(),
+                    'currency': self.currency_input.text()
+                })
             
             with open(self.settings_file, 'w') as f:
                 json.dump(settings, f, indent=4)
             
             self.settings = settings
+            if hasattr(self.parent, 'load_app_settings'):
+                self.parent.load_app_settings()
             
             # Update database settings if needed
-            self.update_database_settings()
+            if not self.embedded:
+                self.update_database_settings()
             
             QMessageBox.information(self, "Settings Saved", 
                                   "Settings have been saved successfully!\n\n"
@@ -404,8 +575,19 @@ Simple POS: Basic interface with essential POS functionality
             self.pos_version_combo.setCurrentText('Enhanced POS (Git Version)')
             self.auto_scan_checkbox.setChecked(True)
             self.camera_combo.setCurrentText('Default Camera (0)')
+            self.extra_cameras_input.clear()
+            self.decoder_combo.setCurrentText('auto')
             self.timeout_spinbox.setValue(30)
             self.sound_enabled_checkbox.setChecked(True)
+            self.wedge_checkbox.setChecked(True)
+            self.tray_mode_checkbox.setChecked(False)
+            self.preview_fps_spinbox.setValue(15)
+            self.preview_idle_fps_spinbox.setValue(2)
+            self.latency_budget_spinbox.setValue(300)
+            self.barcode_prefix_input.setText('200-299')
+            self.express_checkbox.setChecked(False)
+            self.receipt_policy_combo.setCurrentText('Ask')
+            self.exact_cash_key_combo.setCurrentText('F12')
             self.store_name_input.setText('Smart Store')
             self.store_address_input.setText('123 Business Street')
             self.store_phone_input.setText('+1 555 123 4567')
@@ -424,41 +606,59 @@ Simple POS: Basic interface with essential POS functionality
         try:
             # Try to import camera libraries
             import cv2
-            
-            # Get camera index from selection
-            camera_text = self.camera_combo.currentText()
-            if "0" in camera_text:
-                camera_index = 0
-            elif "1" in camera_text:
-                camera_index = 1
-            elif "2" in camera_text:
-                camera_index = 2
-            else:
-                camera_index = 0
-            
-            # Test camera
-            cap = cv2.VideoCapture(camera_index)
-            
-            if cap.isOpened():
-                ret, frame = cap.read()
-                cap.release()
-                
-                if ret:
-                    QMessageBox.information(self, "Camera Test", 
-                                          f"Camera {camera_index} is working correctly!")
-                else:
-                    QMessageBox.warning(self, "Camera Test", 
-                                      f"Camera {camera_index} opened but failed to capture frame.")
-            else:
-                QMessageBox.warning(self, "Camera Test", 
-                                  f"Failed to open camera {camera_index}.")
-                
         except ImportError:
             QMessageBox.warning(self, "Camera Test", 
                               "Camera libraries not installed.\n"
                               "Please install opencv-python to use camera features.")
-        except Exception as e:
-            QMessageBox.critical(self, "Camera Test", f"Camera test failed: {str(e)}")
+            return
+        
+        # Probing runs on the camera manager's thread; results come back below
+        self.camera_test_pending = True
+        self.test_camera_btn.setEnabled(False)
+        self.test_camera_btn.setText("🎥 Testing Cameras...")
+        get_camera_manager().discover(force=True)
+    
+    def on_cameras_discovered(self, devices):
+        """Offer the cameras found and finish a pending camera test"""
+        for device in devices:
+            if not any(camera_index_from_setting(self.camera_combo.itemText(i)) == device.index
+                       for i in range(self.camera_combo.count())):
+                self.camera_combo.addItem(f"{device.name} ({device.index})")
+        
+        if not self.camera_test_pending:
+            return
+        self.camera_test_pending = False
+        self.test_camera_btn.setEnabled(True)
+        self.test_camera_btn.setText("🎥 Test Camera")
+        
+        # Report every camera of the lane, primary first
+        cameras = configured_cameras({
+            'camera_device': self.camera_combo.currentText(),
+            'extra_cameras': parse_camera_list(self.extra_cameras_input.text())
+        })
+        found = {device.index: device for device in devices}
+        
+        results = []
+        all_working = True
+        for camera_index in cameras:
+            device = found.get(camera_index)
+            if device is None:
+                results.append(f"Failed to open camera {camera_index}.")
+                all_working = False
+            elif device.working:
+                results.append(f"Camera {camera_index} is working correctly!")
+            else:
+                results.append(f"Camera {camera_index} opened but failed to capture frame.")
+                all_working = False
+        
+        others = [str(index) for index in sorted(found) if index not in cameras]
+        if others:
+            results.append(f"\nOther cameras found: {', '.join(others)}")
+        
+        if all_working:
+            QMessageBox.information(self, "Camera Test", "\n".join(results))
+        else:
+            QMessageBox.warning(self, "Camera Test", "\n".join(results))
     
     def get_setting(self, key, default=None):
         """Get a specific setting value"""
@@ -8,6 +8,7 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdi
 from PyQt5.QtGui import QColor
 from PyQt5.QtCore import Qt, QDate
 import json
+from sales_sketches import get_sales_sketches
 
 class TicketManagementWidget(QWidget):
     def __init__(self, parent):
@@ -395,6 +396,7 @@ class TicketManagementWidget(QWidget):
                 cursor = self.parent.conn.cursor()
                 cursor.execute('DELETE FROM tickets WHERE id = ?', (ticket[0],))
                 self.parent.conn.commit()
+                get_sales_sketches(self.parent.conn).rebuild_day(str(ticket[2])[:10])
                 QMessageBox.information(self, "Success", "Ticket deleted successfully!")
                 self.load_tickets()
             except Exception as e:
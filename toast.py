@@ -0,0 +1,82 @@
+"""
+Toast Notifications for POS System
+Non-blocking messages that fade out on their own so scanning never stops
+"""
+
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+
+
+TOAST_COLORS = {
+    'info': "#17a2b8",
+    'success': "#28a745",
+    'warning': "#fd7e14",
+    'error': "#dc3545",
+}
+
+
+class Toast(QLabel):
+    """Small message overlaid on the bottom right of a window
+
+    Toasts never take focus and let mouse clicks through, so the cashier
+    can keep scanning and tapping product tiles while one is visible.
+    """
+
+    MARGIN = 16
+    SPACING = 8
+
+    def __init__(self, window, message, level='info', duration_ms=2500):
+        super().__init__(message, window)
+        self.setWordWrap(True)
+        self.setMaximumWidth(360)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setAttribute(Qt.WA_ShowWithoutActivating)
+        self.setFocusPolicy(Qt.NoFocus)
+        self.setStyleSheet(f"""
+            QLabel {{
+                background: {TOAST_COLORS.get(level, TOAST_COLORS['info'])};
+                color: white;
+                border-radius: 8px;
+                padding: 10px 14px;
+                font-size: 13px;
+                font-weight: 600;
+            }}
+        """)
+        self.adjustSize()
+
+        QTimer.singleShot(duration_ms, self.close_toast)
+
+    def close_toast(self):
+        """Remove the toast and move the remaining ones down"""
+        window = self.parentWidget()
+        self.hide()
+        self.deleteLater()
+        if window is not None:
+            arrange_toasts(window)
+
+
+def arrange_toasts(window):
+    """Stack the visible toasts of a window from the bottom up"""
+    bottom = window.height() - Toast.MARGIN
+    toasts = [toast for toast in window.findChildren(Toast, options=Qt.FindDirectChildrenOnly)
+              if toast.isVisible()]
+
+    for toast in reversed(toasts):
+        bottom -= toast.height()
+        toast.move(window.width() - toast.width() - Toast.MARGIN, bottom)
+        bottom -= Toast.SPACING
+
+
+def show_toast(widget, message, level='info', duration_ms=2500):
+    """Show a non-blocking message over the window containing widget"""
+    try:
+        window = widget.window()
+        toast = Toast(window, message, level, duration_ms)
+        toast.show()
+        toast.raise_()
+        arrange_toasts(window)
+        return toast
+    except Exception as e:
+        print(f"Error showing toast: {e}")
+        return None
@@ -0,0 +1,253 @@
+"""
+Top Sellers for POS System
+Streaming heavy hitters over recent sales for the dashboard and the POS quick keys
+"""
+
+import json
+import math
+import time
+import heapq
+from itertools import count
+from collections import namedtuple
+from datetime import datetime, date, timedelta
+from PyQt5.QtCore import *
+from catalog_events import get_catalog_events
+
+
+TOP_SELLER_CAPACITY = 200  # Counters per window; any product above 1/200 of the volume is always kept
+SEED_DAYS = 7              # Ticket history replayed at startup
+RESCALE_EXPONENT = 50.0    # Move the decay landmark before the weights grow past e**50
+
+HOUR = 3600
+WINDOWS = ('hour', 'today', 'week')
+
+TopSeller = namedtuple('TopSeller', ['key', 'name', 'quantity', 'revenue', 'error'])
+
+
+class SpaceSaving:
+    """Weighted Space-Saving counter (Metwally, Agrawal and El Abbadi)
+
+    Holds at most capacity counters. An item that is not counted yet
+    takes over the smallest counter and inherits its count as error, so
+    a reported count overestimates the true one by at most that error,
+    and every item with more than total / capacity of the weight is
+    present. The smallest counter comes from a heap with lazily dropped
+    stale entries, rebuilt when it outgrows the counters.
+    """
+
+    def __init__(self, capacity=TOP_SELLER_CAPACITY):
+        self.capacity = capacity
+        self.counters = {}  # key -> [count, revenue, error, name]
+        self.heap = []      # (count, serial, key), possibly outdated
+        self.serial = count()
+        self.total = 0.0
+
+    def add(self, key, weight, revenue=0.0, name=None):
+        """Count weight for key; revenue is summed alongside"""
+        if weight <= 0:
+            return
+        counter = self.counters.get(key)
+        if counter is None:
+            if len(self.counters) < self.capacity:
+                counter = self.counters[key] = [0.0, 0.0, 0.0, name]
+            else:
+                victim, floor = self.pop_min()
+                del self.counters[victim]
+                counter = self.counters[key] = [floor, 0.0, floor, name]
+
+        counter[0] += weight
+        counter[1] += revenue
+        if name is not None:
+            counter[3] = name
+        self.total += weight
+
+        heapq.heappush(self.heap, (counter[0], next(self.serial), key))
+        if len(self.heap) > 4 * self.capacity:
+            self.rebuild_heap()
+
+    def pop_min(self):
+        """(key, count) of the smallest counter"""
+        while self.heap:
+            weight, _, key = heapq.heappop(self.heap)
+            counter = self.counters.get(key)
+            if counter is not None and counter[0] == weight:
+                return key, weight
+        self.rebuild_heap()
+        return self.pop_min()
+
+    def rebuild_heap(self):
+        self.heap = [(counter[0], next(self.serial), key) for key, counter in self.counters.items()]
+        heapq.heapify(self.heap)
+
+    def scale(self, factor):
+        """Multiply every count, e.g. to move a decay landmark"""
+        for counter in self.counters.values():
+            counter[0] *= factor
+            counter[1] *= factor
+            counter[2] *= factor
+        self.total *= factor
+        self.rebuild_heap()
+
+    def rename(self, key, name):
+        counter = self.counters.get(key)
+        if counter is not None:
+            counter[3] = name
+
+    def top(self, n, factor=1.0):
+        """The n largest counters as TopSeller, counts multiplied by factor"""
+        largest = heapq.nlargest(n, self.counters.items(), key=lambda entry: entry[1][0])
+        return [TopSeller(key, counter[3], counter[0] * factor, counter[1] * factor, counter[2] * factor)
+                for key, counter in largest]
+
+    def clear(self):
+        self.counters = {}
+        self.heap = []
+        self.total = 0.0
+
+
+class DecayedTopK:
+    """Space-Saving over exponentially faded sales
+
+    Uses forward decay: a sale at time t weighs e**((t - landmark) / lifetime)
+    and a query at now multiplies by e**(-(now - landmark) / lifetime). The
+    ranking never changes between sales, so nothing is touched per query;
+    the landmark moves forward, rescaling the counters once, before the
+    weights could overflow.
+    """
+
+    def __init__(self, lifetime, capacity=TOP_SELLER_CAPACITY):
+        self.lifetime = lifetime
+        self.summary = SpaceSaving(capacity)
+        self.landmark = None
+
+    def add(self, key, quantity, revenue, name, when):
+        if self.landmark is None:
+            self.landmark = when
+        exponent = (when - self.landmark) / self.lifetime
+        if exponent > RESCALE_EXPONENT:
+            self.summary.scale(math.exp(-exponent))
+            self.landmark = when
+            exponent = 0.0
+        weight = math.exp(exponent)
+        self.summary.add(key, quantity * weight, revenue * weight, name)
+
+    def top(self, n, now):
+        if self.landmark is None:
+            return []
+        factor = math.exp(-max(0.0, now - self.landmark) / self.lifetime)
+        return self.summary.top(n, factor)
+
+
+class DailyTopK:
+    """Space-Saving over the sales of the current calendar day"""
+
+    def __init__(self, capacity=TOP_SELLER_CAPACITY):
+        self.summary = SpaceSaving(capacity)
+        self.day = None
+
+    def add(self, key, quantity, revenue, name, when):
+        day = date.fromtimestamp(when)
+        if self.day is None or day > self.day:
+            self.summary.clear()
+            self.day = day
+        elif day < self.day:
+            return  # Sale from an earlier day
+        self.summary.add(key, quantity, revenue, name)
+
+    def top(self, n, now):
+        if self.day != date.fromtimestamp(now):
+            return []
+        return self.summary.top(n)
+
+
+class TopSellers(QObject):
+    """Best selling products of the last hour, today and the last 7 days
+
+    Every committed sale is added to all three windows at a cost that does
+    not depend on the catalog or the sales history. Products are counted
+    by id; the hour and week windows fade sales with a lifetime of their
+    length instead of dropping them at a hard edge. The windows start from
+    the last SEED_DAYS of tickets.
+    """
+
+    updated = pyqtSignal()
+
+    def __init__(self, conn, parent=None):
+        super().__init__(parent)
+        self.conn = conn
+        self.windows = {
+            'hour': DecayedTopK(HOUR),
+            'today': DailyTopK(),
+            'week': DecayedTopK(7 * 24 * HOUR),
+        }
+        self.seed()
+
+        get_catalog_events().catalog_changed.connect(self.apply_catalog_change)
+
+    def seed(self):
+        """Replay recent tickets, matching item names to product ids"""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute('SELECT id, name FROM products')
+            ids_by_name = {name: product_id for product_id, name in cursor.fetchall()}
+
+            since = (datetime.now() - timedelta(days=SEED_DAYS)).strftime("%Y-%m-%d")
+            cursor.execute('SELECT date, items FROM tickets WHERE date >= ? ORDER BY date', (since,))
+            tickets = cursor.fetchall()
+        except Exception as e:
+            print(f"Error loading sales history: {e}")
+            return
+
+        for sold_at, items in tickets:
+            try:
+                when = datetime.fromisoformat(str(sold_at)).timestamp()
+                for item in json.loads(items or '[]'):
+                    name = item.get('name')
+                    self.add_item(ids_by_name.get(name, name), name, item.get('quantity', 0),
+                                  item.get('total', item.get('quantity', 0) * item.get('price', 0)), when)
+            except Exception as e:
+                print(f"Error replaying ticket from {sold_at}: {e}")
+
+    def add_item(self, key, name, quantity, revenue, when):
+        for window in self.windows.values():
+            window.add(key, quantity, revenue, name, when)
+
+    def record_sale(self, items, when=None):
+        """Count a committed sale; items are cart dicts with id, name, quantity and price"""
+        when = time.time() if when is None else when
+        for item in items:
+            revenue = item.get('total', item['quantity'] * item['price'])
+            self.add_item(item['id'], item['name'], item['quantity'], revenue, when)
+        self.updated.emit()
+
+    def top(self, window, n=10):
+        """TopSeller list of a window, best first"""
+        return self.windows[window].top(n, time.time())
+
+    def trending_product_ids(self, n):
+        """Product ids selling now: the last hour first, then the last 7 days"""
+        ids = []
+        for window in ('hour', 'week'):
+            for seller in self.top(window, n):
+                if isinstance(seller.key, int) and seller.key not in ids:
+                    ids.append(seller.key)
+        return ids[:n]
+
+    def apply_catalog_change(self, change):
+        """Keep the names of counted products current"""
+        for product_id in change.updated:
+            if 'name' in change.changed_fields(product_id):
+                name = change.rows[product_id]['name']
+                for window in self.windows.values():
+                    window.summary.rename(product_id, name)
+
+
+_top_sellers = None
+
+
+def get_top_sellers(conn):
+    """Get the application-wide top sellers tracker"""
+    global _top_sellers
+    if _top_sellers is None:
+        _top_sellers = TopSellers(conn, QCoreApplication.instance())
+    return _top_sellers
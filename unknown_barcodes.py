@@ -0,0 +1,212 @@
+"""
+Unknown Barcode Queue for POS System
+Collects scanned barcodes that match no product so they can be triaged later
+"""
+
+from datetime import datetime
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+from catalog_events import get_catalog_events
+
+
+class UnknownBarcodeQueue(QObject):
+    """Persistent list of unknown barcodes shared by all POS screens
+
+    Entries are resolved automatically when a product with that barcode
+    is added or edited anywhere in the application.
+    """
+
+    changed = pyqtSignal(int)  # number of pending barcodes
+
+    def __init__(self, conn, parent=None):
+        super().__init__(parent)
+        self.conn = conn
+        self.entries = {}  # barcode -> {'count', 'first_seen', 'last_seen'}
+        self.ensure_table()
+        self.load_entries()
+
+        get_catalog_events().catalog_changed.connect(self.on_catalog_changed)
+
+    def ensure_table(self):
+        """Create the unknown_barcodes table on databases that predate it"""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS unknown_barcodes (
+                    barcode TEXT PRIMARY KEY,
+                    scan_count INTEGER DEFAULT 1,
+                    first_seen TEXT,
+                    last_seen TEXT
+                )
+            ''')
+            self.conn.commit()
+        except Exception as e:
+            print(f"Error creating unknown barcode table: {e}")
+
+    def load_entries(self):
+        """Load pending barcodes from the database"""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute('SELECT barcode, scan_count, first_seen, last_seen FROM unknown_barcodes')
+            self.entries = {
+                barcode: {'count': count, 'first_seen': first_seen, 'last_seen': last_seen}
+                for barcode, count, first_seen, last_seen in cursor.fetchall()
+            }
+        except Exception as e:
+            print(f"Error loading unknown barcodes: {e}")
+            self.entries = {}
+
+    def add(self, barcode):
+        """Record a scan of a barcode that matched no product"""
+        barcode = barcode.strip()
+        if not barcode:
+            return
+
+        now = datetime.now().isoformat()
+        entry = self.entries.setdefault(barcode, {'count': 0, 'first_seen': now, 'last_seen': now})
+        entry['count'] += 1
+        entry['last_seen'] = now
+
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute('''
+                INSERT OR REPLACE INTO unknown_barcodes (barcode, scan_count, first_seen, last_seen)
+                VALUES (?, ?, ?, ?)
+            ''', (barcode, entry['count'], entry['first_seen'], entry['last_seen']))
+            self.conn.commit()
+        except Exception as e:
+            print(f"Error saving unknown barcode: {e}")
+
+        self.changed.emit(len(self.entries))
+
+    def resolve(self, barcodes):
+        """Remove barcodes from the queue"""
+        barcodes = [barcode for barcode in barcodes if barcode in self.entries]
+        if not barcodes:
+            return
+
+        for barcode in barcodes:
+            del self.entries[barcode]
+
+        try:
+            cursor = self.conn.cursor()
+            cursor.executemany('DELETE FROM unknown_barcodes WHERE barcode = ?',
+                               [(barcode,) for barcode in barcodes])
+            self.conn.commit()
+        except Exception as e:
+            print(f"Error removing unknown barcodes: {e}")
+
+        self.changed.emit(len(self.entries))
+
+    def on_catalog_changed(self, change):
+        """Drop barcodes that now belong to a product"""
+        self.resolve([row.get('code_bar') for row in change.rows.values() if row.get('code_bar')])
+
+    def pending(self):
+        """Pending barcodes, most recently scanned first"""
+        return sorted(self.entries.items(), key=lambda item: item[1]['last_seen'], reverse=True)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class UnknownBarcodesDialog(QDialog):
+    """Let the cashier create products for, or dismiss, unknown barcodes"""
+
+    def __init__(self, parent, queue, add_product_callback):
+        super().__init__(parent)
+        self.queue = queue
+        self.add_product_callback = add_product_callback
+        self.setWindowTitle("Unknown Barcodes")
+        self.setModal(True)
+        self.resize(520, 400)
+        self.init_ui()
+        self.load_entries()
+
+        self.queue.changed.connect(self.load_entries)
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(3)
+        self.table.setHorizontalHeaderLabels(["Barcode", "Scans", "Last Seen"])
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.doubleClicked.connect(self.add_product)
+
+        button_layout = QHBoxLayout()
+
+        add_btn = QPushButton("➕ Add Product")
+        add_btn.setStyleSheet("""
+            QPushButton {
+                background: #28a745;
+                color: white;
+                padding: 10px 20px;
+                border: none;
+                border-radius: 6px;
+                font-weight: 600;
+            }
+        """)
+        add_btn.clicked.connect(self.add_product)
+
+        dismiss_btn = QPushButton("Dismiss")
+        dismiss_btn.clicked.connect(self.dismiss_selected)
+
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.accept)
+
+        button_layout.addWidget(add_btn)
+        button_layout.addWidget(dismiss_btn)
+        button_layout.addStretch()
+        button_layout.addWidget(close_btn)
+
+        layout.addWidget(self.table)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+
+    def load_entries(self, *args):
+        """Fill the table from the queue"""
+        pending = self.queue.pending()
+        self.table.setRowCount(len(pending))
+
+        for row, (barcode, entry) in enumerate(pending):
+            self.table.setItem(row, 0, QTableWidgetItem(barcode))
+            self.table.setItem(row, 1, QTableWidgetItem(str(entry['count'])))
+            self.table.setItem(row, 2, QTableWidgetItem(str(entry['last_seen'])[:19].replace('T', ' ')))
+
+    def selected_barcodes(self):
+        """Barcodes of the selected rows"""
+        rows = sorted({index.row() for index in self.table.selectedIndexes()})
+        return [self.table.item(row, 0).text() for row in rows]
+
+    def add_product(self):
+        """Create a product for the selected barcode"""
+        barcodes = self.selected_barcodes()
+        if not barcodes:
+            QMessageBox.information(self, "No Selection", "Please select a barcode")
+            return
+        # The queue resolves itself through the catalog feed once saved
+        self.add_product_callback(barcodes[0])
+
+    def dismiss_selected(self):
+        """Remove the selected barcodes without creating products"""
+        self.queue.resolve(self.selected_barcodes())
+
+    def done(self, result):
+        """Stop following the queue once closed"""
+        self.queue.changed.disconnect(self.load_entries)
+        super().done(result)
+
+
+_unknown_barcodes = None
+
+
+def get_unknown_barcodes(conn):
+    """Get the application-wide unknown barcode queue"""
+    global _unknown_barcodes
+    if _unknown_barcodes is None:
+        _unknown_barcodes = UnknownBarcodeQueue(conn, QCoreApplication.instance())
+    return _unknown_barcodes
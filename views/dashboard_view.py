@@ -1,6 +1,7 @@
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
+from sales_chart import SalesChartWidget
 
 class DashboardView(QWidget):
     def __init__(self, controller):
@@ -183,31 +184,9 @@ class DashboardView(QWidget):
         title_label.setStyleSheet("font-size: 16px; font-weight: bold; margin: 15px; color: #333;")
         title_label.setAlignment(Qt.AlignCenter)
         
-        # Simple bar chart
-        chart_widget = QWidget()
+        chart_widget = SalesChartWidget(color="#ff7043", value_suffix="")
         chart_widget.setFixedHeight(200)
-        chart_layout = QVBoxLayout()
-        
-        for i, (label, value) in enumerate(zip(labels, data)):
-            bar_layout = QHBoxLayout()
-            
-            label_widget = QLabel(label)
-            label_widget.setFixedWidth(80)
-            label_widget.setStyleSheet("font-size: 12px; color: #666;")
-            
-            bar_widget = QWidget()
-            bar_width = int(value * 50)
-            bar_widget.setFixedSize(bar_width, 20)
-            bar_widget.setStyleSheet("background-color: #ff7043; border-radius: 4px;")
-            
-            bar_layout.addWidget(label_widget)
-            bar_layout.addWidget(bar_widget)
-            bar_layout.addStretch()
-            
-            chart_layout.addLayout(bar_layout)
-        
-        chart_layout.addStretch()
-        chart_widget.setLayout(chart_layout)
+        chart_widget.set_data(labels, data)
         
         layout.addWidget(title_label)
         layout.addWidget(chart_widget)
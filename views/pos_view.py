@@ -2,6 +2,7 @@ from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from datetime import datetime
+from scheduler import get_scheduler
 
 class POSView(QWidget):
     def __init__(self, controller):
@@ -12,10 +13,8 @@ class POSView(QWidget):
         self.init_ui()
         self.load_products()
         
-        # Timer for clock
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_clock)
-        self.timer.start(1000)
+        # Shared application clock
+        get_scheduler().connect_clock(self, self.update_clock)
         self.update_clock()
     
     def init_ui(self):
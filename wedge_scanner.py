@@ -0,0 +1,168 @@
+"""
+Keyboard Wedge Scanner for POS System
+Recognizes handheld scanners that type like keyboards, whatever widget has focus
+"""
+
+import time
+from functools import partial
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+
+
+DEFAULT_WEDGE_SETTINGS = {
+    'wedge_scanner_enabled': True,
+    'wedge_max_gap_ms': 50,   # Scanners type faster than this, people do not
+    'wedge_min_length': 4,    # Shortest code accepted (PLU codes)
+}
+
+TERMINATOR_KEYS = (Qt.Key_Return, Qt.Key_Enter, Qt.Key_Tab)
+
+
+class KeyboardWedgeFilter(QObject):
+    """Application event filter that turns scanner key bursts into barcodes
+
+    A printable key is held back for up to the maximum gap. When the next
+    keys keep arriving faster than a person types and the burst ends with
+    Enter or Tab, the keys are swallowed and the registered screen receives
+    the whole code once. Anything else is replayed to the widget it was
+    meant for, so ordinary typing still works.
+
+    Keys are only examined while a registered screen is in the active window
+    and no modal dialog is open; otherwise they pass straight through.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.enabled = True
+        self.max_gap = DEFAULT_WEDGE_SETTINGS['wedge_max_gap_ms'] / 1000
+        self.min_length = DEFAULT_WEDGE_SETTINGS['wedge_min_length']
+        self.screens = []  # (widget, callback)
+        self.buffer = []   # (target, key, modifiers, text) of held key presses
+        self.last_key_time = 0.0
+        self.consumed_terminator = None
+        self.unreleased = []     # Keys whose press was held or consumed and not yet released
+        self.released_held = []  # Keys of held presses whose release was swallowed
+        self.replaying = False
+
+        self.replay_timer = QTimer(self)
+        self.replay_timer.setSingleShot(True)
+        self.replay_timer.timeout.connect(self.replay)
+
+    def apply_settings(self, settings):
+        """Read the wedge settings from app settings"""
+        settings = settings or {}
+        self.enabled = bool(settings.get('wedge_scanner_enabled', DEFAULT_WEDGE_SETTINGS['wedge_scanner_enabled']))
+        self.max_gap = settings.get('wedge_max_gap_ms', DEFAULT_WEDGE_SETTINGS['wedge_max_gap_ms']) / 1000
+        self.min_length = settings.get('wedge_min_length', DEFAULT_WEDGE_SETTINGS['wedge_min_length'])
+
+    def register(self, widget, callback):
+        """Send scans to callback(barcode) while widget is on screen"""
+        self.screens.append((widget, callback))
+        widget.destroyed.connect(partial(self.unregister, widget))
+
+    def unregister(self, widget, *args):
+        self.screens = [(w, c) for w, c in self.screens if w is not widget]
+
+    def active_callback(self):
+        """Callback of the registered screen the cashier is working in"""
+        if QApplication.activeModalWidget() or QApplication.activePopupWidget():
+            return None
+        window = QApplication.activeWindow()
+        for widget, callback in self.screens:
+            if widget.isVisible() and widget.window() is window:
+                return callback
+        return None
+
+    def eventFilter(self, obj, event):
+        """Hold back key presses that may belong to a scanner burst"""
+        event_type = event.type()
+        if event_type not in (QEvent.KeyPress, QEvent.KeyRelease):
+            return False
+        if self.replaying or not self.enabled or not isinstance(obj, QWidget):
+            return False
+
+        if event_type == QEvent.KeyRelease:
+            # Only releases of keys whose press was held back or consumed
+            key = event.key()
+            if key == self.consumed_terminator:
+                self.consumed_terminator = None
+                return True
+            if key in self.unreleased:
+                self.unreleased.remove(key)
+                if any(held[1] == key for held in self.buffer):
+                    self.released_held.append(key)  # Sent after the press if replayed
+                return True
+            return False
+
+        callback = self.active_callback()
+        if callback is None:
+            self.replay()
+            return False
+
+        now = time.monotonic()
+        key = event.key()
+        text = event.text()
+        in_burst = bool(self.buffer) and now - self.last_key_time <= self.max_gap
+
+        if key in TERMINATOR_KEYS:
+            if in_burst and len(self.buffer) >= self.min_length:
+                code = "".join(held[3] for held in self.buffer)
+                self.buffer = []
+                self.released_held = []
+                self.replay_timer.stop()
+                self.consumed_terminator = key
+                # Leave the event filter before the screen touches the cart
+                QTimer.singleShot(0, partial(callback, code))
+                return True
+            self.replay()
+            return False
+
+        if (len(text) == 1 and text.isprintable() and
+                not event.modifiers() & (Qt.ControlModifier | Qt.AltModifier | Qt.MetaModifier)):
+            if self.buffer and not in_burst:
+                self.replay()
+            self.buffer.append((obj, key, event.modifiers(), text))
+            self.unreleased.append(key)
+            self.last_key_time = now
+            self.replay_timer.start(int(self.max_gap * 1000) + 1)
+            return True
+
+        self.replay()
+        return False
+
+    def replay(self):
+        """Deliver held keys that turned out to be typed by a person"""
+        self.replay_timer.stop()
+        held, self.buffer = self.buffer, []
+        released, self.released_held = self.released_held, []
+        self.replaying = True
+        try:
+            for target, key, modifiers, text in held:
+                # A release already swallowed follows its press; a pending one passes through
+                send_release = key in released
+                if send_release:
+                    released.remove(key)
+                elif key in self.unreleased:
+                    self.unreleased.remove(key)
+                try:
+                    QApplication.sendEvent(target, QKeyEvent(QEvent.KeyPress, key, modifiers, text))
+                    if send_release:
+                        QApplication.sendEvent(target, QKeyEvent(QEvent.KeyRelease, key, modifiers, text))
+                except RuntimeError:
+                    pass  # Widget was deleted meanwhile
+        finally:
+            self.replaying = False
+
+
+_keyboard_wedge = None
+
+
+def get_keyboard_wedge():
+    """Get the application-wide keyboard wedge filter, installing it once"""
+    global _keyboard_wedge
+    if _keyboard_wedge is None:
+        app = QCoreApplication.instance()
+        _keyboard_wedge = KeyboardWedgeFilter(app)
+        app.installEventFilter(_keyboard_wedge)
+    return _keyboard_wedge